@@ -1,32 +1,88 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
 import logging
 import os
+import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-from collections import OrderedDict
 from numbers import Number
-from threading import Lock
-from typing import Any, Optional, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Iterable,
+    Optional,
+)
 
-import fastf1
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-from fastf1.req import RateLimitExceededError
-
-# Cache disabled to prevent deadlocks
-# cache_dir = "f1_cache"
-# os.makedirs(cache_dir, exist_ok=True)
-# fastf1.Cache.enable_cache(cache_dir)
-try:
-    fastf1.Cache.disable_cache()  # type: ignore
-except AttributeError:
-    # If disable_cache doesn't exist, just don't enable cache
-    pass
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.routing import Match
+
+import compact_session
+import fastf1_cache
+import http_cache
+import metrics
+import profiling
+from event_index import EventIndex
+from file_lock import KeyedFileLock
+from http_cache import RenderedPayload
+from lap_store import LapStore
+from payload_store import PayloadStore, default_version_tag
+from prefetch import PrefetchScheduler
+from request_coalescer import RequestCoalescer
+from schedule_cache import ScheduleCache
+import session_profiles
+from session_profiles import CIRCUIT_INFO, LAPS, WEATHER, LoadedSession
+from session_cache import SessionCache
+from shared_cache import SharedCache
+from upstream_executor import ExecutorSaturated, UpstreamExecutor
+from warmup import LazyModule, Warmup, WarmupGate
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# FastF1, pandas, numpy and the modules built on them are imported on first
+# use, or by the warmup thread started with the server, so that /health
+# answers while they load. Data requests wait for the warmup (see warmup.py).
+# The type checker sees pandas itself; the code sees the proxy.
+fastf1 = LazyModule("fastf1", on_import=lambda module: setup_fastf1(module))
+_pandas = LazyModule("pandas")
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = _pandas
+columnar = LazyModule("columnar")
+highlights = LazyModule("highlights")
+position_matrix = LazyModule("position_matrix")
+_warmup = Warmup(
+    [
+        ("fastf1", fastf1),
+        ("pandas", _pandas),
+        ("columnar", columnar),
+        ("highlights", highlights),
+        ("position_matrix", position_matrix),
+    ]
+)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    _warmup.start()
+    if PREFETCH_ENABLED:
+        _prefetch.start(after=_warmup.wait_async)
+    try:
+        yield
+    finally:
+        await _prefetch.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS
 default_allowed_origins = os.getenv(
@@ -55,22 +111,210 @@ app.add_middleware(
     allow_headers=["Accept", "Content-Type"],
     max_age=600,
 )
+app.add_middleware(WarmupGate, warmup=_warmup, exempt=("/health", "/ready", "/metrics"))
+
+
+def route_template(scope: dict) -> str:
+    """The path template of the route a request matches, for metric labels."""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match is not Match.NONE:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+app.add_middleware(metrics.MetricsMiddleware, route_for=route_template)
+
+# Opt-in request profiling (see profiling.py): with PROFILING_ENABLED=1 and
+# PROFILING_TOKEN set, a request sent with X-Profile: <PROFILING_TOKEN> is
+# sampled every PROFILING_INTERVAL_MS and its flamegraph data saved to
+# PROFILING_DIR, newest PROFILING_KEEP kept, and /debug/profiles serves them
+# to the same header. Without a token nothing is installed.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "") == "1"
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR", str(Path(__file__).resolve().parent / "profiles")
+)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "50"))
+_profile_store = profiling.ProfileStore(Path(PROFILING_DIR), keep=PROFILING_KEEP)
+if PROFILING_ENABLED and not PROFILING_TOKEN:
+    logger.warning("PROFILING_ENABLED is set without PROFILING_TOKEN; not profiling")
+    PROFILING_ENABLED = False
+if PROFILING_ENABLED:
+    app.add_middleware(
+        profiling.ProfilingMiddleware,
+        store=_profile_store,
+        route_for=route_template,
+        token=PROFILING_TOKEN,
+        interval=PROFILING_INTERVAL_MS / 1000,
+    )
+
+
+# Loaded race sessions, keyed by (year, round, session type). See
+# session_cache.py for the lock order. Entries are compacted (see
+# compact_session.py), so a season's worth takes less memory than a few raw
+# FastF1 sessions did.
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "24"))
+_session_cache = SessionCache(SESSION_CACHE_SIZE)
+
+# Schedules and rendered race payloads shared by every worker process on the
+# machine (see shared_cache.py). Non-settled race payloads expire after
+# SHARED_CACHE_TTL seconds. Set SHARED_CACHE_PATH to an empty string to
+# disable.
+SHARED_CACHE_PATH = os.getenv(
+    "SHARED_CACHE_PATH", str(Path(__file__).resolve().parent / "shared_cache.sqlite")
+)
+SHARED_CACHE_MAX_MB = float(os.getenv("SHARED_CACHE_MAX_MB", "256"))
+SHARED_CACHE_TTL = int(os.getenv("SHARED_CACHE_TTL", "300"))
+# How often a worker checks whether the shared cache was invalidated
+SHARED_CACHE_SYNC_INTERVAL = float(os.getenv("SHARED_CACHE_SYNC_INTERVAL", "1"))
+_shared_cache = SharedCache(
+    path=Path(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None,
+    max_bytes=int(SHARED_CACHE_MAX_MB * 1024 * 1024),
+)
+
+# Event schedules per year. Finished seasons never expire; the current one is
+# served stale past the TTL while a background refresh runs.
+SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", "3600"))  # 1 hour default
+_schedule_cache = ScheduleCache(
+    ttl=SCHEDULE_CACHE_TTL,
+    is_permanent=lambda year: year < pd.Timestamp.now(tz="UTC").year,
+    shared=_shared_cache if _shared_cache.enabled else None,
+)
 
+# Finished endpoint payloads for races older than the settle window. Set
+# PAYLOAD_STORE_DIR to an empty string to disable.
+PAYLOAD_STORE_DIR = os.getenv(
+    "PAYLOAD_STORE_DIR", str(Path(__file__).resolve().parent / "payload_store")
+)
+PAYLOAD_SETTLE_DAYS = float(os.getenv("PAYLOAD_SETTLE_DAYS", "7"))
+_payload_store = PayloadStore(
+    root=Path(PAYLOAD_STORE_DIR) if PAYLOAD_STORE_DIR else None,
+    version=default_version_tag(),
+    settle_seconds=PAYLOAD_SETTLE_DAYS * 24 * 3600,
+)
 
-# Session cache disabled to prevent deadlocks
-# SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "6"))
-# _session_cache_lock = Lock()
-# _session_cache: "OrderedDict[tuple[int, int], Any]" = OrderedDict()
-# _session_load_locks: dict[tuple[int, int], Lock] = {}
+# Compact lap/result/weather tables written by scripts/ingest.py. Set
+# LAP_STORE_DIR to an empty string to disable.
+LAP_STORE_DIR = os.getenv(
+    "LAP_STORE_DIR", str(Path(__file__).resolve().parent / "lap_tables")
+)
+_lap_store = LapStore(root=Path(LAP_STORE_DIR) if LAP_STORE_DIR else None)
+# Opened lap store races. Their columns are memory-mapped, so entries only
+# cost the decoded string columns and the page cache is shared across workers.
+LAP_STORE_CACHE_SIZE = int(os.getenv("LAP_STORE_CACHE_SIZE", "32"))
+_stored_session_cache = SessionCache(LAP_STORE_CACHE_SIZE)
 
-# Schedule cache disabled to prevent deadlocks
-# SCHEDULE_CACHE_TTL = int(os.getenv("SCHEDULE_CACHE_TTL", "3600"))  # 1 hour default
-# _schedule_cache_lock = Lock()
-# _schedule_cache: dict[int, tuple[Any, float]] = {}  # year -> (schedule, timestamp)
+# Entries per leaderboard in /highlights
+HIGHLIGHTS_TOP_N = int(os.getenv("HIGHLIGHTS_TOP_N", "5"))
 
 # Timeout for FastF1 operations (30 seconds)
 FASTF1_TIMEOUT = int(os.getenv("FASTF1_TIMEOUT", "30"))
 
+# FastF1's on-disk HTTP and parse cache, shared by every worker process.
+# Loads of one session are serialized by a file lock; a load waits at most
+# FASTF1_CACHE_LOCK_TIMEOUT seconds for it. FASTF1_NO_CACHING=1 (or an empty
+# FASTF1_CACHE) disables it.
+FASTF1_CACHE = os.getenv(
+    "FASTF1_CACHE", str(Path(__file__).resolve().parent / "f1_cache")
+)
+FASTF1_NO_CACHING = os.getenv("FASTF1_NO_CACHING", "") == "1"
+FASTF1_CACHE_LOCK_TIMEOUT = float(
+    os.getenv("FASTF1_CACHE_LOCK_TIMEOUT", str(FASTF1_TIMEOUT))
+)
+if FASTF1_CACHE and not FASTF1_NO_CACHING:
+    _disk_cache: Optional[fastf1_cache.DiskCache] = fastf1_cache.DiskCache(
+        Path(FASTF1_CACHE), lock_timeout=FASTF1_CACHE_LOCK_TIMEOUT
+    )
+else:
+    _disk_cache = None
+
+# Load tests only: send every FastF1 request to a stand-in upstream
+# (benchmarks/mock_upstream.py) instead of the live timing and Ergast APIs
+FASTF1_UPSTREAM_URL = os.getenv("FASTF1_UPSTREAM_URL", "")
+
+
+def setup_fastf1(module: Any) -> None:
+    """Configure FastF1's caching (and redirect) as soon as it is imported."""
+    if _disk_cache is not None:
+        fastf1_cache.enable_disk_cache(
+            _disk_cache.cache_dir, lock_timeout=FASTF1_CACHE_LOCK_TIMEOUT
+        )
+    else:
+        module.Cache.set_disabled()
+    if FASTF1_UPSTREAM_URL:
+        fastf1_cache.redirect_upstream(FASTF1_UPSTREAM_URL)
+
+
+# Shared pool for blocking FastF1 calls: at most UPSTREAM_MAX_WORKERS run at
+# once and UPSTREAM_MAX_QUEUE more may wait; further calls get a 503.
+UPSTREAM_MAX_WORKERS = int(os.getenv("UPSTREAM_MAX_WORKERS", "3"))
+UPSTREAM_MAX_QUEUE = int(os.getenv("UPSTREAM_MAX_QUEUE", "6"))
+UPSTREAM_RETRY_AFTER = int(os.getenv("UPSTREAM_RETRY_AFTER", "5"))
+_upstream_executor = UpstreamExecutor(
+    max_workers=UPSTREAM_MAX_WORKERS,
+    max_queue=UPSTREAM_MAX_QUEUE,
+    retry_after=UPSTREAM_RETRY_AFTER,
+)
+
+# The race endpoints are async: payload builds run on this pool, off the
+# event loop, and identical in-flight requests share one task.
+RACE_BUILD_WORKERS = int(os.getenv("RACE_BUILD_WORKERS", "4"))
+_build_executor = ThreadPoolExecutor(
+    max_workers=RACE_BUILD_WORKERS, thread_name_prefix="race-build"
+)
+_coalescer = RequestCoalescer()
+
+# Rendered response bodies, keyed by endpoint. Settled races stay valid
+# forever; anything else only while its source session/schedule is cached.
+RENDERED_CACHE_SIZE = int(os.getenv("RENDERED_CACHE_SIZE", "128"))
+_rendered_payloads = SessionCache(RENDERED_CACHE_SIZE)
+
+# Cache-Control max-age (seconds) for data that may still change. Settled
+# races are served as immutable for a year.
+RACE_MAX_AGE = int(os.getenv("RACE_MAX_AGE", "60"))
+SCHEDULE_MAX_AGE = int(os.getenv("SCHEDULE_MAX_AGE", "300"))
+FINISHED_SEASON_MAX_AGE = int(os.getenv("FINISHED_SEASON_MAX_AGE", "86400"))
+# The frontend counts down from the served value, so keep this fresh
+NEXT_RACE_MAX_AGE = int(os.getenv("NEXT_RACE_MAX_AGE", "0"))
+
+metrics.REGISTRY.gauge(
+    "f1_upstream_executor_running",
+    "FastF1 calls running on the upstream executor",
+    lambda: _upstream_executor.stats()["running"],
+)
+metrics.REGISTRY.gauge(
+    "f1_upstream_executor_queued",
+    "FastF1 calls waiting for an upstream executor worker",
+    lambda: _upstream_executor.stats()["queued"],
+)
+metrics.REGISTRY.gauge(
+    "f1_upstream_executor_capacity",
+    "Running plus queued FastF1 calls admitted before answering 503",
+    lambda: _upstream_executor.stats()["capacity"],
+)
+metrics.REGISTRY.gauge(
+    "f1_session_loads_inflight",
+    "Distinct session loads in flight (each may serve many requests)",
+    lambda: _coalescer.inflight("session"),
+)
+metrics.REGISTRY.gauge(
+    "f1_coalesced_requests_inflight",
+    "Distinct coalesced tasks in flight (loads and section builds)",
+    lambda: _coalescer.inflight(),
+)
+metrics.REGISTRY.gauge(
+    "f1_session_cache_entries",
+    "Loaded sessions held in memory",
+    lambda: len(_session_cache),
+)
+metrics.REGISTRY.gauge(
+    "f1_rendered_cache_entries",
+    "Rendered response bodies held in memory",
+    lambda: len(_rendered_payloads),
+)
+
 
 def reset_fastf1_state():
     """Reset FastF1 global state to prevent stale HTTP sessions in long-running servers."""
@@ -82,68 +326,221 @@ def reset_fastf1_state():
         pass
 
 
-def run_with_timeout(func, timeout_seconds: int, *args, **kwargs):
-    """Run a function with a timeout using a context manager to avoid thread leaks."""
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(func, *args, **kwargs)
-        try:
-            return future.result(timeout=timeout_seconds)
-        except FutureTimeoutError:
-            future.cancel()
-            raise TimeoutError(f"Operation timed out after {timeout_seconds} seconds")
+def upstream_busy(exc: ExecutorSaturated) -> HTTPException:
+    """The 503 returned when the upstream executor has no room."""
+    logger.warning("Upstream executor saturated: %s", _upstream_executor.stats())
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy loading race data. Please try again shortly.",
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
+def _normalize_cache_key(
+    year: int, round_num: int, session_type: str = "R"
+) -> tuple[int, int, str]:
+    return (int(year), int(round_num), str(session_type).upper())
 
 
-def cleanup_stale_locks():
-    """Remove locks that are no longer in use."""
-    # Cache disabled to prevent deadlocks
-    pass
+def count_upstream_error(operation: str, exc: BaseException) -> None:
+    if isinstance(exc, ExecutorSaturated):
+        metrics.upstream_error(operation, "rejected")
+    elif isinstance(exc, TimeoutError):
+        metrics.upstream_error(operation, "timeout")
+    elif isinstance(exc, fastf1.req.RateLimitExceededError):
+        metrics.upstream_error(operation, "rate_limited")
 
 
-def _normalize_cache_key(year: int, round_num: int) -> tuple[int, int]:
-    return (int(year), int(round_num))
+def fetch_schedule(year: int) -> Any:
+    """Fetch a season schedule from FastF1 on the shared upstream executor.
+
+    Raises TimeoutError after FASTF1_TIMEOUT, and a 503 with Retry-After
+    when the executor has no room for another call.
+    """
+
+    def load_schedule():
+        reset_fastf1_state()
+        return fastf1.get_event_schedule(year)
+
+    try:
+        with metrics.phase(metrics.UPSTREAM_LOAD):
+            return _upstream_executor.run(load_schedule, FASTF1_TIMEOUT)
+    except Exception as exc:
+        count_upstream_error("schedule", exc)
+        if isinstance(exc, ExecutorSaturated):
+            raise upstream_busy(exc) from exc
+        raise
+
+
+_shared_sync = {"generation": _shared_cache.generation(), "checked_at": 0.0}
+
+
+def sync_shared_cache() -> None:
+    """Drop in-process copies once the shared cache has been invalidated."""
+    now = time.monotonic()
+    if now - _shared_sync["checked_at"] < SHARED_CACHE_SYNC_INTERVAL:
+        return
+    _shared_sync["checked_at"] = now
+
+    generation = _shared_cache.generation()
+    if generation < 0 or generation == _shared_sync["generation"]:
+        return
+    _shared_sync["generation"] = generation
+    logger.info("Shared cache invalidated; dropping in-process payloads")
+    _rendered_payloads.clear()
+    _schedule_cache.invalidate()
+    # The invalidated races may have been deleted from the lap store
+    _stored_session_cache.clear()
 
 
 def get_cached_schedule(year: int) -> Optional[Any]:
-    """Get schedule from cache if still valid, otherwise None."""
-    # Cache disabled to prevent deadlocks
-    return None
+    """Get schedule from cache, refreshing stale copies in the background."""
+    sync_shared_cache()
+    cached = _schedule_cache.lookup(year)
+    metrics.cache_lookup("schedule", cached is not None)
+    if cached is None:
+        return None
+
+    schedule, fresh = cached
+    if not fresh:
+        _schedule_cache.refresh_in_background(year, lambda: fetch_schedule(year))
+    return schedule
 
 
 def store_schedule_in_cache(year: int, schedule: Any) -> None:
     """Store schedule in cache with current timestamp."""
-    # Cache disabled to prevent deadlocks
-    pass
+    _schedule_cache.put(year, schedule)
+
+
+def _store_session_in_cache(key: tuple[int, int, str], session: Any) -> Any:
+    current = _session_cache.get(key)
+    if current is not None and current is not session:
+        if current.covers(session.profile):
+            # A load with at least as much data finished first; keep it
+            return current
+    return _session_cache.put(key, session)
+
+
+def session_cache_lock(session: Any) -> ContextManager[None]:
+    """Hold the disk cache lock for a FastF1 session, if the cache is on."""
+    if _disk_cache is None:
+        return contextlib.nullcontext()
+    return _disk_cache.session_lock(session.api_path)
+
+
+def load_session(
+    year: int,
+    round_num: int,
+    session_type: str = "R",
+    profile: frozenset[str] = session_profiles.FULL,
+) -> LoadedSession:
+    """Load a session from FastF1 with just the components in ``profile``."""
+    reset_fastf1_state()
+    session = fastf1.get_session(year, round_num, session_type)
+    with session_cache_lock(session):
+        session.load(**session_profiles.load_options(profile))
+
+        circuit_info = None
+        if CIRCUIT_INFO in profile:
+            try:
+                circuit_info = session.get_circuit_info()
+            except Exception as exc:
+                logger.warning(
+                    "Circuit info unavailable for %s-%s: %s", year, round_num, exc
+                )
+    return LoadedSession(session, profile, circuit_info)
 
 
-def _store_session_in_cache(key: tuple[int, int], session: Any) -> Any:
-    # Cache disabled to prevent deadlocks
-    return session
+def load_compact_session(
+    year: int,
+    round_num: int,
+    session_type: str = "R",
+    profile: frozenset[str] = session_profiles.FULL,
+) -> compact_session.CompactSession:
+    """``load_session`` reduced to the columns the endpoints read, for caching."""
+    return compact_session.compact(load_session(year, round_num, session_type, profile))
 
 
-def get_cached_session(year: int, round_num: int) -> Any:
-    """Load session without caching to prevent deadlocks."""
+def open_stored_race(year: int, round_num: int) -> Optional[Any]:
+    """Return an ingested race from the lap store, or None."""
+    if not _lap_store.enabled:
+        return None
+
+    key = _normalize_cache_key(year, round_num)
+    stored = _stored_session_cache.get(key)
+    if stored is None:
+        stored = _lap_store.open_race(key[0], key[1])
+        if stored is not None:
+            _stored_session_cache.put(key, stored)
+    metrics.cache_lookup("lap_store", stored is not None)
+    return stored
 
-    # Load session with timeout (no caching)
-    def load_session():
-        reset_fastf1_state()
-        session = fastf1.get_session(year, round_num, "R")
-        session.load(
-            laps=True,
-            telemetry=False,
-            weather=True,
-            messages=False,
-        )
-        return session
 
+async def _load_session_into_cache(
+    key: tuple[int, int, str], profile: frozenset[str]
+) -> Any:
     try:
-        session = run_with_timeout(load_session, FASTF1_TIMEOUT)
-        return session
+        with metrics.phase(metrics.UPSTREAM_LOAD):
+            session = await _upstream_executor.run_async(
+                load_compact_session, FASTF1_TIMEOUT, *key, profile
+            )
+    except Exception as exc:
+        count_upstream_error("session", exc)
+        raise
+    return _store_session_in_cache(key, session)
+
+
+async def load_race_session(
+    year: int,
+    round_num: int,
+    components: Iterable[str] = session_profiles.FULL,
+    session_type: str = "R",
+) -> Any:
+    """Return a race session with at least ``components``, off the event loop.
+
+    Ingested races come straight from the lap store. Otherwise the smallest
+    loading profile covering ``components`` is fetched, or a cached session
+    missing some of them is upgraded to a heavier profile. Concurrent
+    requests share one FastF1 load on the upstream executor (joining a
+    heavier load already in flight if there is one), which is cancelled if
+    every one of them goes away first.
+    """
+    stored = open_stored_race(year, round_num)
+    if stored is not None:
+        return stored
+
+    key = _normalize_cache_key(year, round_num, session_type)
+    profile = session_profiles.profile_for(components)
+    session = _session_cache.get(key)
+    metrics.cache_lookup("session", session is not None and session.covers(profile))
+    if session is not None:
+        if session.covers(profile):
+            return session
+        # Upgrade without losing anything the cached copy already has
+        profile = session_profiles.profile_for(profile | session.profile)
+
+    for candidate in session_profiles.PROFILES:
+        if profile <= candidate and _coalescer.running(
+            ("session",) + key + (candidate,)
+        ):
+            profile = candidate
+            break
+
+    try:
+        return await _coalescer.run(
+            ("session",) + key + (profile,),
+            lambda: _load_session_into_cache(key, profile),
+        )
+    except ExecutorSaturated as exc:
+        raise upstream_busy(exc) from exc
     except TimeoutError:
         logger.error(f"Timeout loading session {year}-{round_num}")
         raise HTTPException(
             status_code=504,
             detail=f"Timeout loading race session {year}-{round_num}. Please try again.",
         )
+    except HTTPException:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=500,
@@ -151,6 +548,204 @@ def get_cached_session(year: int, round_num: int) -> Any:
         ) from exc
 
 
+async def run_build(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking payload builder on the build pool and await it."""
+    loop = asyncio.get_running_loop()
+    # Carry the request context (the metrics route label) into the pool
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _build_executor, functools.partial(context.run, func, *args)
+    )
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def until_disconnected(request: Request, work: Awaitable[Any]) -> Any:
+    """Await work, abandoning it if the client disconnects first.
+
+    The work is usually a coalesced task, so abandoning it only cancels the
+    shared load or build once no other request is waiting for it.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {task, watcher}, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+
+    if task not in done:
+        logger.info("Client disconnected from %s", request.url.path)
+        # Nobody is listening; the status only shows up in access logs
+        return Response(status_code=499)
+    return task.result()
+
+
+def race_is_settled(event: Any) -> bool:
+    race_time = normalize_datetime(event_get(event, "Session5DateUtc"))
+    return _payload_store.is_settled(race_time)
+
+
+def _shared_section_key(section: str, year: int, round: int) -> str:
+    return f"{int(year)}/{int(round)}/{section}"
+
+
+def share_section(
+    section: str, year: int, round: int, rendered: RenderedPayload
+) -> None:
+    """Publish a rendered section to the other workers."""
+    if not _shared_cache.enabled:
+        return
+    _shared_cache.put(
+        "rendered",
+        _shared_section_key(section, year, round),
+        _payload_store.version.encode("utf-8") + b"\n" + rendered.dumps(),
+        ttl=None if rendered.settled else SHARED_CACHE_TTL,
+    )
+
+
+def shared_section(section: str, year: int, round: int) -> Optional[RenderedPayload]:
+    """Return a section another worker rendered, if still live, or None."""
+    found = _shared_cache.get("rendered", _shared_section_key(section, year, round))
+    if found is None:
+        return None
+    version, _, data = found[0].partition(b"\n")
+    if version != _payload_store.version.encode("utf-8"):
+        return None
+    try:
+        return RenderedPayload.loads(data)
+    except Exception as exc:
+        logger.warning(
+            "Ignoring unreadable shared %s-%s %s: %s", year, round, section, exc
+        )
+        return None
+
+
+def render_race_section(
+    section: str, session: Any, year: int, round: int
+) -> RenderedPayload:
+    """Build, persist, render and share one race section from a loaded session."""
+    with metrics.phase(metrics.TRANSFORM):
+        payload = build_bundle_section(section, session, year, round)
+    settled = race_is_settled(getattr(session, "event", None))
+    with metrics.phase(metrics.SERIALIZE):
+        rendered = RenderedPayload.render(payload, settled=settled, source=session)
+    share_section(section, year, round, rendered)
+    return rendered
+
+
+def render_stored_section(
+    section: str, year: int, round: int
+) -> Optional[RenderedPayload]:
+    rendered = shared_section(section, year, round)
+    if _shared_cache.enabled:
+        metrics.cache_lookup("shared", rendered is not None)
+    if rendered is not None:
+        return rendered
+
+    stored = get_stored_payload(year, round, section)
+    if _payload_store.enabled:
+        metrics.cache_lookup("payload_store", stored is not None)
+    if stored is None:
+        return None
+    with metrics.phase(metrics.SERIALIZE):
+        rendered = RenderedPayload.render(stored, settled=True)
+    share_section(section, year, round, rendered)
+    return rendered
+
+
+async def prebuilt_section(
+    section: str, year: int, round: int
+) -> Optional[RenderedPayload]:
+    """Return a section without loading the race, or None.
+
+    Looks in memory, then the shared cache (where another worker may have
+    rendered it), then the payload store. Only settled sections are kept in
+    memory; shared entries for other races expire and are read every time.
+    """
+    key = (section, year, round)
+    rendered = _rendered_payloads.get(key)
+    metrics.cache_lookup("rendered", rendered is not None and rendered.settled)
+    if rendered is not None and rendered.settled:
+        return rendered
+
+    rendered = await run_build(render_stored_section, section, year, round)
+    if rendered is None or not rendered.settled:
+        return rendered
+    return _rendered_payloads.put(key, rendered)
+
+
+async def session_section(
+    section: str, session: Any, year: int, round: int
+) -> RenderedPayload:
+    """Render a section from a session, reusing the body if already built."""
+    key = (section, year, round)
+    rendered = _rendered_payloads.get(key)
+    current = rendered is not None and (
+        rendered.settled or rendered.built_from(session)
+    )
+    metrics.cache_lookup("rendered", current)
+    if rendered is not None and current:
+        return rendered
+
+    rendered = await run_build(render_race_section, section, session, year, round)
+    return _rendered_payloads.put(key, rendered)
+
+
+async def compute_race_section(section: str, year: int, round: int) -> RenderedPayload:
+    """Return a prebuilt section, or load the race and build (and store) it."""
+    sync_shared_cache()
+    rendered = await prebuilt_section(section, year, round)
+    if rendered is not None:
+        return rendered
+
+    session = await load_race_session(year, round, SECTION_COMPONENTS[section])
+    return await session_section(section, session, year, round)
+
+
+def race_response(request: Request, rendered: RenderedPayload) -> Response:
+    if rendered.settled:
+        value = http_cache.cache_control(http_cache.SETTLED_MAX_AGE, immutable=True)
+    else:
+        value = http_cache.cache_control(RACE_MAX_AGE)
+    return http_cache.conditional_response(request, rendered, value)
+
+
+async def serve_race_section(
+    request: Request, section: str, year: int, round: int
+) -> Response:
+    """Serve one race endpoint, coalescing identical in-flight requests."""
+    rendered = await until_disconnected(
+        request,
+        _coalescer.run(
+            (section, year, round), lambda: compute_race_section(section, year, round)
+        ),
+    )
+    if isinstance(rendered, Response):
+        return rendered
+    return race_response(request, rendered)
+
+
+def get_stored_payload(year: int, round_num: int, endpoint: str) -> Optional[Any]:
+    """Return a persisted payload for a settled race, without touching FastF1."""
+    return _payload_store.get(year, round_num, endpoint)
+
+
+def store_payload(
+    year: int, round_num: int, endpoint: str, payload: Any, event: Any
+) -> Any:
+    """Persist a payload if the event's race is past the settle window."""
+    race_time = normalize_datetime(event_get(event, "Session5DateUtc"))
+    _payload_store.put(year, round_num, endpoint, payload, race_time)
+    return payload
+
+
 def event_get(event: Any, key: str, default: Any = None) -> Any:
     if event is None:
         return default
@@ -182,8 +777,11 @@ def format_timedelta(td):
     return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
 
 
-def get_countdown_components(event_time_utc: pd.Timestamp):
-    now = pd.Timestamp.now(tz="UTC")
+def get_countdown_components(
+    event_time_utc: "pd.Timestamp", now: Optional["pd.Timestamp"] = None
+):
+    if now is None:
+        now = pd.Timestamp.now(tz="UTC")
 
     if pd.isna(event_time_utc):
         return None
@@ -278,13 +876,58 @@ def to_optional_int(value: Any) -> Optional[int]:
     return None
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this worker process.
+
+    Async so that gauges read the coalescer on the event loop thread.
+    """
+    return Response(
+        content=metrics.REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+if PROFILING_ENABLED:
+
+    def require_profile_token(request: Request) -> None:
+        """404 (as if profiling were off) without the X-Profile token."""
+        header = request.headers.get(profiling.PROFILE_HEADER)
+        if not profiling.token_matches(header, PROFILING_TOKEN):
+            raise HTTPException(status_code=404, detail="Not Found")
+
+    @app.get("/debug/profiles")
+    def list_profiles(request: Request):
+        """Saved request profiles, newest first."""
+        require_profile_token(request)
+        return {"profiles": _profile_store.list()}
+
+    @app.get("/debug/profiles/{name}")
+    def get_profile(name: str, request: Request):
+        """One profile artifact (``<id>.json`` or ``<id>.folded``)."""
+        require_profile_token(request)
+        path = _profile_store.path_for(name)
+        if path is None:
+            raise HTTPException(status_code=404, detail="No such profile")
+        media_type = "application/json" if path.suffix == ".json" else "text/plain"
+        return FileResponse(path, media_type=media_type)
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint that's always fast - used by Fly.io health checks."""
     return {"status": "ok", "timestamp": time.time()}
 
 
-def extract_event_details(event_row, fallback_year):
+@app.get("/ready")
+def readiness_check():
+    """Whether FastF1 and pandas are loaded; 503 while the warmup is running."""
+    state = _warmup.state()
+    return JSONResponse(state, status_code=200 if _warmup.ready else 503)
+
+
+def event_details(event_row, fallback_year):
+    """The /next-race fields of a schedule row, without the countdown."""
     round_number = to_optional_int(
         event_row.get("RoundNumber") if event_row is not None else None
     )
@@ -310,134 +953,92 @@ def extract_event_details(event_row, fallback_year):
             "qualifying": session_iso(event_row, "Session4DateUtc"),
             "race": race_time.isoformat() if race_time is not None else None,
         },
-        "countdown": (
-            get_countdown_components(race_time) if race_time is not None else None
-        ),
     }
 
 
+# Sorted race start times per season, rebuilt when a schedule is refreshed
+_event_index = EventIndex(describe=event_details)
+
+
 @app.get("/next-race")
-def get_next_race():
+def get_next_race(request: Request):
     """Return the next scheduled race with countdown information."""
+    with metrics.phase(metrics.TRANSFORM):
+        payload = find_next_race()
+    with metrics.phase(metrics.SERIALIZE):
+        rendered = RenderedPayload.render(payload, settled=False)
+    return http_cache.conditional_response(
+        request, rendered, http_cache.cache_control(NEXT_RACE_MAX_AGE)
+    )
 
-    now = pd.Timestamp.now(tz="UTC")
-    start_year = now.year
 
-    # Check current year and next year as a fallback (if schedule already finished)
-    schedule_loaded = False
-    upstream_errors: list[str] = []
+def load_next_race_schedule(year: int, upstream_errors: list[str]) -> Optional[Any]:
+    """A season schedule for /next-race, or None (with the reason recorded)."""
+    # Try cache first
+    schedule = get_cached_schedule(year)
+    if schedule is not None:
+        return schedule
 
-    for year in range(start_year, start_year + 2):
-        # Try cache first
+    # Not in cache, fetch from FastF1
+    try:
+        try:
+            schedule = fetch_schedule(year)
+        except TimeoutError:
+            logger.warning(f"Timeout fetching schedule for {year}")
+            # Try cache one more time in case it was updated
+            schedule = get_cached_schedule(year)
+            if schedule is None:
+                upstream_errors.append(f"{year}: Timeout fetching schedule")
+            else:
+                logger.info(f"Using cached schedule for {year} after timeout")
+            return schedule
+        # Store in cache for future requests
+        store_schedule_in_cache(year, schedule)
+        return schedule
+    except fastf1.req.RateLimitExceededError:
+        # Rate limited - try cache one more time (might have been updated)
         schedule = get_cached_schedule(year)
         if schedule is not None:
-            schedule_loaded = True
+            logger.warning("Rate limited, using cached schedule for %s", year)
         else:
-            # Not in cache, fetch from FastF1
-            try:
-
-                def fetch_schedule():
-                    reset_fastf1_state()
-                    return fastf1.get_event_schedule(year)
-
-                try:
-                    schedule = run_with_timeout(fetch_schedule, FASTF1_TIMEOUT)
-                except TimeoutError:
-                    logger.warning(f"Timeout fetching schedule for {year}")
-                    # Try cache one more time in case it was updated
-                    schedule = get_cached_schedule(year)
-                    if schedule is None:
-                        upstream_errors.append(f"{year}: Timeout fetching schedule")
-                        continue
-                    else:
-                        schedule_loaded = True
-                        logger.info(f"Using cached schedule for {year} after timeout")
-                else:
-                    schedule_loaded = True
-                    # Store in cache for future requests
-                    store_schedule_in_cache(year, schedule)
-            except RateLimitExceededError as exc:
-                # Rate limited - try cache one more time (might have been updated)
-                schedule = get_cached_schedule(year)
-                if schedule is not None:
-                    schedule_loaded = True
-                    logger.warning("Rate limited, using cached schedule for %s", year)
-                else:
-                    upstream_errors.append(f"{year}: Rate limit exceeded")
-                    logger.warning(
-                        "Rate limit exceeded for %s and no cached data available", year
-                    )
-                    continue
-            except ValueError as exc:
-                upstream_errors.append(f"{year}: {exc}")
-                logger.warning(
-                    "Upstream schedule unavailable for %s: %s", year, exc, exc_info=exc
-                )
-                continue
-            except Exception as exc:
-                upstream_errors.append(f"{year}: {exc}")
-                logger.warning(
-                    "Unexpected error loading schedule for %s", year, exc_info=exc
-                )
-                continue
-
-        if schedule is None:
-            continue
-
-        schedule_df = cast(pd.DataFrame, schedule)
-
-        if schedule_df.empty:
-            continue
-
-        # Ensure we work with a copy to avoid SettingWithCopy warnings
-        upcoming: pd.DataFrame = schedule_df.copy()
-
-        # Filter valid rounds (ignore testing etc.)
-        if "RoundNumber" in upcoming.columns:
-            round_numbers = cast(
-                pd.Series, pd.to_numeric(upcoming["RoundNumber"], errors="coerce")
+            upstream_errors.append(f"{year}: Rate limit exceeded")
+            logger.warning(
+                "Rate limit exceeded for %s and no cached data available", year
             )
-            valid_round_mask = cast(pd.Series, round_numbers.ge(1)).fillna(False)
-            upcoming = upcoming[valid_round_mask]
-
-        if "Session5DateUtc" not in upcoming.columns:
-            continue
-
-        # Normalize race date while keeping timezone-aware dtype
-        normalized_dates = upcoming["Session5DateUtc"].apply(normalize_datetime)
-        normalized_dates = pd.DatetimeIndex(normalized_dates).tz_convert("UTC")
-        upcoming = upcoming.drop(columns=["Session5DateUtc"]).assign(
-            Session5DateUtc=normalized_dates
+        return schedule
+    except HTTPException:
+        # Executor saturated; retrying later years would only add load
+        raise
+    except ValueError as exc:
+        upstream_errors.append(f"{year}: {exc}")
+        logger.warning(
+            "Upstream schedule unavailable for %s: %s", year, exc, exc_info=exc
         )
+    except Exception as exc:
+        upstream_errors.append(f"{year}: {exc}")
+        logger.warning("Unexpected error loading schedule for %s", year, exc_info=exc)
+    return None
 
-        # Keep events with valid race datetime
-        upcoming = upcoming[upcoming["Session5DateUtc"].notna()]
 
-        if upcoming.empty:
-            continue
+def find_next_race() -> dict[str, Any]:
+    """Find the next (or currently running) race across this and next season."""
 
-        # Separate upcoming and past events
-        upcoming_events = cast(
-            pd.DataFrame, upcoming[upcoming["Session5DateUtc"] >= now]
-        )
+    now = pd.Timestamp.now(tz="UTC")
+    upstream_errors: list[str] = []
+    loaded_years: list[int] = []
 
-        if not upcoming_events.empty:
-            next_event = upcoming_events.sort_values("Session5DateUtc").iloc[0]
-            details = extract_event_details(next_event, year)
-            if details["countdown"] is not None:
-                return details
+    def schedule_for(year: int) -> Optional[Any]:
+        schedule = load_next_race_schedule(year, upstream_errors)
+        if schedule is not None:
+            loaded_years.append(year)
+        return schedule
 
-        # If no future events, but we might be during race (small negative delta)
-        just_started = cast(
-            pd.DataFrame,
-            upcoming[upcoming["Session5DateUtc"] >= now - pd.Timedelta(hours=3)],
-        )
-        if not just_started.empty:
-            current_event = just_started.sort_values("Session5DateUtc").iloc[0]
-            details = extract_event_details(current_event, year)
-            return details
+    found = _event_index.next_race(now, schedule_for)
+    if found is not None:
+        details, race_time = found
+        return {**details, "countdown": get_countdown_components(race_time, now)}
 
-    if not schedule_loaded and upstream_errors:
+    if not loaded_years and upstream_errors:
         raise HTTPException(
             status_code=503,
             detail="Temporarily unable to load schedule from F1 data providers.",
@@ -447,19 +1048,14 @@ def get_next_race():
 
 
 @app.get("/races/{year}")
-def get_races(year: int):
+def get_races(request: Request, year: int):
     """Get all races for a specific year"""
     # Try cache first
     schedule = get_cached_schedule(year)
     if schedule is None:
         try:
-
-            def fetch_schedule():
-                reset_fastf1_state()
-                return fastf1.get_event_schedule(year)
-
             try:
-                schedule = run_with_timeout(fetch_schedule, FASTF1_TIMEOUT)
+                schedule = fetch_schedule(year)
             except TimeoutError:
                 # Try cache one more time
                 schedule = get_cached_schedule(year)
@@ -471,7 +1067,7 @@ def get_races(year: int):
             else:
                 # Store in cache for future requests
                 store_schedule_in_cache(year, schedule)
-        except RateLimitExceededError:
+        except fastf1.req.RateLimitExceededError:
             # Rate limited - try cache one more time
             schedule = get_cached_schedule(year)
             if schedule is None:
@@ -480,385 +1076,310 @@ def get_races(year: int):
                     detail="Rate limit exceeded and no cached data available. Please try again later.",
                 )
 
-    try:
-        races = []
-
-        for _, row in schedule.iterrows():
-            race_date = getattr(row, "Session5DateUtc", None)
-            if race_date is None:
-                continue
-
-            round_number = int(getattr(row, "RoundNumber", 0))
-
-            # Skip round 0 (pre-season testing, etc.)
-            if round_number < 1:
-                continue
-
-            races.append(
-                {
-                    "round": round_number,
-                    "race": getattr(
-                        row, "EventName", getattr(row, "OfficialEventName", "Unknown")
-                    ),
-                    "date": str(race_date.date()),
-                }
-            )
+    key = ("races", year)
+    rendered = _rendered_payloads.get(key)
+    metrics.cache_lookup(
+        "rendered", rendered is not None and rendered.built_from(schedule)
+    )
+    if rendered is None or not rendered.built_from(schedule):
+        try:
+            with metrics.phase(metrics.TRANSFORM):
+                payload = list_races(year, schedule)
+        except Exception as e:
+            return {"error": str(e)}
+        with metrics.phase(metrics.SERIALIZE):
+            rendered = RenderedPayload.render(payload, settled=False, source=schedule)
+        _rendered_payloads.put(key, rendered)
+
+    if _schedule_cache.is_permanent(year):
+        max_age = FINISHED_SEASON_MAX_AGE
+    else:
+        max_age = SCHEDULE_MAX_AGE
+    return http_cache.conditional_response(
+        request, rendered, http_cache.cache_control(max_age)
+    )
 
-        return {"year": year, "races": races}
 
-    except Exception as e:
-        return {"error": str(e)}
+def list_races(year: int, schedule: Any) -> dict[str, Any]:
+    """Build the /races/{year} payload from a season schedule."""
+    races = []
 
+    for _, row in schedule.iterrows():
+        race_date = getattr(row, "Session5DateUtc", None)
+        if race_date is None:
+            continue
 
-@app.get("/race/{year}/{round_num}")
-def get_race_overview(year: int, round_num: int):
-    """Get basic race overview - name, circuit, date, weather"""
-    try:
-        # Validate round number
-        if round_num < 1:
-            raise HTTPException(status_code=400, detail="Round must be 1 or greater")
+        round_number = int(getattr(row, "RoundNumber", 0))
 
-        # Load the race session once and reuse for all detailed endpoints
-        session = get_cached_session(year, round_num)
-        event = getattr(session, "event", None)
+        # Skip round 0 (pre-season testing, etc.)
+        if round_number < 1:
+            continue
 
-        if event is None:
-            # Try cache first
-            schedule = get_cached_schedule(year)
-            if schedule is None:
-                try:
-
-                    def fetch_schedule():
-                        reset_fastf1_state()
-                        return fastf1.get_event_schedule(year)
-
-                    schedule = run_with_timeout(fetch_schedule, FASTF1_TIMEOUT)
-                    store_schedule_in_cache(year, schedule)
-                except (TimeoutError, RateLimitExceededError):
-                    # Fallback: try to get from cache or raise error
-                    schedule = get_cached_schedule(year)
-                    if schedule is None:
-                        raise HTTPException(
-                            status_code=503,
-                            detail="Unable to load schedule data. Please try again later.",
-                        )
-
-            matching_event = schedule[schedule["RoundNumber"] == round_num]
-            if matching_event.empty:
-                raise HTTPException(status_code=404, detail="Race not found")
-            event = matching_event.iloc[0]
-
-        # Get weather data - check if it exists first
-        weather = None
-        if (
-            hasattr(session, "weather_data")
-            and session.weather_data is not None
-            and not session.weather_data.empty
-        ):
-            latest_weather = session.weather_data.iloc[-1]
-            weather = {
-                "airTemp": (
-                    float(latest_weather["AirTemp"])
-                    if pd.notna(latest_weather["AirTemp"])
-                    else None
-                ),
-                "trackTemp": (
-                    float(latest_weather["TrackTemp"])
-                    if pd.notna(latest_weather["TrackTemp"])
-                    else None
-                ),
-                "humidity": (
-                    float(latest_weather["Humidity"])
-                    if pd.notna(latest_weather["Humidity"])
-                    else None
+        races.append(
+            {
+                "round": round_number,
+                "race": getattr(
+                    row, "EventName", getattr(row, "OfficialEventName", "Unknown")
                 ),
+                "date": str(race_date.date()),
             }
+        )
 
-        # Calculate total laps - check if laps data exists
-        total_laps = 0
-        if (
-            hasattr(session, "laps")
-            and session.laps is not None
-            and not session.laps.empty
-        ):
-            max_lap = session.laps["LapNumber"].max()
-            if pd.notna(max_lap):
-                total_laps = int(max_lap)
-
-        # Get race duration (winner's total time)
-        race_time = None
-        if (
-            hasattr(session, "results")
-            and session.results is not None
-            and not session.results.empty
-        ):
-            winner = session.results.iloc[0]
-            if pd.notna(winner["Time"]):
-                race_time = str(winner["Time"])
-
-        # Calculate additional race statistics
-        circuit_length = None
-        if (
-            hasattr(session, "laps")
-            and session.laps is not None
-            and not session.laps.empty
-        ):
-            # Estimate circuit length from fastest lap time
-            fastest_lap = session.laps[session.laps["LapTime"].notna()]["LapTime"].min()
-            if pd.notna(fastest_lap):
-                fastest_time_seconds = fastest_lap.total_seconds()
-                # Estimate circuit length based on average F1 speed (~200 km/h)
-                circuit_length = round((fastest_time_seconds / 3600) * 200, 2)
-
-        # Get number of corners from circuit info
-        num_corners = None
-        try:
-            circuit_info = session.get_circuit_info()
-            if hasattr(circuit_info, "corners") and circuit_info.corners is not None:
-                num_corners = len(circuit_info.corners)
-        except:
-            pass
+    return {"year": year, "races": races}
 
-        # Calculate race distance
-        race_distance = None
-        if circuit_length and total_laps:
-            race_distance = round(circuit_length * total_laps, 2)
 
-        event_date = normalize_datetime(event_get(event, "Session5DateUtc"))
+def resolve_race_event(session: Any, year: int, round_num: int) -> Any:
+    """Return the session's event, falling back to the season schedule."""
+    event = getattr(session, "event", None)
 
-        return {
-            "round": round_num,
-            "raceName": safe_str(event_get(event, "EventName")),
-            "circuitName": safe_str(event_get(event, "Location")),
-            "country": safe_str(event_get(event, "Country")),
-            "date": event_date.date().isoformat() if event_date is not None else None,
-            "totalLaps": total_laps,
-            "raceDuration": race_time,
-            "circuitLength": circuit_length,
-            "numCorners": num_corners,
-            "raceDistance": race_distance,
-            "weather": weather,
+    if event is None:
+        # Try cache first
+        schedule = get_cached_schedule(year)
+        if schedule is None:
+            try:
+                schedule = fetch_schedule(year)
+                store_schedule_in_cache(year, schedule)
+            except (TimeoutError, fastf1.req.RateLimitExceededError):
+                # Fallback: try to get from cache or raise error
+                schedule = get_cached_schedule(year)
+                if schedule is None:
+                    raise HTTPException(
+                        status_code=503,
+                        detail="Unable to load schedule data. Please try again later.",
+                    )
+
+        matching_event = schedule[schedule["RoundNumber"] == round_num]
+        if matching_event.empty:
+            raise HTTPException(status_code=404, detail="Race not found")
+        event = matching_event.iloc[0]
+
+    return event
+
+
+def build_race_overview(session: Any, event: Any, round_num: int) -> dict[str, Any]:
+    """Build the /race/{year}/{round} payload from a loaded session."""
+    # Get weather data - check if it exists first
+    weather = None
+    if (
+        hasattr(session, "weather_data")
+        and session.weather_data is not None
+        and not session.weather_data.empty
+    ):
+        latest_weather = session.weather_data.iloc[-1]
+        weather = {
+            "airTemp": (
+                float(latest_weather["AirTemp"])
+                if pd.notna(latest_weather["AirTemp"])
+                else None
+            ),
+            "trackTemp": (
+                float(latest_weather["TrackTemp"])
+                if pd.notna(latest_weather["TrackTemp"])
+                else None
+            ),
+            "humidity": (
+                float(latest_weather["Humidity"])
+                if pd.notna(latest_weather["Humidity"])
+                else None
+            ),
         }
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # Calculate total laps - check if laps data exists
+    total_laps = 0
+    if hasattr(session, "laps") and session.laps is not None and not session.laps.empty:
+        max_lap = session.laps["LapNumber"].max()
+        if pd.notna(max_lap):
+            total_laps = int(max_lap)
+
+    # Get race duration (winner's total time)
+    race_time = None
+    if (
+        hasattr(session, "results")
+        and session.results is not None
+        and not session.results.empty
+    ):
+        winner = session.results.iloc[0]
+        if pd.notna(winner["Time"]):
+            race_time = str(winner["Time"])
+
+    # Calculate additional race statistics
+    circuit_length = None
+    if hasattr(session, "laps") and session.laps is not None and not session.laps.empty:
+        # Estimate circuit length from fastest lap time
+        fastest_lap = session.laps[session.laps["LapTime"].notna()]["LapTime"].min()
+        if pd.notna(fastest_lap):
+            fastest_time_seconds = fastest_lap.total_seconds()
+            # Estimate circuit length based on average F1 speed (~200 km/h)
+            circuit_length = round((fastest_time_seconds / 3600) * 200, 2)
+
+    # Get number of corners from circuit info
+    num_corners = None
+    try:
+        circuit_info = session.get_circuit_info()
+        if hasattr(circuit_info, "corners") and circuit_info.corners is not None:
+            num_corners = len(circuit_info.corners)
+    except:
+        pass
 
+    # Calculate race distance
+    race_distance = None
+    if circuit_length and total_laps:
+        race_distance = round(circuit_length * total_laps, 2)
 
-@app.get("/race/{year}/{round}/drivers")
-def get_driver_order(year: int, round: int):
-    """Get driver finishing order for a race"""
+    event_date = normalize_datetime(event_get(event, "Session5DateUtc"))
+
+    return {
+        "round": round_num,
+        "raceName": safe_str(event_get(event, "EventName")),
+        "circuitName": safe_str(event_get(event, "Location")),
+        "country": safe_str(event_get(event, "Country")),
+        "date": event_date.date().isoformat() if event_date is not None else None,
+        "totalLaps": total_laps,
+        "raceDuration": race_time,
+        "circuitLength": circuit_length,
+        "numCorners": num_corners,
+        "raceDistance": race_distance,
+        "weather": weather,
+    }
+
+
+@app.get("/race/{year}/{round_num}")
+async def get_race_overview(request: Request, year: int, round_num: int):
+    """Get basic race overview - name, circuit, date, weather"""
     try:
         # Validate round number
-        if round < 1:
+        if round_num < 1:
             raise HTTPException(status_code=400, detail="Round must be 1 or greater")
 
-        # Load the race session using shared cache
-        session = get_cached_session(year, round)
-
-        # Access results after loading - this should now work
-        try:
-            results = session.results
-        except AttributeError as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Results not available after loading session. Error: {str(e)}",
-            )
-
-        # Check if results exist and are not empty
-        if results is None or results.empty:
-            raise HTTPException(
-                status_code=404, detail="No results found for this race"
-            )
+        return await serve_race_section(request, "overview", year, round_num)
 
-        # Get winner's time for calculating gaps
-        winner_time = None
-        if not results.empty and pd.notna(results.iloc[0]["Time"]):
-            winner_time = results.iloc[0]["Time"]
-
-        # Build driver list
-        drivers = []
-        for _, driver in results.iterrows():
-            # Handle position
-            position = int(driver["Position"]) if pd.notna(driver["Position"]) else None
-
-            # Get driver info
-            driver_info = {
-                "position": position,
-                "number": (
-                    int(driver["DriverNumber"])
-                    if pd.notna(driver["DriverNumber"])
-                    else None
-                ),
-                "code": (
-                    str(driver["Abbreviation"])
-                    if pd.notna(driver["Abbreviation"])
-                    else None
-                ),
-                "firstName": (
-                    str(driver["FirstName"]) if pd.notna(driver["FirstName"]) else None
-                ),
-                "lastName": (
-                    str(driver["LastName"]) if pd.notna(driver["LastName"]) else None
-                ),
-                "team": (
-                    str(driver["TeamName"]) if pd.notna(driver["TeamName"]) else None
-                ),
-                "teamColor": (
-                    str(driver["TeamColor"]) if pd.notna(driver["TeamColor"]) else None
-                ),
-                "gridPosition": (
-                    int(driver["GridPosition"])
-                    if pd.notna(driver["GridPosition"])
-                    else None
-                ),
-                "status": str(driver["Status"]) if pd.notna(driver["Status"]) else None,
-                "points": float(driver["Points"]) if pd.notna(driver["Points"]) else 0,
-            }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            # Return time as-is: FastF1 already provides winner's elapsed time and others' gaps
-            if pd.notna(driver["Time"]):
-                driver_time = driver["Time"]
-
-                if position == 1:
-                    # Winner: return elapsed time in HH:MM:SS.mmm format
-                    total_seconds = driver_time.total_seconds()
-                    hours = int(total_seconds // 3600)
-                    minutes = int((total_seconds % 3600) // 60)
-                    seconds = total_seconds % 60
-                    driver_info["time"] = f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
-                else:
-                    # Others: FastF1 Time field is already the gap to winner
-                    gap_seconds = driver_time.total_seconds()
-                    driver_info["time"] = f"+{gap_seconds:.3f}"
-            else:
-                driver_info["time"] = None
 
-            drivers.append(driver_info)
+def build_driver_order(session: Any, year: int, round: int) -> dict[str, Any]:
+    """Build the /drivers payload from a loaded session."""
 
-        # Sort by position
-        drivers.sort(
-            key=lambda x: x["position"] if x["position"] is not None else float("inf")
+    # Access results after loading - this should now work
+    try:
+        results = session.results
+    except AttributeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Results not available after loading session. Error: {str(e)}",
         )
 
-        return {
-            "year": year,
-            "round": round,
-            "raceName": safe_str(
-                event_get(getattr(session, "event", None), "EventName")
-            ),
-            "drivers": drivers,
+    # Check if results exist and are not empty
+    if results is None or results.empty:
+        raise HTTPException(status_code=404, detail="No results found for this race")
+
+    positions = columnar.optional_ints(results["Position"])
+
+    # FastF1 gives the winner's elapsed time and everyone else's gap to them
+    elapsed = columnar.format_durations(results["Time"])
+    gaps = columnar.format_gaps(results["Time"])
+    times = [
+        total if position == 1 else gap
+        for position, total, gap in zip(positions, elapsed, gaps)
+    ]
+
+    drivers = columnar.records(
+        {
+            "position": positions,
+            "number": columnar.optional_ints(results["DriverNumber"]),
+            "code": columnar.optional_strs(results["Abbreviation"]),
+            "firstName": columnar.optional_strs(results["FirstName"]),
+            "lastName": columnar.optional_strs(results["LastName"]),
+            "team": columnar.optional_strs(results["TeamName"]),
+            "teamColor": columnar.optional_strs(results["TeamColor"]),
+            "gridPosition": columnar.optional_ints(results["GridPosition"]),
+            "status": columnar.optional_strs(results["Status"]),
+            "points": columnar.optional_floats(results["Points"], default=0),
+            "time": times,
         }
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        # Log the full error for debugging
-        import traceback
+    # Sort by position, unclassified drivers last
+    drivers.sort(
+        key=lambda x: x["position"] if x["position"] is not None else float("inf")
+    )
 
-        print("Error in get_driver_order:")
-        traceback.print_exc()
-        raise HTTPException(
-            status_code=500, detail=f"Error loading race data: {str(e)}"
-        )
+    return {
+        "year": year,
+        "round": round,
+        "raceName": safe_str(event_get(getattr(session, "event", None), "EventName")),
+        "drivers": drivers,
+    }
 
 
-@app.get("/race/{year}/{round}/positions")
-def get_position_changes(year: int, round: int):
-    """Get lap-by-lap position changes for all drivers"""
+@app.get("/race/{year}/{round}/drivers")
+async def get_driver_order(request: Request, year: int, round: int):
+    """Get driver finishing order for a race"""
     try:
+        # Validate round number
         if round < 1:
             raise HTTPException(status_code=400, detail="Round must be 1 or greater")
 
-        session = get_cached_session(year, round)
-
-        if not hasattr(session, "laps") or session.laps is None or session.laps.empty:
-            raise HTTPException(status_code=404, detail="No lap data found")
-
-        laps = session.laps
+        return await serve_race_section(request, "drivers", year, round)
 
-        # Get team colors from results if available
-        team_colors = {}
-        if (
-            hasattr(session, "results")
-            and session.results is not None
-            and not session.results.empty
-        ):
-            for (
-                _,
-                driver,
-            ) in session.results.iterrows():
-                if pd.notna(driver.get("DriverNumber")) and pd.notna(
-                    driver.get("TeamColor")
-                ):
-                    team_colors[int(driver["DriverNumber"])] = str(driver["TeamColor"])
-
-        # Get unique drivers
-        drivers_data = []
-
-        for driver_number in laps["DriverNumber"].unique():
-            driver_laps = laps[laps["DriverNumber"] == driver_number].sort_values(
-                "LapNumber"
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error in get_driver_order for %s-%s", year, round)
+        raise HTTPException(
+            status_code=500, detail=f"Error loading race data: {str(e)}"
+        )
 
-            if driver_laps.empty:
-                continue
 
-            # Get driver info from first lap
-            first_lap = driver_laps.iloc[0]
+def build_position_changes(session: Any, year: int, round: int) -> dict[str, Any]:
+    """Build the /positions payload from a loaded session."""
 
-            # Build positions array - one position per lap
-            positions = []
-            pit_laps = []
-            dnf_lap = None
+    if not hasattr(session, "laps") or session.laps is None or session.laps.empty:
+        raise HTTPException(status_code=404, detail="No lap data found")
 
-            for _, lap in driver_laps.iterrows():
-                lap_num = int(lap["LapNumber"]) if pd.notna(lap["LapNumber"]) else None
-                position = int(lap["Position"]) if pd.notna(lap["Position"]) else None
+    laps = session.laps
 
-                if lap_num and position:
-                    # Ensure we have entries for all laps (fill gaps if needed)
-                    while len(positions) < lap_num - 1:
-                        positions.append(None)
-                    positions.append(position)
+    # Get team colors from results if available
+    team_colors = {}
+    if (
+        hasattr(session, "results")
+        and session.results is not None
+        and not session.results.empty
+    ):
+        results = session.results
+        numbers = columnar.optional_ints(columnar.column(results, "DriverNumber"))
+        colors = columnar.optional_strs(columnar.column(results, "TeamColor"))
+        team_colors = {
+            number: color
+            for number, color in zip(numbers, colors)
+            if number is not None and color is not None
+        }
 
-                    # Check for pit stop (PitOutTime exists)
-                    if pd.notna(lap.get("PitOutTime")):
-                        pit_laps.append(lap_num)
+    # One pass over the lap columns builds every driver's position row
+    drivers_data = position_matrix.build_position_rows(laps, team_colors)
 
-            driver_num = (
-                int(first_lap["DriverNumber"])
-                if pd.notna(first_lap["DriverNumber"])
-                else None
-            )
+    # Get total laps from the driver who completed the most laps
+    total_laps = max([len(d["positions"]) for d in drivers_data]) if drivers_data else 0
 
-            driver_info = {
-                "driverNumber": driver_num,
-                "code": (
-                    str(first_lap["Driver"]) if pd.notna(first_lap["Driver"]) else None
-                ),
-                "team": str(first_lap["Team"]) if pd.notna(first_lap["Team"]) else None,
-                "teamColor": team_colors.get(driver_num),
-                "positions": positions,
-                "pitLaps": pit_laps,
-                "dnfLap": dnf_lap,
-            }
+    return {
+        "year": year,
+        "round": round,
+        "raceName": safe_str(event_get(getattr(session, "event", None), "EventName")),
+        "totalLaps": total_laps,
+        "drivers": drivers_data,
+    }
 
-            drivers_data.append(driver_info)
 
-        # Get total laps from the driver who completed the most laps
-        total_laps = (
-            max([len(d["positions"]) for d in drivers_data]) if drivers_data else 0
-        )
+@app.get("/race/{year}/{round}/positions")
+async def get_position_changes(request: Request, year: int, round: int):
+    """Get lap-by-lap position changes for all drivers"""
+    try:
+        if round < 1:
+            raise HTTPException(status_code=400, detail="Round must be 1 or greater")
 
-        return {
-            "year": year,
-            "round": round,
-            "raceName": safe_str(
-                event_get(getattr(session, "event", None), "EventName")
-            ),
-            "totalLaps": total_laps,
-            "drivers": drivers_data,
-        }
+        return await serve_race_section(request, "positions", year, round)
 
     except HTTPException:
         raise
@@ -869,221 +1390,37 @@ def get_position_changes(year: int, round: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def build_race_highlights(session: Any, year: int, round: int) -> dict[str, Any]:
+    """Build the /highlights payload from a loaded session."""
+
+    # Get results for winner
+    results = session.results
+    if results is None or results.empty:
+        raise HTTPException(status_code=404, detail="No results found for this race")
+
+    # All lap-based highlights come from one pass over the lap columns
+    lap_highlights = highlights.compute_lap_highlights(
+        getattr(session, "laps", None), results, top_n=HIGHLIGHTS_TOP_N
+    )
+
+    return {
+        "year": year,
+        "round": round,
+        "raceName": safe_str(event_get(getattr(session, "event", None), "EventName")),
+        "winner": highlights.serialize_winner(results),
+        **lap_highlights,
+    }
+
+
 @app.get("/race/{year}/{round}/highlights")
-def get_race_highlights(year: int, round: int):
+async def get_race_highlights(request: Request, year: int, round: int):
     """Get race highlights - winner, fastest lap, fastest pit stop"""
     try:
         # Validate round number
         if round < 1:
             raise HTTPException(status_code=400, detail="Round must be 1 or greater")
 
-        # Load the race session using shared cache
-        session = get_cached_session(year, round)
-
-        # Get results for winner
-        results = session.results
-        if results is None or results.empty:
-            raise HTTPException(
-                status_code=404, detail="No results found for this race"
-            )
-
-        winner = results.iloc[0]
-
-        # Get fastest lap from laps data
-        laps = session.laps
-        fastest_lap_info = None
-        if laps is not None and not laps.empty:
-            # Filter out invalid lap times and find fastest
-            valid_laps = laps[
-                (laps["LapTime"].notna())
-                & (laps["LapTime"] != pd.NaT)
-                & (laps["Deleted"] != True)
-            ]
-
-            if not valid_laps.empty:
-                # Find fastest lap using sort instead of idxmin
-                fastest_lap = valid_laps.sort_values("LapTime").iloc[0]
-                # Get driver info from results
-                driver_number = fastest_lap["DriverNumber"]
-                driver_info = results[results["DriverNumber"] == driver_number]
-
-                if not driver_info.empty:
-                    driver = driver_info.iloc[0]
-                    fastest_lap_info = {
-                        "driverCode": (
-                            str(fastest_lap["Driver"])
-                            if pd.notna(fastest_lap["Driver"])
-                            else None
-                        ),
-                        "driverName": (
-                            f"{driver['FirstName']} {driver['LastName']}"
-                            if pd.notna(driver["FirstName"])
-                            and pd.notna(driver["LastName"])
-                            else str(fastest_lap["Driver"])
-                        ),
-                        "lapNumber": (
-                            int(fastest_lap["LapNumber"])
-                            if pd.notna(fastest_lap["LapNumber"])
-                            else None
-                        ),
-                        "lapTime": (
-                            format_timedelta(fastest_lap["LapTime"])
-                            if pd.notna(fastest_lap["LapTime"])
-                            else None
-                        ),
-                        "team": (
-                            str(fastest_lap["Team"])
-                            if pd.notna(fastest_lap["Team"])
-                            else None
-                        ),
-                        "teamColor": (
-                            str(driver["TeamColor"])
-                            if pd.notna(driver["TeamColor"])
-                            else None
-                        ),
-                    }
-
-        # Get fastest pit stop from laps data
-        fastest_pit_info = None
-        if laps is not None and not laps.empty:
-            # Find laps with complete pit stop data (both PitInTime and PitOutTime exist)
-            pit_laps = laps[
-                (laps["PitInTime"].notna())
-                & (laps["PitOutTime"].notna())
-                & (laps["PitInTime"] != pd.NaT)
-                & (laps["PitOutTime"] != pd.NaT)
-            ]
-
-            if not pit_laps.empty:
-                # Calculate pit stop duration (PitInTime - PitOutTime)
-                pit_laps = pit_laps.copy()
-                pit_laps["PitDuration"] = pit_laps["PitInTime"] - pit_laps["PitOutTime"]
-
-                # Find fastest pit stop using sort instead of idxmin
-                fastest_pit = pit_laps.sort_values("PitDuration").iloc[0]
-                # Get driver info from results
-                driver_number = fastest_pit["DriverNumber"]
-                driver_info = results[results["DriverNumber"] == driver_number]
-
-                if not driver_info.empty:
-                    driver = driver_info.iloc[0]
-                    fastest_pit_info = {
-                        "driverCode": (
-                            str(fastest_pit["Driver"])
-                            if pd.notna(fastest_pit["Driver"])
-                            else None
-                        ),
-                        "driverName": (
-                            f"{driver['FirstName']} {driver['LastName']}"
-                            if pd.notna(driver["FirstName"])
-                            and pd.notna(driver["LastName"])
-                            else str(fastest_pit["Driver"])
-                        ),
-                        "lapNumber": (
-                            int(fastest_pit["LapNumber"])
-                            if pd.notna(fastest_pit["LapNumber"])
-                            else None
-                        ),
-                        "pitDuration": (
-                            format_timedelta(fastest_pit["PitDuration"])
-                            if pd.notna(fastest_pit["PitDuration"])
-                            else None
-                        ),
-                        "team": (
-                            str(fastest_pit["Team"])
-                            if pd.notna(fastest_pit["Team"])
-                            else None
-                        ),
-                        "teamColor": (
-                            str(driver["TeamColor"])
-                            if pd.notna(driver["TeamColor"])
-                            else None
-                        ),
-                    }
-
-        # Get fastest speed from laps data
-        fastest_speed_info = None
-        if laps is not None and not laps.empty:
-            # Find laps with valid speed data (SpeedFL - Speed at Finish Line)
-            speed_laps = laps[(laps["SpeedFL"].notna()) & (laps["SpeedFL"] != pd.NaT)]
-
-            if not speed_laps.empty:
-                # Find fastest speed
-                fastest_speed = speed_laps.loc[speed_laps["SpeedFL"].idxmax()]
-                # Get driver info from results
-                driver_number = fastest_speed["DriverNumber"]
-                driver_info = results[results["DriverNumber"] == driver_number]
-
-                if not driver_info.empty:
-                    driver = driver_info.iloc[0]
-                    fastest_speed_info = {
-                        "driverCode": (
-                            str(fastest_speed["Driver"])
-                            if pd.notna(fastest_speed["Driver"])
-                            else None
-                        ),
-                        "driverName": (
-                            f"{driver['FirstName']} {driver['LastName']}"
-                            if pd.notna(driver["FirstName"])
-                            and pd.notna(driver["LastName"])
-                            else str(fastest_speed["Driver"])
-                        ),
-                        "lapNumber": (
-                            int(fastest_speed["LapNumber"])
-                            if pd.notna(fastest_speed["LapNumber"])
-                            else None
-                        ),
-                        "speed": (
-                            float(fastest_speed["SpeedFL"])
-                            if pd.notna(fastest_speed["SpeedFL"])
-                            else None
-                        ),
-                        "team": (
-                            str(fastest_speed["Team"])
-                            if pd.notna(fastest_speed["Team"])
-                            else None
-                        ),
-                        "teamColor": (
-                            str(driver["TeamColor"])
-                            if pd.notna(driver["TeamColor"])
-                            else None
-                        ),
-                    }
-
-        return {
-            "year": year,
-            "round": round,
-            "raceName": safe_str(
-                event_get(getattr(session, "event", None), "EventName")
-            ),
-            "winner": {
-                "driverCode": (
-                    str(winner["Abbreviation"])
-                    if pd.notna(winner["Abbreviation"])
-                    else None
-                ),
-                "driverName": (
-                    f"{winner['FirstName']} {winner['LastName']}"
-                    if pd.notna(winner["FirstName"]) and pd.notna(winner["LastName"])
-                    else None
-                ),
-                "raceTime": (
-                    format_timedelta(winner["Time"])
-                    if pd.notna(winner["Time"])
-                    else None
-                ),
-                "team": (
-                    str(winner["TeamName"]) if pd.notna(winner["TeamName"]) else None
-                ),
-                "teamColor": (
-                    str(winner["TeamColor"]) if pd.notna(winner["TeamColor"]) else None
-                ),
-                "points": float(winner["Points"]) if pd.notna(winner["Points"]) else 0,
-            },
-            "fastestLap": fastest_lap_info,
-            "fastestPitStop": fastest_pit_info,
-            "fastestSpeed": fastest_speed_info,
-        }
+        return await serve_race_section(request, "highlights", year, round)
 
     except HTTPException:
         raise
@@ -1094,3 +1431,239 @@ def get_race_highlights(year: int, round: int):
         raise HTTPException(
             status_code=500, detail=f"Error loading race highlights: {str(e)}"
         )
+
+
+BUNDLE_SECTIONS: tuple[str, ...] = ("overview", "drivers", "positions", "highlights")
+
+# Session components each section reads; results are always loaded
+SECTION_COMPONENTS = {
+    "overview": {LAPS, WEATHER, CIRCUIT_INFO},
+    "drivers": set(),
+    "positions": {LAPS},
+    "highlights": {LAPS},
+}
+
+
+def parse_bundle_include(include: Optional[str]) -> list[str]:
+    """Parse a comma-separated include list, defaulting to every section."""
+    if include is None or not include.strip():
+        return list(BUNDLE_SECTIONS)
+
+    requested = [part.strip().lower() for part in include.split(",") if part.strip()]
+    unknown = [part for part in requested if part not in BUNDLE_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Unknown bundle section(s): {', '.join(unknown)}. "
+                f"Valid sections: {', '.join(BUNDLE_SECTIONS)}"
+            ),
+        )
+
+    # Keep canonical order and drop duplicates
+    return [section for section in BUNDLE_SECTIONS if section in requested]
+
+
+def build_bundle_section(
+    section: str, session: Any, year: int, round: int
+) -> dict[str, Any]:
+    """Build and persist one bundle section from an already loaded session."""
+    if section == "overview":
+        event = resolve_race_event(session, year, round)
+        payload = build_race_overview(session, event, round)
+    else:
+        event = getattr(session, "event", None)
+        if section == "drivers":
+            payload = build_driver_order(session, year, round)
+        elif section == "positions":
+            payload = build_position_changes(session, year, round)
+        else:
+            payload = build_race_highlights(session, year, round)
+
+    return store_payload(year, round, section, payload, event)
+
+
+def render_bundle(
+    fields: list[tuple[str, bytes]], settled: bool, session: Any
+) -> RenderedPayload:
+    with metrics.phase(metrics.SERIALIZE):
+        return RenderedPayload.from_body(
+            http_cache.compose_object(fields), settled, session
+        )
+
+
+async def build_race_bundle(
+    year: int, round: int, sections: list[str]
+) -> RenderedPayload:
+    """Build the requested bundle sections from at most one session load."""
+    sync_shared_cache()
+    key = ("bundle", year, round, tuple(sections))
+    bundle = _rendered_payloads.get(key)
+    if bundle is not None and bundle.settled:
+        return bundle
+
+    rendered: dict[str, RenderedPayload] = {}
+    errors: dict[str, dict[str, Any]] = {}
+
+    missing = []
+    for section in sections:
+        cached = await prebuilt_section(section, year, round)
+        if cached is not None:
+            rendered[section] = cached
+        else:
+            missing.append(section)
+
+    session = None
+    if missing:
+        components = set().union(*(SECTION_COMPONENTS[name] for name in missing))
+        session = await load_race_session(year, round, components)
+        if bundle is not None and bundle.built_from(session):
+            return bundle
+
+        for section in missing:
+            try:
+                rendered[section] = await session_section(section, session, year, round)
+            except HTTPException as exc:
+                errors[section] = {"status": exc.status_code, "detail": exc.detail}
+            except Exception as exc:
+                logger.exception(
+                    "Error building %s for bundle %s-%s", section, year, round
+                )
+                errors[section] = {"status": 500, "detail": str(exc)}
+
+    # Splice the section bodies in as-is instead of re-serializing them
+    fields = [
+        ("year", http_cache.render_json(year)),
+        ("round", http_cache.render_json(round)),
+    ]
+    for section in sections:
+        body = rendered[section].body if section in rendered else b"null"
+        fields.append((section, body))
+    if errors:
+        fields.append(("errors", http_cache.render_json(errors)))
+
+    settled = not errors and all(part.settled for part in rendered.values())
+    # Compress off the event loop; bundles with errors are never reused
+    bundle = await run_build(
+        render_bundle, fields, settled, None if errors else session
+    )
+    return _rendered_payloads.put(key, bundle)
+
+
+@app.get("/race/{year}/{round}/bundle")
+async def get_race_bundle(
+    request: Request, year: int, round: int, include: Optional[str] = None
+):
+    """Get overview, drivers, positions and highlights from one session load"""
+    if round < 1:
+        raise HTTPException(status_code=400, detail="Round must be 1 or greater")
+
+    sections = parse_bundle_include(include)
+
+    rendered = await until_disconnected(
+        request,
+        _coalescer.run(
+            ("bundle", year, round, tuple(sections)),
+            lambda: build_race_bundle(year, round, sections),
+        ),
+    )
+    if isinstance(rendered, Response):
+        return rendered
+    return race_response(request, rendered)
+
+
+# Background prefetch (prefetch.py): after each race, poll it every
+# PREFETCH_POLL_INTERVAL seconds from PREFETCH_FIRST_POLL_HOURS after the
+# start until its data is complete (giving up after PREFETCH_POLL_WINDOW_HOURS)
+# and build its payloads; on startup, warm the latest PREFETCH_WARM_RACES.
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+PREFETCH_WARM_RACES = int(os.getenv("PREFETCH_WARM_RACES", "3"))
+PREFETCH_FIRST_POLL_HOURS = float(os.getenv("PREFETCH_FIRST_POLL_HOURS", "2"))
+PREFETCH_POLL_INTERVAL = float(os.getenv("PREFETCH_POLL_INTERVAL", "600"))
+PREFETCH_POLL_WINDOW_HOURS = float(os.getenv("PREFETCH_POLL_WINDOW_HOURS", "48"))
+
+
+async def prefetch_race_times(year: int) -> list[tuple[int, "pd.Timestamp"]]:
+    """Round numbers and race start times of a season."""
+    schedule = get_cached_schedule(year)
+    if schedule is None:
+        schedule = await asyncio.to_thread(fetch_schedule, year)
+        store_schedule_in_cache(year, schedule)
+    season = _event_index.season(year, schedule)
+    return [
+        (event["round"], race_time)
+        for event, race_time in zip(season.events, season.race_times)
+    ]
+
+
+def race_data_complete(session: Any) -> bool:
+    """Whether a loaded race has its classification and, if loaded, its laps."""
+    results = getattr(session, "results", None)
+    if results is None or results.empty or "Position" not in results.columns:
+        return False
+    if not results["Position"].notna().any():
+        return False
+    if not session.covers([LAPS]):
+        return True
+    laps = getattr(session, "laps", None)
+    return laps is not None and not laps.empty
+
+
+async def prefetch_poll(year: int, round: int) -> bool:
+    """Reload a finished race and build its payloads once its data is complete."""
+    if open_stored_race(year, round) is None:
+        # Whatever is cached may predate the results being published
+        await asyncio.to_thread(fastf1_cache.forget_race_results, year, round)
+        _session_cache.invalidate(_normalize_cache_key(year, round))
+
+        # Results only first: cheap while Ergast has nothing yet
+        session = await load_race_session(year, round, ())
+        if not race_data_complete(session):
+            return False
+        session = await load_race_session(year, round)
+        if not race_data_complete(session):
+            return False
+        # Replace sections rendered (and shared) from incomplete data
+        for section in BUNDLE_SECTIONS:
+            await session_section(section, session, year, round)
+
+    await prefetch_warm(year, round)
+    return True
+
+
+async def prefetch_warm(year: int, round: int) -> None:
+    """Build a race's sections and bundle as the endpoints would; raise on errors."""
+    for section in BUNDLE_SECTIONS:
+        await _coalescer.run(
+            (section, year, round),
+            lambda section=section: compute_race_section(section, year, round),
+        )
+    sections = list(BUNDLE_SECTIONS)
+    await _coalescer.run(
+        ("bundle", year, round, tuple(sections)),
+        lambda: build_race_bundle(year, round, sections),
+    )
+
+
+def upstream_idle() -> bool:
+    """Whether the upstream executor has a free worker and nothing queued."""
+    stats = _upstream_executor.stats()
+    return stats["queued"] == 0 and stats["running"] < _upstream_executor.max_workers
+
+
+_prefetch = PrefetchScheduler(
+    race_times=prefetch_race_times,
+    poll=prefetch_poll,
+    warm=prefetch_warm,
+    has_capacity=upstream_idle,
+    warm_races=PREFETCH_WARM_RACES,
+    first_poll_after=PREFETCH_FIRST_POLL_HOURS * 3600,
+    poll_interval=PREFETCH_POLL_INTERVAL,
+    poll_window=PREFETCH_POLL_WINDOW_HOURS * 3600,
+    # One worker per machine runs the schedule
+    locks=(
+        _disk_cache.locks
+        if _disk_cache is not None
+        else KeyedFileLock(Path(tempfile.gettempdir()) / "f1-backend-locks")
+    ),
+)
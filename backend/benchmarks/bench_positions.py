@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Check the columnar /positions builder against the old per-driver loop.
+
+First verifies that ``build_position_rows`` produces exactly the same driver
+entries as the original implementation on a range of synthetic sessions, then
+times both on a full 70-lap, 20-driver race:
+
+    python benchmarks/bench_positions.py --repeat 20
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from position_matrix import build_position_rows  # noqa: E402
+from synthetic import PROFILES, make_session  # noqa: E402
+
+
+def legacy_position_rows(
+    laps: Any, team_colors: dict[Any, str]
+) -> list[dict[str, Any]]:
+    """The pre-vectorization implementation, kept verbatim as a reference."""
+    drivers_data = []
+
+    for driver_number in laps["DriverNumber"].unique():
+        driver_laps = laps[laps["DriverNumber"] == driver_number].sort_values(
+            "LapNumber"
+        )
+
+        if driver_laps.empty:
+            continue
+
+        first_lap = driver_laps.iloc[0]
+
+        positions = []
+        pit_laps = []
+        dnf_lap = None
+
+        for _, lap in driver_laps.iterrows():
+            lap_num = int(lap["LapNumber"]) if pd.notna(lap["LapNumber"]) else None
+            position = int(lap["Position"]) if pd.notna(lap["Position"]) else None
+
+            if lap_num and position:
+                while len(positions) < lap_num - 1:
+                    positions.append(None)
+                positions.append(position)
+
+                if pd.notna(lap.get("PitOutTime")):
+                    pit_laps.append(lap_num)
+
+        driver_num = (
+            int(first_lap["DriverNumber"])
+            if pd.notna(first_lap["DriverNumber"])
+            else None
+        )
+
+        drivers_data.append(
+            {
+                "driverNumber": driver_num,
+                "code": (
+                    str(first_lap["Driver"]) if pd.notna(first_lap["Driver"]) else None
+                ),
+                "team": str(first_lap["Team"]) if pd.notna(first_lap["Team"]) else None,
+                "teamColor": team_colors.get(driver_num),
+                "positions": positions,
+                "pitLaps": pit_laps,
+                "dnfLap": dnf_lap,
+            }
+        )
+
+    return drivers_data
+
+
+def team_colors_for(session: Any) -> dict[int, str]:
+    return {
+        int(number): str(color)
+        for number, color in zip(
+            session.results["DriverNumber"], session.results["TeamColor"]
+        )
+    }
+
+
+def check_equivalence(seeds: int) -> int:
+    checked = 0
+    for profile in PROFILES:
+        for seed in range(seeds):
+            session = make_session(profile, seed=seed)
+            laps = session.laps
+            colors = team_colors_for(session)
+
+            variants = {
+                "as loaded": laps,
+                "shuffled rows": laps.sample(frac=1.0, random_state=seed),
+                "no pit column": laps.drop(columns=["PitOutTime"]),
+            }
+            for label, frame in variants.items():
+                expected = legacy_position_rows(frame, colors)
+                actual = build_position_rows(frame, colors)
+                if expected != actual:
+                    raise AssertionError(
+                        f"{profile} seed={seed} ({label}): outputs differ"
+                    )
+                checked += 1
+    return checked
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Check the columnar /positions builder against the old per-driver loop."
+    )
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    try:
+        checked = check_equivalence(args.seeds)
+    except AssertionError as exc:
+        logging.error("FAILED: %s", exc)
+        return 1
+    logging.info("equivalence: %d session variants match", checked)
+
+    session = make_session("full", seed=0)
+    colors = team_colors_for(session)
+    laps = session.laps
+
+    legacy = min(
+        timeit.repeat(
+            lambda: legacy_position_rows(laps, colors), number=1, repeat=args.repeat
+        )
+    )
+    columnar = min(
+        timeit.repeat(
+            lambda: build_position_rows(laps, colors), number=1, repeat=args.repeat
+        )
+    )
+    logging.info(
+        "full race (%d laps x %d drivers, %d rows): legacy %.2f ms, "
+        "columnar %.2f ms, %.0fx faster",
+        PROFILES["full"].laps,
+        PROFILES["full"].drivers,
+        len(laps),
+        legacy * 1000,
+        columnar * 1000,
+        legacy / columnar,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
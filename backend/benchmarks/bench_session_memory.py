@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Compare the memory of raw and compacted race sessions.
+
+For each synthetic race profile this builds a FastF1-shaped session, reduces
+it with ``compact_session.compact`` as the session cache does, and reports
+the deep memory of both (tables, event and circuit info) plus how many
+compact sessions fit in the memory of one raw one. It also checks that the
+overview, /drivers, /positions and /highlights payloads come out
+byte-for-byte the same from both, so a downcast that changes a value fails
+the run:
+
+    python benchmarks/bench_session_memory.py
+
+Synthetic sessions have FastF1's columns and millisecond timing, but speed
+traps at 0.1 km/h where FastF1 reports whole km/h, so their speed columns
+stay float64. The full profile is therefore also measured with its speeds
+rounded to whole km/h, as in a real session.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+BACKEND = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Nothing may touch the network or the disk caches
+for name in ("FASTF1_CACHE", "SHARED_CACHE_PATH", "PAYLOAD_STORE_DIR", "LAP_STORE_DIR"):
+    os.environ[name] = ""
+os.environ["PROFILING_ENABLED"] = ""
+os.environ["PREFETCH_ENABLED"] = ""
+
+import pandas as pd  # noqa: E402
+
+import app  # noqa: E402
+import compact_session  # noqa: E402
+from http_cache import render_json  # noqa: E402
+from session_profiles import FULL, LoadedSession  # noqa: E402
+from synthetic import PROFILES, make_session  # noqa: E402
+
+# Rounds in a season, for the season-in-one-session comparison
+SEASON_ROUNDS = 24
+SPEED_COLUMNS = ("SpeedI1", "SpeedI2", "SpeedFL", "SpeedST")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BACKEND,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def deep_size(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    return sys.getsizeof(value)
+
+
+def session_size(session: Any) -> int:
+    total = 0
+    for name in ("laps", "results", "weather_data", "event"):
+        table = getattr(session, name, None)
+        if table is not None:
+            total += deep_size(table)
+    circuit_info = session.get_circuit_info()
+    corners: Optional[Any] = getattr(circuit_info, "corners", None)
+    if corners is not None:
+        total += deep_size(corners)
+    return total
+
+
+def payloads(session: Any, year: int, round_num: int) -> list[bytes]:
+    event = app.resolve_race_event(session, year, round_num)
+    return [
+        render_json(app.build_race_overview(session, event, round_num)),
+        render_json(app.build_driver_order(session, year, round_num)),
+        render_json(app.build_position_changes(session, year, round_num)),
+        render_json(app.build_race_highlights(session, year, round_num)),
+    ]
+
+
+def measure(profile: str, seed: int, whole_speeds: bool = False) -> dict[str, Any]:
+    synthetic = make_session(profile, seed=seed)
+    if whole_speeds:
+        for column in SPEED_COLUMNS:
+            synthetic.laps[column] = synthetic.laps[column].round()
+    raw = LoadedSession(synthetic, FULL, synthetic.get_circuit_info())
+    compact = compact_session.compact(raw)
+
+    assert compact.laps is not None
+    raw_bytes = session_size(raw)
+    compact_bytes = session_size(compact)
+    return {
+        "profile": profile + (" (whole km/h)" if whole_speeds else ""),
+        "laps": len(raw.laps),
+        "rawBytes": raw_bytes,
+        "compactBytes": compact_bytes,
+        "ratio": round(raw_bytes / compact_bytes, 2),
+        "samePayloads": payloads(raw, 2024, 1) == payloads(compact, 2024, 1),
+        "lapDtypes": {
+            column: str(dtype) for column, dtype in compact.laps.dtypes.items()
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare the memory of raw and compacted race sessions."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results file (default: benchmarks/results/session-memory-<commit>.json)",
+    )
+    args = parser.parse_args()
+
+    cases = [measure(profile, args.seed) for profile in PROFILES]
+    cases.append(measure("full", args.seed, whole_speeds=True))
+    for case in cases:
+        logging.info(
+            "%-23s %5d laps: raw %7.1f KiB, compact %6.1f KiB (%.1fx)%s",
+            case["profile"],
+            case["laps"],
+            case["rawBytes"] / 1024,
+            case["compactBytes"] / 1024,
+            case["ratio"],
+            "" if case["samePayloads"] else "  PAYLOADS DIFFER",
+        )
+
+    # A season of full-length races against one raw race
+    seasons = {}
+    for full in (case for case in cases if case["profile"].startswith("full")):
+        season_bytes = full["compactBytes"] * SEASON_ROUNDS
+        seasons[full["profile"]] = season_bytes
+        logging.info(
+            "%d compact races (%s): %.1f KiB, %.2fx one raw race",
+            SEASON_ROUNDS,
+            full["profile"],
+            season_bytes / 1024,
+            season_bytes / full["rawBytes"],
+        )
+
+    commit = git_commit()
+    report = {
+        "benchmark": "session-memory",
+        "commit": commit,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "seasonRounds": SEASON_ROUNDS,
+        "seasonCompactBytes": seasons,
+        "cases": cases,
+    }
+    output = args.output or RESULTS_DIR / f"session-memory-{commit[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    logging.info("wrote %s", output)
+    return 0 if all(case["samePayloads"] for case in cases) else 1
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Measure how long the backend takes to import and to start answering.
+
+Two measurements, each from fresh processes:
+
+* ``import``: wall time of ``import app`` in a new interpreter, which is what
+  a uvicorn worker does before it can bind the port;
+* ``server``: from spawning ``uvicorn app:app`` until ``/health`` first
+  answers 200, and until ``/ready`` does (the warmup has loaded FastF1 and
+  pandas). Trees without ``/ready`` report null for it.
+
+FastF1, the shared cache, the payload and lap stores and the prefetch
+scheduler all point at a scratch directory or are off, so nothing goes to
+the network. Pass ``--backend`` to measure another checkout of backend/ (say
+a ``git worktree`` of an older commit) for a before/after comparison:
+
+    python benchmarks/bench_startup.py --backend /tmp/before/backend
+    python benchmarks/bench_startup.py
+
+Cold starts on a machine waking from stop are slower than these numbers
+(the page cache is cold too), but the ratio is what matters.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+BACKEND = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+IMPORT_PROBE = (
+    "import time; started = time.perf_counter(); import app; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def git_commit(path: Path) -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=path,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def scratch_env(scratch: Path) -> dict[str, str]:
+    return dict(
+        os.environ,
+        FASTF1_CACHE=str(scratch / "f1_cache"),
+        SHARED_CACHE_PATH=str(scratch / "shared_cache.sqlite"),
+        PAYLOAD_STORE_DIR="",
+        LAP_STORE_DIR="",
+        PROFILING_ENABLED="",
+        PREFETCH_ENABLED="",
+    )
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    return {
+        "minSeconds": round(min(samples), 4),
+        "medianSeconds": round(statistics.median(samples), 4),
+        "maxSeconds": round(max(samples), 4),
+    }
+
+
+def time_import(backend: Path, env: dict[str, str]) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=backend,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status_of(port: int, path: str) -> Optional[int]:
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        conn.request("GET", path)
+        status = conn.getresponse().status
+        conn.close()
+        return status
+    except OSError:
+        return None
+
+
+def time_server(
+    backend: Path, env: dict[str, str], timeout: float
+) -> dict[str, Optional[float]]:
+    """Seconds from spawning uvicorn until /health, then /ready, answer 200."""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=backend,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    timings: dict[str, Optional[float]] = {"health": None, "ready": None}
+    try:
+        deadline = started + timeout
+        for name, path in (("health", "/health"), ("ready", "/ready")):
+            while time.perf_counter() < deadline:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with {process.returncode}")
+                status = status_of(port, path)
+                if status == 200:
+                    timings[name] = time.perf_counter() - started
+                    break
+                if status == 404:
+                    # No /ready on this tree
+                    break
+                time.sleep(0.01)
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure how long the backend takes to import and to start answering."
+    )
+    parser.add_argument(
+        "--backend", type=Path, default=BACKEND, help="backend/ directory to measure"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--timeout", type=float, default=60, help="Seconds to wait for the server"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results file (default: benchmarks/results/startup-<commit>.json)",
+    )
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    backend = args.backend.resolve()
+
+    imports: list[float] = []
+    health: list[float] = []
+    ready: list[float] = []
+    with tempfile.TemporaryDirectory() as scratch:
+        env = scratch_env(Path(scratch))
+        # One untimed run to fill the page cache and write bytecode
+        time_import(backend, env)
+        for _ in range(args.repeat):
+            imports.append(time_import(backend, env))
+        for _ in range(args.repeat):
+            timings = time_server(backend, env, args.timeout)
+            if timings["health"] is None:
+                raise RuntimeError(f"/health did not answer within {args.timeout}s")
+            health.append(timings["health"])
+            if timings["ready"] is not None:
+                ready.append(timings["ready"])
+
+    commit = git_commit(backend)
+    report: dict[str, Any] = {
+        "benchmark": "startup",
+        "commit": commit,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "import": summarize(imports),
+        "health": summarize(health),
+        "ready": summarize(ready) if ready else None,
+    }
+    logging.info(
+        "import app %.3fs, /health after %.3fs, /ready after %s (median)",
+        report["import"]["medianSeconds"],
+        report["health"]["medianSeconds"],
+        f"{report['ready']['medianSeconds']:.3f}s" if ready else "n/a",
+    )
+
+    output = args.output or RESULTS_DIR / f"startup-{commit[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    logging.info("wrote %s", output)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Time the race endpoint transforms on synthetic sessions and record the results.
+
+Builds synthetic sessions from a sprint up to a wet 78-lap Monaco with 22
+drivers, then times the builders behind /race/{year}/{round} (overview),
+/drivers, /positions and /highlights, plus JSON serialization of what they
+return. Runs offline: FastF1, the payload store, the lap store and the
+shared cache are all disabled before the app is imported.
+
+The results (with the commit, interpreter and library versions) are written
+as JSON; pass an earlier results file to --compare to flag cases whose
+fastest run slowed down by more than --threshold. Compare runs from the same
+quiet machine only, timings on shared CI runners drift by tens of percent:
+
+    python benchmarks/bench_transforms.py --output before.json
+    python benchmarks/bench_transforms.py --compare before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Nothing may touch the network or the disk caches while benchmarking
+for name in ("FASTF1_CACHE", "SHARED_CACHE_PATH", "PAYLOAD_STORE_DIR", "LAP_STORE_DIR"):
+    os.environ[name] = ""
+os.environ["PROFILING_ENABLED"] = ""
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import app  # noqa: E402
+from http_cache import render_json  # noqa: E402
+from synthetic import PROFILES, make_session  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SCENARIOS = ["sprint", "standard", "full", "monaco", "grid22", "monaco_wet"]
+YEAR = 2024
+
+
+def _overview(session: Any, year: int, round_num: int) -> dict[str, Any]:
+    event = app.resolve_race_event(session, year, round_num)
+    return app.build_race_overview(session, event, round_num)
+
+
+TRANSFORMS: dict[str, Callable[[Any, int, int], dict[str, Any]]] = {
+    "overview": _overview,
+    "drivers": app.build_driver_order,
+    "positions": app.build_position_changes,
+    "highlights": app.build_race_highlights,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BACKEND,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Millisecond statistics of per-call timings given in seconds."""
+    ms = sorted(sample * 1000 for sample in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return {
+        "minMs": round(ms[0], 4),
+        "medianMs": round(statistics.median(ms), 4),
+        "meanMs": round(statistics.fmean(ms), 4),
+        "p95Ms": round(p95, 4),
+        "stdevMs": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+    }
+
+
+def time_calls(func: Callable[[], Any], repeat: int, min_seconds: float) -> list[float]:
+    """Per-call seconds of ``repeat`` samples, each looping for ``min_seconds``.
+
+    Single calls take well under a millisecond, so each sample averages as
+    many calls as fit in ``min_seconds`` to keep timer and scheduler noise out.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_seconds:
+        number *= 2
+    return [total / number for total in timer.repeat(repeat=repeat, number=number)]
+
+
+def bench_scenario(
+    scenario: str, repeat: int, min_seconds: float, seed: int
+) -> list[dict[str, Any]]:
+    session = make_session(scenario, seed=seed, year=YEAR)
+    spec = PROFILES[scenario]
+    pit_stops = int(session.laps["PitInTime"].notna().sum())
+    rows = []
+    for transform, build in TRANSFORMS.items():
+        payload = build(session, YEAR, 1)
+        body = render_json(payload)
+        rows.append(
+            {
+                "scenario": scenario,
+                "transform": transform,
+                "laps": spec.laps,
+                "drivers": spec.drivers,
+                "lapRows": len(session.laps),
+                "pitStops": pit_stops,
+                "payloadBytes": len(body),
+                "repeat": repeat,
+                "build": summarize(
+                    time_calls(lambda: build(session, YEAR, 1), repeat, min_seconds)
+                ),
+                "serialize": summarize(
+                    time_calls(lambda: render_json(payload), repeat, min_seconds)
+                ),
+            }
+        )
+    return rows
+
+
+def compare(
+    current: list[dict[str, Any]], baseline_path: Path, threshold: float
+) -> list[str]:
+    """Log the change against a baseline; return the regressed cases."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(row["scenario"], row["transform"]): row for row in baseline["results"]}
+    regressions = []
+    for row in current:
+        key = (row["scenario"], row["transform"])
+        if key not in before:
+            continue
+        old = before[key]["build"]["minMs"]
+        new = row["build"]["minMs"]
+        ratio = new / old if old else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(f"{key[0]}/{key[1]}")
+        logging.info(
+            "%-11s %-10s %9.3f ms -> %9.3f ms (%+.0f%%)%s",
+            key[0],
+            key[1],
+            old,
+            new,
+            (ratio - 1) * 100,
+            flag,
+        )
+    logging.info(
+        "compared with %s (commit %s)",
+        baseline_path,
+        baseline.get("commit", "unknown")[:12],
+    )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Time the race endpoint transforms on synthetic sessions and record the results."
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(DEFAULT_SCENARIOS),
+        help=f"Comma-separated synthetic profiles (known: {', '.join(PROFILES)})",
+    )
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="Seconds each sample loops for (calls per sample are calibrated)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        help="Results file (default: benchmarks/results/transforms-<commit>.json)",
+    )
+    parser.add_argument("--compare", type=Path, help="Earlier results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Slowdown of the fastest run that counts as a regression with --compare",
+    )
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in scenarios if name not in PROFILES]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    results = []
+    for scenario in scenarios:
+        for row in bench_scenario(scenario, args.repeat, args.min_time, args.seed):
+            results.append(row)
+            logging.info(
+                "%-11s %-10s build %9.3f ms  serialize %7.3f ms (median)  %7d bytes",
+                scenario,
+                row["transform"],
+                row["build"]["medianMs"],
+                row["serialize"]["medianMs"],
+                row["payloadBytes"],
+            )
+
+    commit = git_commit()
+    report = {
+        "benchmark": "transforms",
+        "commit": commit,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"transforms-{commit[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    logging.info("wrote %s", output)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            logging.error("regressed: %s", ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
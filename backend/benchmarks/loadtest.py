@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""Replay realistic traffic against the backend and report latency and errors.
+
+By default this starts a mock upstream (mock_upstream.py) and a backend
+wired to it through FASTF1_UPSTREAM_URL, each in a scratch directory, so no
+request reaches the real F1 services. Virtual users then follow one of the
+traffic mixes:
+
+* ``race-burst``: everyone opens the latest race's page at once, as when a
+  race has just finished;
+* ``next-race``: home page visitors polling /next-race;
+* ``browse``: a season's race list, then a random race page;
+* ``mixed``: race pages, home page polls and browsing side by side.
+
+Requests pass through a gate modelling the Fly proxy limits (``--soft-limit``
+and ``--hard-limit`` concurrent requests per machine): beyond the hard limit
+a request waits for a slot, and that wait counts towards its latency.
+
+    python benchmarks/loadtest.py --mix race-burst --clients 40 --duration 60 \\
+        --upstream-latency-ms 400 --upstream-rate-limit 4
+
+Throughput, tail latency and error rates per route are logged and written
+as JSON; point --app-url at a running backend to skip the local setup.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import mock_upstream  # noqa: E402
+
+BACKEND = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+MIXES = ("race-burst", "next-race", "browse", "mixed")
+# Journey weights of the mixed traffic
+MIXED_WEIGHTS = {"race_page": 0.5, "home": 0.3, "browse": 0.2}
+
+_NUMBER_SEGMENT = re.compile(r"/\d+")
+
+
+def route_of(path: str) -> str:
+    """``/race/2025/3/bundle`` -> ``/race/{n}/{n}/bundle`` for grouping."""
+    return _NUMBER_SEGMENT.sub("/{n}", path.split("?", 1)[0])
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class FlyProxy:
+    """Concurrency gate like Fly's per-machine ``soft_limit``/``hard_limit``.
+
+    Requests beyond the hard limit wait for a slot. Time spent above the
+    soft limit (when Fly would start preferring other machines) is tracked.
+    """
+
+    def __init__(self, soft_limit: int, hard_limit: int):
+        self.soft_limit = soft_limit
+        self.hard_limit = hard_limit
+        self._slots = threading.BoundedSemaphore(hard_limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self._over_soft_since: Optional[float] = None
+        self.over_soft_seconds = 0.0
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        started = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - started
+        self._change(+1)
+        try:
+            yield waited
+        finally:
+            self._change(-1)
+            self._slots.release()
+
+    def _change(self, delta: int) -> None:
+        with self._lock:
+            self.in_flight += delta
+            self.peak = max(self.peak, self.in_flight)
+            now = time.monotonic()
+            if self.in_flight > self.soft_limit and self._over_soft_since is None:
+                self._over_soft_since = now
+            elif self.in_flight <= self.soft_limit and self._over_soft_since:
+                self.over_soft_seconds += now - self._over_soft_since
+                self._over_soft_since = None
+
+
+@dataclass
+class Sample:
+    route: str
+    status: int
+    seconds: float
+    queued: float
+    size: int
+
+
+@dataclass
+class Recorder:
+    samples: list[Sample] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add(self, sample: Sample) -> None:
+        with self.lock:
+            self.samples.append(sample)
+
+
+class Client:
+    """One virtual user with a keep-alive connection to the backend."""
+
+    def __init__(
+        self,
+        base_url: str,
+        proxy: FlyProxy,
+        recorder: Recorder,
+        timeout: float,
+        accept_encoding: str = "br, gzip",
+    ):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.proxy = proxy
+        self.recorder = recorder
+        self.timeout = timeout
+        self.accept_encoding = accept_encoding
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def get(self, path: str) -> tuple[int, bytes]:
+        """GET ``path``; status 0 means the connection failed or timed out."""
+        with self.proxy.slot() as queued:
+            started = time.perf_counter()
+            status, body = self._request(path)
+            elapsed = time.perf_counter() - started
+        self.recorder.add(
+            Sample(route_of(path), status, elapsed + queued, queued, len(body))
+        )
+        return status, body
+
+    def _request(self, path: str) -> tuple[int, bytes]:
+        for attempt in range(2):
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            try:
+                self._conn.request(
+                    "GET", path, headers={"Accept-Encoding": self.accept_encoding}
+                )
+                response = self._conn.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                self._conn.close()
+                self._conn = None
+                # A kept-alive connection the server closed: retry once
+                if attempt:
+                    return 0, b""
+        return 0, b""
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+
+
+@dataclass
+class Plan:
+    mix: str
+    year: int
+    rounds: list[int]
+    hot_round: int
+    poll_interval: float
+    think: float
+
+
+def run_user(client: Client, plan: Plan, deadline: float, rng: random.Random) -> None:
+    def pause(seconds: float) -> None:
+        time.sleep(max(0.0, min(seconds, deadline - time.monotonic())))
+
+    def race_page(round_num: int) -> None:
+        client.get(f"/race/{plan.year}/{round_num}/bundle")
+
+    while time.monotonic() < deadline:
+        if plan.mix == "mixed":
+            journey = rng.choices(
+                list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values())
+            )[0]
+        else:
+            journey = {
+                "race-burst": "race_page",
+                "next-race": "home",
+                "browse": "browse",
+            }[plan.mix]
+
+        if journey == "race_page":
+            race_page(plan.hot_round)
+            pause(rng.expovariate(1 / plan.think))
+        elif journey == "home":
+            # The home page fetches /next-race; visitors leave it open
+            for _ in range(rng.randint(1, 5)):
+                client.get("/next-race")
+                pause(plan.poll_interval * rng.uniform(0.8, 1.2))
+        else:
+            client.get(f"/races/{plan.year}")
+            pause(rng.expovariate(1 / plan.think))
+            race_page(rng.choice(plan.rounds))
+            pause(rng.expovariate(1 / plan.think))
+
+
+def discover_plan(base_url: str, args: argparse.Namespace) -> Plan:
+    """Pick the season and the race everyone is looking at."""
+    proxy = FlyProxy(args.hard_limit, args.hard_limit)
+    client = Client(base_url, proxy, Recorder(), args.timeout, "identity")
+    year = args.year
+    status, body = client.get(f"/races/{year}")
+    client.close()
+    rounds, finished = [], []
+    if status == 200:
+        today = date.today().isoformat()
+        for race in json.loads(body).get("races", []):
+            rounds.append(race["round"])
+            if race.get("date") and race["date"] <= today:
+                finished.append(race["round"])
+    else:
+        logging.warning("GET /races/%d answered %d; using round 1", year, status)
+    rounds = rounds or [1]
+    hot_round = args.round or (finished[-1] if finished else rounds[0])
+    return Plan(
+        args.mix, year, rounds, hot_round, args.poll_interval, args.think_ms / 1000
+    )
+
+
+def run_load(base_url: str, plan: Plan, args: argparse.Namespace) -> dict[str, Any]:
+    proxy = FlyProxy(args.soft_limit, args.hard_limit)
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    # Race bursts start together; other mixes ramp up over --ramp seconds
+    ramp = 0.0 if plan.mix == "race-burst" else args.ramp
+    threads = []
+
+    def user(index: int) -> None:
+        rng = random.Random(args.seed * 100_003 + index)
+        time.sleep(ramp * index / max(1, args.clients))
+        client = Client(base_url, proxy, recorder, args.timeout)
+        try:
+            run_user(client, plan, deadline, rng)
+        finally:
+            client.close()
+
+    started = time.monotonic()
+    for index in range(args.clients):
+        thread = threading.Thread(target=user, args=(index,), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join(args.duration + args.timeout + 5)
+    elapsed = time.monotonic() - started
+    if proxy._over_soft_since is not None:
+        proxy.over_soft_seconds += time.monotonic() - proxy._over_soft_since
+
+    return {
+        "elapsedSeconds": round(elapsed, 3),
+        "proxy": {
+            "softLimit": proxy.soft_limit,
+            "hardLimit": proxy.hard_limit,
+            "peakInFlight": proxy.peak,
+            "overSoftLimitSeconds": round(proxy.over_soft_seconds, 3),
+        },
+        **summarize(recorder.samples, elapsed),
+    }
+
+
+def summarize(samples: list[Sample], elapsed: float) -> dict[str, Any]:
+    def stats(group: list[Sample]) -> dict[str, Any]:
+        latencies = sorted(sample.seconds * 1000 for sample in group)
+        queued = sorted(sample.queued * 1000 for sample in group)
+        statuses = Counter(sample.status for sample in group)
+        errors = sum(
+            count for status, count in statuses.items() if status == 0 or status >= 500
+        )
+        return {
+            "requests": len(group),
+            "throughputRps": round(len(group) / elapsed, 2) if elapsed else 0.0,
+            "errorRate": round(errors / len(group), 4) if group else 0.0,
+            "statuses": {
+                str(status): count for status, count in sorted(statuses.items())
+            },
+            "latencyMs": {
+                "p50": round(percentile(latencies, 0.50), 2),
+                "p90": round(percentile(latencies, 0.90), 2),
+                "p99": round(percentile(latencies, 0.99), 2),
+                "max": round(latencies[-1], 2) if latencies else 0.0,
+            },
+            "proxyQueueMsP99": round(percentile(queued, 0.99), 2),
+            "bytes": sum(sample.size for sample in group),
+        }
+
+    routes: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        routes[sample.route].append(sample)
+    return {
+        "total": stats(samples),
+        "routes": {route: stats(group) for route, group in sorted(routes.items())},
+    }
+
+
+def wait_until_healthy(
+    base_url: str, process: subprocess.Popen, timeout: float
+) -> None:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"backend exited with {process.returncode}")
+        try:
+            conn = http.client.HTTPConnection(
+                parts.hostname or "127.0.0.1", parts.port, timeout=2
+            )
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"backend not healthy after {timeout:.0f}s")
+
+
+@contextmanager
+def local_backend(args: argparse.Namespace) -> Iterator[tuple[str, Any]]:
+    """A mock upstream plus a backend using it, in a scratch directory."""
+    with ExitStack() as stack:
+        scratch = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        faults = mock_upstream.Faults(
+            latency_ms=args.upstream_latency_ms,
+            jitter_ms=args.upstream_jitter_ms,
+            error_rate=args.upstream_error_rate,
+            rate_limit=args.upstream_rate_limit,
+        )
+        mock = mock_upstream.start(
+            args.recordings,
+            faults,
+            synthetic_years=args.synthetic_schedules,
+            seed=args.seed,
+        )
+        stack.callback(mock.shutdown)
+
+        port = args.port
+        env = dict(
+            os.environ,
+            FASTF1_UPSTREAM_URL=mock.url,
+            FASTF1_CACHE=str(scratch / "f1_cache"),
+            SHARED_CACHE_PATH=str(scratch / "shared_cache.sqlite"),
+            PAYLOAD_STORE_DIR=str(scratch / "payload_store"),
+            LAP_STORE_DIR=str(args.lap_store or ""),
+            PROFILING_ENABLED="",
+            # Background loads would skew the measured traffic
+            PREFETCH_ENABLED="",
+        )
+        log = stack.enter_context(open(scratch / "backend.log", "wb"))
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                str(args.workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=BACKEND,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+        def stop() -> None:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        stack.callback(stop)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            wait_until_healthy(base_url, process, 60)
+        except RuntimeError:
+            sys.stderr.write((scratch / "backend.log").read_text(errors="replace"))
+            raise
+        yield base_url, mock
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BACKEND,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Replay realistic traffic against the backend and report latency and errors."
+    )
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--clients", type=int, default=25)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--ramp", type=float, default=5.0)
+    parser.add_argument("--think-ms", type=float, default=1000.0)
+    parser.add_argument("--poll-interval", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--soft-limit", type=int, default=20)
+    parser.add_argument("--hard-limit", type=int, default=25)
+    parser.add_argument("--year", type=int, default=datetime.now(timezone.utc).year)
+    parser.add_argument("--round", type=int, help="Race of --mix race-burst")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+
+    target = parser.add_argument_group("backend")
+    target.add_argument("--app-url", help="Test a running backend instead")
+    target.add_argument("--port", type=int, default=8765)
+    target.add_argument("--workers", type=int, default=1)
+    target.add_argument("--lap-store", type=Path, help="LAP_STORE_DIR to serve")
+
+    upstream = parser.add_argument_group("mock upstream")
+    upstream.add_argument(
+        "--recordings", type=Path, default=mock_upstream.RECORDINGS_DIR
+    )
+    upstream.add_argument(
+        "--synthetic-schedules",
+        type=mock_upstream.parse_years,
+        default=None,
+        help="Years to serve generated schedules for (default: --year, --year+1)",
+    )
+    upstream.add_argument("--upstream-latency-ms", type=float, default=300.0)
+    upstream.add_argument("--upstream-jitter-ms", type=float, default=200.0)
+    upstream.add_argument("--upstream-error-rate", type=float, default=0.0)
+    upstream.add_argument("--upstream-rate-limit", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.hard_limit < args.soft_limit:
+        parser.error("--hard-limit must be at least --soft-limit")
+    if args.synthetic_schedules is None:
+        args.synthetic_schedules = [args.year, args.year + 1]
+
+    with ExitStack() as stack:
+        mock = None
+        if args.app_url:
+            base_url = args.app_url.rstrip("/")
+        else:
+            base_url, mock = stack.enter_context(local_backend(args))
+
+        plan = discover_plan(base_url, args)
+        if mock is not None:
+            mock.reset()
+        logging.info(
+            "%s: %d clients for %.0fs against %s (race %d/%d)",
+            plan.mix,
+            args.clients,
+            args.duration,
+            base_url,
+            plan.year,
+            plan.hot_round,
+        )
+        result = run_load(base_url, plan, args)
+        upstream_stats = mock.snapshot() if mock is not None else None
+
+    total = result["total"]
+    logging.info(
+        "total: %d requests, %.1f req/s, p50 %.0f ms, p99 %.0f ms, errors %.2f%%",
+        total["requests"],
+        total["throughputRps"],
+        total["latencyMs"]["p50"],
+        total["latencyMs"]["p99"],
+        total["errorRate"] * 100,
+    )
+    for route, stats in result["routes"].items():
+        logging.info(
+            "%-28s %6d req  p50 %7.0f ms  p90 %7.0f ms  p99 %7.0f ms  "
+            "errors %5.1f%%  %s",
+            route,
+            stats["requests"],
+            stats["latencyMs"]["p50"],
+            stats["latencyMs"]["p90"],
+            stats["latencyMs"]["p99"],
+            stats["errorRate"] * 100,
+            stats["statuses"],
+        )
+    proxy = result["proxy"]
+    logging.info(
+        "proxy: peak %d in flight, %.1fs over the soft limit of %d",
+        proxy["peakInFlight"],
+        proxy["overSoftLimitSeconds"],
+        proxy["softLimit"],
+    )
+    if upstream_stats is not None:
+        logging.info(
+            "upstream: %s",
+            {k: v for k, v in upstream_stats.items() if k != "missingUrls"},
+        )
+
+    commit = git_commit()
+    report = {
+        "benchmark": "loadtest",
+        "commit": commit,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "mix": plan.mix,
+        "clients": args.clients,
+        "durationSeconds": args.duration,
+        "workers": None if args.app_url else args.workers,
+        "race": {"year": plan.year, "round": plan.hot_round},
+        "upstreamFaults": (
+            None
+            if args.app_url
+            else {
+                "latencyMs": args.upstream_latency_ms,
+                "jitterMs": args.upstream_jitter_ms,
+                "errorRate": args.upstream_error_rate,
+                "rateLimit": args.upstream_rate_limit,
+            }
+        ),
+        **result,
+        "upstream": upstream_stats,
+    }
+    output = args.output or RESULTS_DIR / f"loadtest-{plan.mix}-{commit[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    logging.info("wrote %s", output)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""Stand-in for the upstream services FastF1 talks to, for load tests.
+
+A backend started with ``FASTF1_UPSTREAM_URL=http://127.0.0.1:9100`` sends
+every FastF1 request (live timing, Ergast, the schedule files) here as
+``/<host>/<path>``. Responses are replayed from a recordings directory,
+filled in one of two ways:
+
+* ``serve --record`` forwards requests it has no recording for to the real
+  service and saves the answer (needs network access once);
+* ``import`` copies the responses out of an existing FastF1 HTTP cache
+  (``f1_cache/fastf1_http_cache.sqlite``) without any network access.
+
+``--synthetic-schedules 2025,2026`` additionally serves generated season
+schedules, enough for /next-race and /races/{year} with no recordings at all.
+
+Latency, server errors and rate limiting are injected per request, so the
+backend can be measured against a slow or failing upstream:
+
+    python benchmarks/mock_upstream.py import f1_cache/fastf1_http_cache.sqlite
+    python benchmarks/mock_upstream.py serve --latency-ms 400 --jitter-ms 300 \\
+        --error-rate 0.02 --rate-limit 4
+
+``GET /_mock/stats`` reports what was served; requests without a recording
+get a 404 and are listed there.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, cast
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = Path(__file__).resolve().parent / "recordings"
+SCHEDULE_URL = (
+    "https://raw.githubusercontent.com/theOehrly/f1schedule/master/schedule_{year}.json"
+)
+ERROR_STATUSES = (500, 502, 503)
+# Response headers worth replaying; the rest describe the original transfer
+KEPT_HEADERS = ("Content-Type", "Cache-Control", "Last-Modified", "ETag")
+
+
+@dataclass
+class Recorded:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class Recordings:
+    """Recorded responses by URL: ``index.json`` plus one file per body."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        index_path = self.directory / "index.json"
+        self._index: dict[str, dict[str, Any]] = (
+            json.loads(index_path.read_text(encoding="utf-8"))
+            if index_path.exists()
+            else {}
+        )
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, url: str) -> Optional[Recorded]:
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        body = (self.directory / "bodies" / entry["body"]).read_bytes()
+        return Recorded(entry["status"], dict(entry["headers"]), body)
+
+    def add(self, url: str, status: int, headers: dict[str, str], body: bytes) -> None:
+        name = hashlib.sha256(body).hexdigest() + ".bin"
+        bodies = self.directory / "bodies"
+        bodies.mkdir(parents=True, exist_ok=True)
+        if not (bodies / name).exists():
+            (bodies / name).write_bytes(body)
+        kept = {key: value for key, value in headers.items() if key in KEPT_HEADERS}
+        with self._lock:
+            self._index[url] = {"status": status, "headers": kept, "body": name}
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            text = json.dumps(self._index, indent=1, sort_keys=True)
+        tmp = self.directory / "index.json.tmp"
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(self.directory / "index.json")
+
+
+def import_http_cache(cache_db: Path, recordings: Recordings) -> int:
+    """Copy the successful responses out of a FastF1 HTTP cache database."""
+    from requests_cache import SQLiteCache
+
+    imported = 0
+    for response in SQLiteCache(str(cache_db)).responses.values():
+        if response.status_code != 200:
+            continue
+        recordings.add(
+            response.url, response.status_code, dict(response.headers), response.content
+        )
+        imported += 1
+    recordings.save()
+    return imported
+
+
+def synthetic_schedule(year: int) -> bytes:
+    """A 24-round season in FastF1's schedule file format.
+
+    Races run every other Sunday from the first Sunday in March, so the
+    current date falls inside the season for most of the year.
+    """
+    first_sunday = date(year, 3, 1) + timedelta(days=(6 - date(year, 3, 1).weekday()))
+    columns: dict[str, dict[str, Any]] = {}
+
+    def put(column: str, index: int, value: Any) -> None:
+        columns.setdefault(column, {})[str(index)] = value
+
+    sessions = [
+        ("Practice 1", -2, 13),
+        ("Practice 2", -2, 17),
+        ("Practice 3", -1, 12),
+        ("Qualifying", -1, 16),
+        ("Race", 0, 15),
+    ]
+    for index in range(24):
+        race_day = first_sunday + timedelta(weeks=2 * index)
+        put("round_number", index, index + 1)
+        put("country", index, f"Country {index + 1}")
+        put("location", index, f"Circuit {index + 1}")
+        put("official_event_name", index, f"FORMULA 1 GRAND PRIX {index + 1} {year}")
+        put("event_date", index, f"{race_day.isoformat()}T00:00:00")
+        put("event_name", index, f"Grand Prix {index + 1}")
+        put("event_format", index, "conventional")
+        for number, (name, offset, hour) in enumerate(sessions, start=1):
+            when = datetime.combine(
+                race_day + timedelta(days=offset), datetime.min.time()
+            )
+            put(f"session{number}", index, name)
+            put(
+                f"session{number}_date",
+                index,
+                (when + timedelta(hours=hour)).isoformat(),
+            )
+        put("gmt_offset", index, "00:00")
+        put("f1_api_support", index, True)
+    return json.dumps(columns).encode("utf-8")
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average, ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    rate_burst: float = 0.0
+    retry_after: int = 1
+
+    def delay(self, rng: random.Random) -> float:
+        jitter = rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+class MockUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        recordings: Recordings,
+        faults: Faults,
+        record: bool = False,
+        schedules: dict[int, bytes] | None = None,
+        seed: Optional[int] = None,
+    ):
+        super().__init__(address, _Handler)
+        self.recordings = recordings
+        self.faults = faults
+        self.record = record
+        self.schedules = {
+            SCHEDULE_URL.format(year=year): body
+            for year, body in (schedules or {}).items()
+        }
+        self.bucket = (
+            TokenBucket(faults.rate_limit, faults.rate_burst or faults.rate_limit)
+            if faults.rate_limit > 0
+            else None
+        )
+        self.rng = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self.stats: Counter[str] = Counter()
+        self.missing: Counter[str] = Counter()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, outcome: str, url: Optional[str] = None) -> None:
+        with self._stats_lock:
+            self.stats[outcome] += 1
+            if outcome == "missing" and url is not None:
+                self.missing[url] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "requests": sum(self.stats.values()),
+                **dict(self.stats),
+                "missingUrls": dict(self.missing.most_common(20)),
+            }
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self.stats.clear()
+            self.missing.clear()
+
+    def respond(self, url: str) -> Recorded:
+        """The response for ``url``, with faults applied; counts the outcome."""
+        faults = self.faults
+        with self._stats_lock:
+            delay = faults.delay(self.rng)
+            failed = self.rng.random() < faults.error_rate
+            error_status = self.rng.choice(ERROR_STATUSES)
+        if delay:
+            time.sleep(delay)
+
+        if self.bucket is not None and not self.bucket.take():
+            self.count("rateLimited")
+            return Recorded(
+                429,
+                {"Retry-After": str(faults.retry_after), "Content-Type": "text/plain"},
+                b"Too Many Requests",
+            )
+        if failed:
+            self.count("errors")
+            return Recorded(
+                error_status, {"Content-Type": "text/plain"}, b"Upstream error"
+            )
+
+        if url in self.schedules:
+            self.count("served")
+            return Recorded(
+                200, {"Content-Type": "application/json"}, self.schedules[url]
+            )
+        recorded = self.recordings.get(url)
+        if recorded is None and self.record:
+            recorded = self._fetch_and_record(url)
+        if recorded is None:
+            self.count("missing", url)
+            return Recorded(404, {"Content-Type": "text/plain"}, b"Not recorded")
+        self.count("served")
+        return recorded
+
+    def _fetch_and_record(self, url: str) -> Optional[Recorded]:
+        import requests
+
+        try:
+            response = requests.get(url, timeout=60)
+        except requests.RequestException as exc:
+            logger.warning("Recording %s failed: %s", url, exc)
+            return None
+        if response.status_code != 200:
+            logger.info("Not recording %s: HTTP %d", url, response.status_code)
+            return None
+        self.recordings.add(url, 200, dict(response.headers), response.content)
+        self.recordings.save()
+        self.count("recorded")
+        return Recorded(200, dict(response.headers), response.content)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def upstream(self) -> "MockUpstream":
+        return cast(MockUpstream, self.server)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s " + format, self.address_string(), *args)
+
+    def _send(self, status: int, headers: dict[str, str], body: bytes) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _upstream_url(self) -> Optional[str]:
+        host, _, rest = self.path.lstrip("/").partition("/")
+        if not host or host == "_mock":
+            return None
+        return f"https://{host}/{rest}"
+
+    def do_GET(self) -> None:
+        if self.path == "/_mock/stats":
+            body = json.dumps(self.upstream.snapshot()).encode("utf-8")
+            self._send(200, {"Content-Type": "application/json"}, body)
+            return
+        url = self._upstream_url()
+        if url is None:
+            self._send(404, {"Content-Type": "text/plain"}, b"Unknown path")
+            return
+        recorded = self.upstream.respond(url)
+        self._send(recorded.status, recorded.headers, recorded.body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if self.path == "/_mock/reset":
+            self.upstream.reset()
+            self._send(204, {}, b"")
+            return
+        self.do_GET()
+
+
+def parse_years(value: str) -> list[int]:
+    years = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(bound) for bound in part.split("-", 1))
+            years.extend(range(start, end + 1))
+        else:
+            years.append(int(part))
+    return years
+
+
+def start(
+    recordings_dir: Path = RECORDINGS_DIR,
+    faults: Optional[Faults] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    record: bool = False,
+    synthetic_years: Optional[list[int]] = None,
+    seed: Optional[int] = None,
+) -> MockUpstream:
+    """Start a mock upstream on a background thread; ``shutdown()`` stops it."""
+    server = MockUpstream(
+        (host, port),
+        Recordings(recordings_dir),
+        faults or Faults(),
+        record=record,
+        schedules={year: synthetic_schedule(year) for year in synthetic_years or ()},
+        seed=seed,
+    )
+    threading.Thread(
+        target=server.serve_forever, name="mock-upstream", daemon=True
+    ).start()
+    return server
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Stand-in for the upstream services FastF1 talks to, for load tests."
+    )
+    parser.add_argument("--recordings", type=Path, default=RECORDINGS_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve recorded responses")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=9100)
+    serve.add_argument("--latency-ms", type=float, default=0.0)
+    serve.add_argument("--jitter-ms", type=float, default=0.0)
+    serve.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of 5xx answers"
+    )
+    serve.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Requests/s before 429s"
+    )
+    serve.add_argument("--rate-burst", type=float, default=0.0)
+    serve.add_argument(
+        "--record", action="store_true", help="Fetch and save unrecorded URLs"
+    )
+    serve.add_argument("--synthetic-schedules", type=parse_years, default=[])
+    serve.add_argument("--seed", type=int)
+
+    imports = commands.add_parser("import", help="Import a FastF1 HTTP cache")
+    imports.add_argument("cache_db", type=Path)
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        recordings = Recordings(args.recordings)
+        imported = import_http_cache(args.cache_db, recordings)
+        logger.info(
+            "Imported %d responses; %s now holds %d",
+            imported,
+            args.recordings,
+            len(recordings),
+        )
+        return 0
+
+    faults = Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_burst=args.rate_burst,
+    )
+    server = start(
+        args.recordings,
+        faults,
+        args.host,
+        args.port,
+        record=args.record,
+        synthetic_years=args.synthetic_schedules,
+        seed=args.seed,
+    )
+    logger.info(
+        "Mock upstream on %s with %d recordings; start the backend with "
+        "FASTF1_UPSTREAM_URL=%s",
+        server.url,
+        len(server.recordings),
+        server.url,
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
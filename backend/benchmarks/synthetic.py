@@ -0,0 +1,331 @@
+"""Synthetic FastF1-like race sessions for offline benchmarks and checks.
+
+``make_session`` returns an object with the attributes our endpoints read
+(``event``, ``laps``, ``results``, ``weather_data`` and ``get_circuit_info``)
+filled with plausible data: cumulative lap times that produce real position
+changes, pit in/out laps, retirements, deleted laps and gaps in the timing
+columns. Everything is derived from a seed, so runs are reproducible.
+"""
+
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+DRIVER_NUMBERS = [
+    "1", "11", "16", "55", "44", "63", "4", "81", "14", "18",
+    "10", "31", "23", "2", "22", "3", "27", "20", "24", "77",
+    "21", "40", "43", "30", "12", "87", "5", "7", "6", "50",
+]  # fmt: skip
+
+TEAMS = [
+    ("Red Bull Racing", "3671C6"),
+    ("Ferrari", "E8002D"),
+    ("Mercedes", "27F4D2"),
+    ("McLaren", "FF8000"),
+    ("Aston Martin", "229971"),
+    ("Alpine", "FF87BC"),
+    ("Williams", "64C4FF"),
+    ("RB", "6692FF"),
+    ("Kick Sauber", "52E252"),
+    ("Haas F1 Team", "B6BABD"),
+    ("Andretti", "1E1E1E"),
+    ("Cadillac", "A0A0A0"),
+]
+
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD"]
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    laps: int
+    drivers: int
+    pit_stops: int
+    retirements: int
+    base_lap_seconds: float
+
+
+PROFILES = {
+    "sprint": Profile("sprint", 24, 20, 0, 1, 95.0),
+    "standard": Profile("standard", 57, 20, 2, 2, 92.0),
+    "full": Profile("full", 70, 20, 2, 2, 80.0),
+    "monaco": Profile("monaco", 78, 20, 3, 3, 74.0),
+    "grid22": Profile("grid22", 70, 22, 3, 3, 80.0),
+    # Changing conditions: tyre swaps every few laps and a long list of DNFs
+    "monaco_wet": Profile("monaco_wet", 78, 22, 6, 5, 82.0),
+}
+
+
+class SyntheticSession(SimpleNamespace):
+    def load(self, **_kwargs: Any) -> None:
+        pass
+
+    def get_circuit_info(self) -> Any:
+        return self.circuit_info
+
+
+def _driver_code(index: int) -> str:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return letters[index % 26] + letters[(index * 7) % 26] + letters[(index * 3) % 26]
+
+
+def make_session(
+    profile: str | Profile = "full",
+    seed: int = 0,
+    year: int = 2024,
+    round_num: int = 1,
+    race_date: Optional[pd.Timestamp] = None,
+) -> SyntheticSession:
+    """Build a synthetic race session for the given profile name or spec."""
+    spec = PROFILES[profile] if isinstance(profile, str) else profile
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+
+    if race_date is None:
+        race_date = cast(pd.Timestamp, pd.Timestamp(f"{year}-05-01 13:00"))
+    n_laps = spec.laps
+    n_drivers = spec.drivers
+
+    numbers = list(DRIVER_NUMBERS)
+    while len(numbers) < n_drivers:
+        numbers.append(str(100 + len(numbers)))
+    numbers = numbers[:n_drivers]
+
+    drivers = []
+    for index, number in enumerate(numbers):
+        team, color = TEAMS[(index // 2) % len(TEAMS)]
+        drivers.append(
+            {
+                "number": number,
+                "code": _driver_code(index),
+                "first": f"Driver{index}",
+                "last": f"Surname{index}",
+                "team": team,
+                "color": color,
+                "pace": spec.base_lap_seconds + rng.uniform(0, 2.0),
+                "grid": index + 1,
+            }
+        )
+    rng.shuffle(drivers)
+    for grid, driver in enumerate(drivers, start=1):
+        driver["grid"] = grid
+
+    retired = rng.sample(range(n_drivers), min(spec.retirements, n_drivers))
+    for index, driver in enumerate(drivers):
+        driver["last_lap"] = (
+            rng.randint(1, max(1, n_laps - 1)) if index in retired else n_laps
+        )
+        candidates = list(range(8, max(9, n_laps - 3)))
+        stops = min(spec.pit_stops, len(candidates))
+        driver["pit_in_laps"] = sorted(rng.sample(candidates, stops))
+
+    # Lap times: pace + noise, slower laps for lap 1 and pit in/out laps
+    lap_times = np.empty((n_drivers, n_laps))
+    for index, driver in enumerate(drivers):
+        times = driver["pace"] + np_rng.normal(0, 0.4, n_laps)
+        times[0] += 6 + 0.3 * driver["grid"]
+        for pit_lap in driver["pit_in_laps"]:
+            times[pit_lap - 1] += 4.0
+            if pit_lap < n_laps:
+                times[pit_lap] += 18.0
+        lap_times[index] = times
+
+    elapsed = np.cumsum(lap_times, axis=1)
+    running = np.array(
+        [[lap < driver["last_lap"] for lap in range(n_laps)] for driver in drivers]
+    )
+    ranking = np.where(running, elapsed, np.inf)
+    positions = ranking.argsort(axis=0).argsort(axis=0) + 1
+
+    start = pd.Timedelta(minutes=56)
+    rows = []
+    for index, driver in enumerate(drivers):
+        stint = 1
+        tyre_life = 0
+        compound = rng.choice(COMPOUNDS)
+        for lap in range(1, driver["last_lap"] + 1):
+            lap_time = cast(
+                pd.Timedelta, pd.Timedelta(seconds=float(lap_times[index, lap - 1]))
+            )
+            lap_end = start + pd.Timedelta(seconds=float(elapsed[index, lap - 1]))
+            lap_start = lap_end - lap_time
+            tyre_life += 1
+
+            pit_in = lap in driver["pit_in_laps"]
+            pit_out = (lap - 1) in driver["pit_in_laps"]
+            if pit_out:
+                stint += 1
+                tyre_life = 1
+                compound = rng.choice(COMPOUNDS)
+
+            position: float = float(positions[index, lap - 1])
+            if lap == driver["last_lap"] and driver["last_lap"] < n_laps:
+                position = np.nan
+            elif rng.random() < 0.005:
+                position = np.nan
+
+            speed = lambda mean: (  # noqa: E731
+                np.nan if rng.random() < 0.03 else round(rng.gauss(mean, 6), 1)
+            )
+            rows.append(
+                {
+                    "Time": lap_end,
+                    "Driver": driver["code"],
+                    "DriverNumber": driver["number"],
+                    "LapTime": pd.NaT if rng.random() < 0.01 else lap_time,
+                    "LapNumber": float(lap),
+                    "Stint": float(stint),
+                    "PitOutTime": (
+                        lap_start + pd.Timedelta(seconds=rng.uniform(20, 25))
+                        if pit_out
+                        else pd.NaT
+                    ),
+                    "PitInTime": (
+                        lap_end - pd.Timedelta(seconds=rng.uniform(2, 5))
+                        if pit_in
+                        else pd.NaT
+                    ),
+                    "Sector1Time": lap_time * 0.31,
+                    "Sector2Time": lap_time * 0.37,
+                    "Sector3Time": lap_time * 0.32,
+                    "SpeedI1": speed(270),
+                    "SpeedI2": speed(250),
+                    "SpeedFL": speed(285),
+                    "SpeedST": speed(310),
+                    "IsPersonalBest": False,
+                    "Compound": compound,
+                    "TyreLife": float(tyre_life),
+                    "FreshTyre": tyre_life == 1,
+                    "Team": driver["team"],
+                    "LapStartTime": lap_start,
+                    "LapStartDate": race_date + lap_start - start,
+                    "TrackStatus": "1",
+                    "Position": position,
+                    "Deleted": rng.random() < 0.01,
+                    "DeletedReason": "",
+                    "FastF1Generated": False,
+                    "IsAccurate": True,
+                }
+            )
+
+    laps = pd.DataFrame(rows)
+    # All-NaT columns (e.g. no pit stops in a sprint) would otherwise infer
+    # datetime64 instead of FastF1's timedelta64
+    for name in ("LapTime", "PitOutTime", "PitInTime"):
+        if not pd.api.types.is_timedelta64_dtype(laps[name].dtype):
+            laps[name] = pd.Series(pd.NaT, index=laps.index, dtype="timedelta64[ns]")
+    # Timing data comes in whole milliseconds
+    for name in laps.columns:
+        if pd.api.types.is_timedelta64_dtype(laps[name].dtype):
+            laps[name] = laps[name].dt.round("ms")
+    # FastF1 orders laps by driver, then lap number
+    laps = laps.sort_values(["DriverNumber", "LapNumber"], kind="stable")
+    laps = laps.reset_index(drop=True)
+
+    # Classification: finishers by total time, then retirements by distance
+    order = sorted(
+        range(n_drivers),
+        key=lambda i: (
+            -drivers[i]["last_lap"],
+            elapsed[i, drivers[i]["last_lap"] - 1],
+        ),
+    )
+    winner_time = pd.Timedelta(seconds=float(elapsed[order[0], n_laps - 1]))
+    results = []
+    for place, index in enumerate(order, start=1):
+        driver = drivers[index]
+        finished = driver["last_lap"] == n_laps
+        if place == 1:
+            time_value = winner_time
+        elif finished:
+            time_value = pd.Timedelta(
+                seconds=float(
+                    elapsed[index, n_laps - 1] - elapsed[order[0], n_laps - 1]
+                )
+            )
+        else:
+            time_value = pd.NaT
+        results.append(
+            {
+                "DriverNumber": driver["number"],
+                "BroadcastName": f"{driver['first'][0]} {driver['last'].upper()}",
+                "Abbreviation": driver["code"],
+                "DriverId": driver["last"].lower(),
+                "TeamName": driver["team"],
+                "TeamColor": driver["color"],
+                "TeamId": driver["team"].lower().replace(" ", "_"),
+                "FirstName": driver["first"],
+                "LastName": driver["last"],
+                "FullName": f"{driver['first']} {driver['last']}",
+                "HeadshotUrl": "",
+                "CountryCode": "",
+                "Position": float(place),
+                "ClassifiedPosition": str(place) if finished else "R",
+                "GridPosition": float(driver["grid"]),
+                "Q1": pd.NaT,
+                "Q2": pd.NaT,
+                "Q3": pd.NaT,
+                "Time": time_value,
+                "Status": "Finished" if finished else "Retired",
+                "Points": float(POINTS[place - 1]) if place <= len(POINTS) else 0.0,
+            }
+        )
+    results_df = pd.DataFrame(results)
+    results_df["Time"] = results_df["Time"].dt.round("ms")
+    results_df.index = results_df["DriverNumber"].tolist()
+
+    minutes = int(elapsed.max() // 60) + 60
+    weather = pd.DataFrame(
+        {
+            "Time": pd.to_timedelta(np.arange(minutes), unit="min"),
+            "AirTemp": np.round(24 + np_rng.normal(0, 0.5, minutes), 1),
+            "Humidity": np.round(50 + np_rng.normal(0, 2, minutes), 1),
+            "Pressure": np.round(1010 + np_rng.normal(0, 1, minutes), 1),
+            "Rainfall": np.zeros(minutes, dtype=bool),
+            "TrackTemp": np.round(38 + np_rng.normal(0, 1, minutes), 1),
+            "WindDirection": np_rng.integers(0, 360, minutes),
+            "WindSpeed": np.round(np_rng.uniform(0, 4, minutes), 1),
+        }
+    )
+
+    event = pd.Series(
+        {
+            "RoundNumber": round_num,
+            "Country": "Synthetic",
+            "Location": f"{spec.name.title()} Circuit",
+            "OfficialEventName": f"FORMULA 1 SYNTHETIC {spec.name.upper()} GRAND PRIX",
+            "EventDate": race_date.normalize(),
+            "EventName": f"{spec.name.title()} Grand Prix",
+            "EventFormat": (
+                "sprint_qualifying" if spec.name == "sprint" else "conventional"
+            ),
+            "Session5": "Race",
+            "Session5DateUtc": race_date,
+            "Year": year,
+        }
+    )
+
+    corners = pd.DataFrame(
+        {
+            "X": np_rng.uniform(-5000, 5000, 19),
+            "Y": np_rng.uniform(-5000, 5000, 19),
+            "Number": np.arange(1, 20),
+            "Letter": [""] * 19,
+            "Angle": np_rng.uniform(-180, 180, 19),
+            "Distance": np.sort(np_rng.uniform(0, 5000, 19)),
+        }
+    )
+
+    return SyntheticSession(
+        name="Race",
+        event=event,
+        laps=laps,
+        results=results_df,
+        weather_data=weather,
+        circuit_info=SimpleNamespace(corners=corners),
+    )
@@ -0,0 +1,99 @@
+"""Column-at-a-time conversion of DataFrames into JSON-ready lists.
+
+Each helper takes a whole column and returns a plain Python list with NaN
+already mapped to None (or a default), numbers cast and timedeltas formatted,
+so payload builders only zip finished columns together instead of touching
+individual cells through ``iterrows`` and ``pd.notna``.
+
+The conversions mirror the scalar code they replace: ints truncate like
+``int()``, strings are ``str()`` of the value, and durations use the same
+``HH:MM:SS.mmm`` layout as ``format_timedelta`` in app.py.
+"""
+
+from typing import Any, Optional, Sequence, cast
+
+import numpy as np
+import pandas as pd
+
+
+def column(frame: pd.DataFrame, name: str) -> pd.Series:
+    """Return a column, or an all-missing column if the frame lacks it."""
+    if name in frame.columns:
+        return cast(pd.Series, frame[name])
+    return pd.Series([None] * len(frame), index=frame.index, dtype=object)
+
+
+def _floats(values: pd.Series) -> np.ndarray:
+    if not pd.api.types.is_numeric_dtype(values.dtype):
+        values = cast(pd.Series, pd.to_numeric(values, errors="coerce"))
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _seconds(values: pd.Series) -> np.ndarray:
+    """Total seconds at microsecond precision, like ``Timedelta.total_seconds``."""
+    if not pd.api.types.is_timedelta64_dtype(values.dtype):
+        values = pd.to_timedelta(values, errors="coerce")
+    nanoseconds = values.to_numpy(dtype="timedelta64[ns]").view(np.int64)
+    seconds = (nanoseconds // 1000) / 1_000_000
+    seconds[nanoseconds == np.iinfo(np.int64).min] = np.nan
+    return seconds
+
+
+def _fill(present: np.ndarray, values: list, default: Any = None) -> list:
+    out = np.full(len(present), default, dtype=object)
+    out[present] = values
+    return out.tolist()
+
+
+def optional_ints(values: pd.Series) -> list[Optional[int]]:
+    numeric = _floats(values)
+    present = ~np.isnan(numeric)
+    return _fill(present, np.trunc(numeric[present]).astype(np.int64).tolist())
+
+
+def optional_floats(values: pd.Series, default: Any = None) -> list[Any]:
+    numeric = _floats(values)
+    present = ~np.isnan(numeric)
+    return _fill(present, numeric[present].tolist(), default)
+
+
+def optional_strs(values: pd.Series) -> list[Optional[str]]:
+    raw = values.to_numpy(dtype=object)
+    present = pd.notna(raw)
+    return _fill(present, [str(value) for value in raw[present]])
+
+
+def format_durations(values: pd.Series) -> list[Optional[str]]:
+    """Format timedeltas as HH:MM:SS.mmm, like format_timedelta."""
+    total = _seconds(values)
+    present = ~np.isnan(total)
+    total = total[present]
+    hours = (total // 3600).astype(np.int64).tolist()
+    minutes = ((total % 3600) // 60).astype(np.int64).tolist()
+    seconds = (total % 60).tolist()
+    formatted = [
+        f"{h:02d}:{m:02d}:{s:06.3f}" for h, m, s in zip(hours, minutes, seconds)
+    ]
+    return _fill(present, formatted)
+
+
+def format_gaps(values: pd.Series) -> list[Optional[str]]:
+    """Format timedeltas as a +S.mmm gap to the leader."""
+    total = _seconds(values)
+    present = ~np.isnan(total)
+    return _fill(present, [f"+{gap:.3f}" for gap in total[present].tolist()])
+
+
+def full_names(first: pd.Series, last: pd.Series) -> list[Optional[str]]:
+    """``"First Last"`` where both parts are present, otherwise None."""
+    first_raw = first.to_numpy(dtype=object)
+    last_raw = last.to_numpy(dtype=object)
+    present = pd.notna(first_raw) & pd.notna(last_raw)
+    joined = [f"{a} {b}" for a, b in zip(first_raw[present], last_raw[present])]
+    return _fill(present, joined)
+
+
+def records(columns: dict[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    """Zip equally long columns into a list of row dicts."""
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
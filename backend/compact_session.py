@@ -0,0 +1,171 @@
+"""Compact in-memory copies of loaded race sessions for the session cache.
+
+A loaded FastF1 session keeps every lap column at full width: float64 lap
+numbers and positions, nanosecond timedeltas and object string columns, most
+of which no endpoint reads. ``compact`` copies what the payload builders use
+into a ``CompactSession`` and lets the FastF1 objects go:
+
+* only the ``lap_store.TABLE_COLUMNS`` of the laps, results and weather, the
+  ``EVENT_FIELDS`` of the event and the circuit's corner count are kept;
+* positions become ``Int8``, lap numbers and whole km/h speed traps
+  ``Int16`` (nullable, so missing values stay missing), other floats
+  ``float32`` where that loses nothing;
+* repeated strings become categoricals, object flags such as ``Deleted``
+  plain bools;
+* timedeltas are held as int64 milliseconds (``timedelta64[ms]``).
+
+Every conversion is skipped for a column it would change, e.g. sub-millisecond
+times or a fractional position, so the builders produce the same payloads from
+a compact session as from the FastF1 one.
+
+A compact race with FastF1's whole km/h speed traps takes about a ninth of
+the memory of the raw tables, so a season of 24 still needs about 2.7 raw
+races' worth, not one (benchmarks/bench_session_memory.py). Most of what
+is left are the three lap time columns, which must stay millisecond
+timedeltas for the builders; going further would mean dropping data the
+endpoints read. Settled races are better served from the memory-mapped lap
+store, which all workers share.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Iterable, Optional, cast
+
+from lap_store import EVENT_FIELDS, TABLE_COLUMNS, StoredSession, _num_corners
+from session_profiles import CIRCUIT_INFO, LAPS, WEATHER
+from warmup import LazyModule
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    # Imported on first use, so the server can start answering before them
+    np = LazyModule("numpy")
+    pd = LazyModule("pandas")
+
+# Nullable integer dtypes for columns that hold whole numbers. FastF1 reports
+# speed traps in whole km/h, but as floats; only LapColumns.floats reads them,
+# which turns them back into the same floats.
+INTEGER_COLUMNS = {
+    "Position": "Int8",
+    "GridPosition": "Int8",
+    "LapNumber": "Int16",
+    "SpeedI1": "Int16",
+    "SpeedI2": "Int16",
+    "SpeedFL": "Int16",
+    "SpeedST": "Int16",
+}
+
+
+def _same(compacted: pd.Series, values: pd.Series) -> bool:
+    return bool(compacted.isna().equals(values.isna())) and bool(
+        (compacted[compacted.notna()] == values[values.notna()]).all()
+    )
+
+
+def compact_column(values: pd.Series, integer_dtype: Optional[str] = None) -> Any:
+    """The narrowest representation of a column that keeps every value."""
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return values.astype(bool)
+
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        milliseconds = values.astype("timedelta64[ms]")
+        return milliseconds if _same(milliseconds, values) else values
+
+    if pd.api.types.is_numeric_dtype(dtype):
+        if integer_dtype is not None:
+            try:
+                # Refuses fractions and values out of range
+                return values.astype(integer_dtype)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        if pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            narrow = values.astype(np.float32)
+            if _same(narrow, values):
+                return narrow
+        return values
+
+    raw = values.to_numpy(dtype=object)
+    present = pd.notna(raw)
+    if present.any() and all(isinstance(v, (bool, np.bool_)) for v in raw[present]):
+        # Object-typed flags such as Deleted; missing counts as False
+        return pd.Series(np.where(present, raw, False).astype(bool), index=values.index)
+    if values.nunique() * 2 <= len(values):
+        return values.astype("category")
+    # Mostly distinct strings (names in the results) are smaller as they are
+    return values
+
+
+def compact_frame(frame: Optional[pd.DataFrame], columns: list[str]) -> Any:
+    """A copy of ``frame`` with just ``columns`` (those it has), compacted."""
+    if frame is None:
+        return None
+    data = {
+        column: compact_column(
+            cast(pd.Series, frame[column]), INTEGER_COLUMNS.get(column)
+        )
+        for column in columns
+        if column in frame.columns
+    }
+    return pd.DataFrame(data, index=frame.index)
+
+
+def compact_event(event: Any) -> Optional[pd.Series]:
+    if event is None:
+        return None
+    record: dict[str, Any] = {}
+    for field in EVENT_FIELDS:
+        try:
+            record[field] = event.get(field)
+        except AttributeError:
+            record[field] = getattr(event, field, None)
+    return pd.Series(record, dtype=object)
+
+
+class CompactSession(StoredSession):
+    """A cached race session reduced to the columns the endpoints read.
+
+    Like ``LoadedSession`` it records the profile it was loaded with, so the
+    session cache can tell when it needs an upgrade. Tables outside the
+    profile are None.
+    """
+
+    def __init__(
+        self,
+        laps: Optional[pd.DataFrame],
+        results: Optional[pd.DataFrame],
+        weather_data: Optional[pd.DataFrame],
+        event: Optional[pd.Series],
+        num_corners: Optional[int],
+        profile: frozenset[str],
+        has_circuit_info: bool,
+    ):
+        super().__init__(laps, results, weather_data, event, num_corners)
+        self.profile = profile
+        self.has_circuit_info = has_circuit_info
+
+    def covers(self, components: Iterable[str]) -> bool:
+        return frozenset(components) <= self.profile
+
+    def get_circuit_info(self) -> Any:
+        return super().get_circuit_info() if self.has_circuit_info else None
+
+
+def compact(loaded: Any) -> CompactSession:
+    """Reduce a ``LoadedSession`` to a ``CompactSession``."""
+    profile = loaded.profile
+    # FastF1 raises on tables that were not loaded, so go by the profile
+    laps = loaded.laps if LAPS in profile else None
+    weather = loaded.weather_data if WEATHER in profile else None
+    circuit_info = loaded.get_circuit_info() if CIRCUIT_INFO in profile else None
+
+    return CompactSession(
+        laps=compact_frame(laps, TABLE_COLUMNS["laps"]),
+        results=compact_frame(loaded.results, TABLE_COLUMNS["results"]),
+        weather_data=compact_frame(weather, TABLE_COLUMNS["weather"]),
+        event=compact_event(getattr(loaded, "event", None)),
+        num_corners=_num_corners(loaded) if circuit_info is not None else None,
+        profile=profile,
+        has_circuit_info=circuit_info is not None,
+    )
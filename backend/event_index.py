@@ -0,0 +1,141 @@
+"""Race start times sorted for binary search, for the /next-race endpoint.
+
+Finding the next race used to copy up to two season schedules on every
+request, normalize each race date row by row, filter and then sort just to
+take the first row. ``SeasonIndex`` does that work once per schedule: the
+valid rounds' race starts (UTC, as integer nanoseconds) are kept sorted next
+to their event details, so a lookup is a ``bisect``.
+
+``EventIndex`` holds one ``SeasonIndex`` per year and rebuilds a season only
+when the schedule cache hands out a different schedule object, i.e. after a
+refresh. ``next_race`` walks from the current season into the next one,
+loading the next season's schedule only when the current one has nothing
+left, exactly like the old per-request loop:
+
+* the earliest race starting at or after ``now`` wins;
+* a season with no race left still returns a race that started less than
+  ``just_started`` ago (the season finale in progress);
+* otherwise the next season is searched.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Optional, cast
+
+from warmup import LazyModule
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    # Imported on first use, so the server can start answering before it
+    pd = LazyModule("pandas")
+
+RACE_TIME_COLUMN = "Session5DateUtc"
+JUST_STARTED = timedelta(hours=3)
+
+
+class SeasonIndex:
+    """One season's races, sorted by race start time."""
+
+    def __init__(
+        self,
+        year: int,
+        schedule: Optional[pd.DataFrame],
+        describe: Callable[[pd.Series, int], dict[str, Any]],
+    ):
+        self.year = year
+        self.times: list[int] = []
+        self.race_times: list[pd.Timestamp] = []
+        self.events: list[dict[str, Any]] = []
+
+        if (
+            schedule is None
+            or schedule.empty
+            or RACE_TIME_COLUMN not in schedule.columns
+        ):
+            return
+
+        races = schedule
+        # Testing and other non-championship events have no round number
+        if "RoundNumber" in races.columns:
+            rounds = cast(
+                pd.Series, pd.to_numeric(races["RoundNumber"], errors="coerce")
+            )
+            races = races[rounds.ge(1).fillna(False)]
+
+        starts = cast(
+            pd.Series,
+            pd.to_datetime(races[RACE_TIME_COLUMN], utc=True, errors="coerce"),
+        )
+        valid = starts.notna()
+        races, starts = races.loc[valid], starts.loc[valid]
+        order = starts.argsort(kind="stable")
+
+        for position in order:
+            race_time = starts.iloc[position]
+            self.times.append(race_time.value)
+            self.race_times.append(race_time)
+            self.events.append(describe(races.iloc[position], year))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def find(
+        self, now: pd.Timestamp, just_started: timedelta = JUST_STARTED
+    ) -> Optional[tuple[dict[str, Any], pd.Timestamp]]:
+        """The next race and its start time, or None if the season is over."""
+        index = bisect_left(self.times, now.value)
+        if index == len(self.times):
+            # Nothing upcoming; the last race may still be running
+            index = bisect_left(self.times, (now - just_started).value)
+            if index == len(self.times):
+                return None
+        return self.events[index], self.race_times[index]
+
+
+class EventIndex:
+    """Per-season indexes, rebuilt when their schedule object changes."""
+
+    def __init__(
+        self,
+        describe: Callable[[pd.Series, int], dict[str, Any]],
+        just_started: timedelta = JUST_STARTED,
+    ):
+        self.describe = describe
+        self.just_started = just_started
+        self._lock = threading.Lock()
+        self._seasons: dict[int, tuple[Any, SeasonIndex]] = {}
+
+    def season(self, year: int, schedule: Any) -> SeasonIndex:
+        with self._lock:
+            entry = self._seasons.get(year)
+        if entry is not None and entry[0] is schedule:
+            return entry[1]
+
+        # Built outside the lock; two threads may both build after a refresh
+        index = SeasonIndex(year, schedule, self.describe)
+        with self._lock:
+            self._seasons[year] = (schedule, index)
+        return index
+
+    def next_race(
+        self,
+        now: pd.Timestamp,
+        schedule_for: Callable[[int], Optional[Any]],
+    ) -> Optional[tuple[dict[str, Any], pd.Timestamp]]:
+        """Search this season, then the next; ``schedule_for`` may return None."""
+        for year in (now.year, now.year + 1):
+            schedule = schedule_for(year)
+            if schedule is None:
+                continue
+            found = self.season(year, schedule).find(now, self.just_started)
+            if found is not None:
+                return found
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seasons.clear()
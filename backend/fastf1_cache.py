@@ -0,0 +1,509 @@
+"""The FastF1 disk cache: safe sharing between workers, and its byte budget.
+
+FastF1 caches each session under ``<cache>/<year>/<event>/<session>/`` with
+the event and session directories named ``YYYY-MM-DD_Name``. A session
+whose race has settled never changes again, so it is worth keeping for as
+long as the budget allows; a session from the current race weekend is
+volatile and is the first thing to go.
+
+``enforce_budget`` evicts whole session directories in this order:
+
+1. volatile sessions not touched for longer than ``volatile_max_age``,
+   whatever the budget;
+2. other volatile sessions, least recently used first, while over budget;
+3. settled sessions, least recently used first, while still over budget.
+
+Files at the top of the cache directory (FastF1's HTTP cache database) are
+never deleted, since a running server may have them open. Instead
+``purge_http_cache`` first drops the expired responses from the database and
+vacuums it (``enforce_budget`` does so before it scans), and what is left
+counts against the budget.
+
+``enable_disk_cache`` turns the cache on for a server process. Several
+threads and uvicorn workers share one cache directory, so:
+
+* every session load holds a per-session lock (see file_lock.py) keyed by
+  the session's directory, so a race is downloaded and parsed once while
+  concurrent loaders of it wait and then read the pickles it wrote;
+* parsed data is written to a temporary file and renamed into place, so a
+  reader never sees a half written pickle, even without the lock (this
+  replaces a private FastF1 method, so it is checked first and an error is
+  logged instead if the installed FastF1 differs);
+* the HTTP cache database runs in WAL mode with a busy timeout instead of
+  failing (or stalling) when two processes write at once;
+* eviction takes the same lock without waiting and skips sessions that are
+  being loaded.
+
+``redirect_upstream`` points every FastF1 HTTP request at a stand-in server
+(benchmarks/mock_upstream.py) for load tests. ``forget_race_results`` drops a
+race's cached Ergast results so a reload after the race sees them once they
+are published.
+"""
+
+import inspect
+import logging
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import urlsplit
+
+from file_lock import KeyedFileLock, LockTimeout
+
+logger = logging.getLogger(__name__)
+
+SETTLED = "settled"
+VOLATILE = "volatile"
+
+# Lock files live here, inside the cache so every worker finds the same ones
+LOCK_DIR_NAME = ".locks"
+# FastF1's HTTP cache database, <cache>/fastf1_http_cache.sqlite
+HTTP_CACHE_NAME = "fastf1_http_cache"
+HTTP_CACHE_BUSY_TIMEOUT_MS = 30_000
+# Parameters of FastF1's private Cache._write_cache(cls, data, cache_file_path,
+# **kwargs), which _atomic_write_cache replaces (see requirements.txt)
+WRITE_CACHE_PARAMETERS = ["data", "cache_file_path", "kwargs"]
+
+
+@dataclass
+class CacheEntry:
+    path: Path
+    size: int
+    last_used: float
+    kind: str
+
+
+@dataclass
+class EvictionReport:
+    budget_bytes: int
+    bytes_before: int = 0
+    bytes_after: int = 0
+    pinned_bytes: int = 0
+    http_expired: int = 0
+    http_purged_bytes: int = 0
+    evicted: list[CacheEntry] = field(default_factory=list)
+    kept: dict[str, int] = field(default_factory=lambda: {SETTLED: 0, VOLATILE: 0})
+    busy: list[CacheEntry] = field(default_factory=list)
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def reclaimed_by_kind(self) -> dict[str, int]:
+        totals = {SETTLED: 0, VOLATILE: 0}
+        for entry in self.evicted:
+            totals[entry.kind] += entry.size
+        return totals
+
+    def as_dict(self) -> dict:
+        return {
+            "budgetBytes": self.budget_bytes,
+            "bytesBefore": self.bytes_before,
+            "bytesAfter": self.bytes_after,
+            "reclaimedBytes": self.reclaimed_bytes,
+            "reclaimedByKind": self.reclaimed_by_kind(),
+            "pinnedBytes": self.pinned_bytes,
+            "httpExpiredResponses": self.http_expired,
+            "httpPurgedBytes": self.http_purged_bytes,
+            "evictedEntries": len(self.evicted),
+            "keptEntries": self.kept,
+            "busyEntries": [str(entry.path) for entry in self.busy],
+            "evicted": [str(entry.path) for entry in self.evicted],
+        }
+
+
+def _dated(name: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(name[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _usage(path: Path) -> tuple[int, float]:
+    """Total size and most recent access or modification time under path."""
+    if path.is_file():
+        stat = path.stat()
+        return stat.st_size, max(stat.st_atime, stat.st_mtime)
+
+    size, last_used = 0, 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            last_used = max(last_used, stat.st_atime, stat.st_mtime)
+    return size, last_used
+
+
+def _classify(path: Path, cache_dir: Path, now: float, settle_seconds: float) -> str:
+    parts = path.relative_to(cache_dir).parts
+    # Prefer the session date, then the event date, then the season
+    for name in reversed(parts[1:3]):
+        dated = _dated(name)
+        if dated is not None:
+            settled = now - dated.timestamp() > settle_seconds
+            return SETTLED if settled else VOLATILE
+
+    season = parts[0]
+    current_year = datetime.fromtimestamp(now, tz=timezone.utc).year
+    if season.isdigit() and int(season) < current_year:
+        return SETTLED
+    return VOLATILE
+
+
+def scan_cache(
+    cache_dir: Path, now: Optional[float] = None, settle_seconds: float = 7 * 86400
+) -> tuple[list[CacheEntry], int]:
+    """Return the evictable entries and the size of files that are never evicted."""
+    now = time.time() if now is None else now
+    entries: list[CacheEntry] = []
+    pinned = 0
+    if not cache_dir.exists():
+        return entries, pinned
+
+    for season in cache_dir.iterdir():
+        if season.name == LOCK_DIR_NAME:
+            continue
+        if not season.is_dir():
+            pinned += season.stat().st_size
+            continue
+        # Session directories, plus anything stored loose above them
+        for event in season.iterdir():
+            candidates = list(event.iterdir()) if event.is_dir() else [event]
+            for candidate in candidates:
+                size, last_used = _usage(candidate)
+                kind = _classify(candidate, cache_dir, now, settle_seconds)
+                entries.append(CacheEntry(candidate, size, last_used, kind))
+    return entries, pinned
+
+
+def _http_cache_size(cache_dir: Path) -> int:
+    size = 0
+    for path in cache_dir.glob(f"{HTTP_CACHE_NAME}.sqlite*"):
+        try:
+            size += path.stat().st_size
+        except FileNotFoundError:
+            continue
+    return size
+
+
+def purge_http_cache(cache_dir: Path) -> tuple[int, int]:
+    """Drop expired responses from FastF1's HTTP cache and vacuum it.
+
+    The HTTP cache is opened with stale_if_error, so requests-cache keeps
+    expired responses around forever; this is the only thing that removes
+    them. It goes through requests-cache's SQLite backend with the servers'
+    WAL busy timeout, and if the database stays locked past that it gives
+    up until the next run. Returns the responses removed and bytes freed.
+    """
+    cache_dir = Path(cache_dir)
+    if not (cache_dir / f"{HTTP_CACHE_NAME}.sqlite").exists():
+        return 0, 0
+    # requests is only imported along with FastF1, not with this module
+    from requests_cache import SQLiteCache
+
+    size_before = _http_cache_size(cache_dir)
+    cache = SQLiteCache(
+        str(cache_dir / HTTP_CACHE_NAME),
+        wal=True,
+        busy_timeout=HTTP_CACHE_BUSY_TIMEOUT_MS,
+    )
+    try:
+        count_before = len(cache.responses)
+        cache.delete(expired=True, vacuum=True)
+        expired = count_before - len(cache.responses)
+        # VACUUM rewrites the database through the WAL; fold it back in
+        with cache.responses.connection(commit=True) as connection:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.OperationalError as exc:
+        logger.warning("Could not purge the FastF1 HTTP cache: %s", exc)
+        return 0, 0
+    finally:
+        cache.close()
+    return expired, max(size_before - _http_cache_size(cache_dir), 0)
+
+
+def _remove_locked(
+    entry: CacheEntry, cache_dir: Path, locks: Optional[KeyedFileLock]
+) -> None:
+    if locks is None:
+        _remove(entry, cache_dir)
+        return
+    with locks.hold(lock_key(cache_dir, entry.path), timeout=0):
+        _remove(entry, cache_dir)
+
+
+def _remove(entry: CacheEntry, cache_dir: Path) -> None:
+    if entry.path.is_dir():
+        shutil.rmtree(entry.path, ignore_errors=True)
+    else:
+        entry.path.unlink(missing_ok=True)
+
+    # Drop event and season directories left empty
+    parent = entry.path.parent
+    while parent != cache_dir:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+
+
+def lock_key(cache_dir: Path, path: Path) -> str:
+    """The lock key of a session directory: its path inside the cache."""
+    return Path(path).relative_to(cache_dir).as_posix().strip("/")
+
+
+def cache_locks(cache_dir: Path, timeout: float = 30.0) -> KeyedFileLock:
+    return KeyedFileLock(Path(cache_dir) / LOCK_DIR_NAME, timeout)
+
+
+def enforce_budget(
+    cache_dir: Path,
+    budget_bytes: int,
+    volatile_max_age: float = 6 * 3600,
+    settle_seconds: float = 7 * 86400,
+    dry_run: bool = False,
+    now: Optional[float] = None,
+    locks: Optional[KeyedFileLock] = None,
+) -> EvictionReport:
+    """Evict cache entries until the cache fits in ``budget_bytes``.
+
+    Expired HTTP cache responses are purged first (not in a dry run), so
+    only the live part of the HTTP cache counts against the budget. With
+    ``locks``, an entry is only removed while holding its session lock, and
+    entries whose lock is taken (a load in progress) are skipped.
+    """
+    now = time.time() if now is None else now
+    expired, purged_bytes = (0, 0) if dry_run else purge_http_cache(cache_dir)
+    entries, pinned = scan_cache(cache_dir, now, settle_seconds)
+
+    report = EvictionReport(
+        budget_bytes=budget_bytes,
+        pinned_bytes=pinned,
+        http_expired=expired,
+        http_purged_bytes=purged_bytes,
+    )
+    total = pinned + sum(entry.size for entry in entries)
+    report.bytes_before = total + purged_bytes
+
+    volatile = sorted(
+        (entry for entry in entries if entry.kind == VOLATILE),
+        key=lambda entry: entry.last_used,
+    )
+    settled = sorted(
+        (entry for entry in entries if entry.kind == SETTLED),
+        key=lambda entry: entry.last_used,
+    )
+
+    evicted: set[Path] = set()
+    busy: set[Path] = set()
+
+    def evict(entry: CacheEntry) -> None:
+        nonlocal total
+        if entry.path in busy:
+            return
+        if not dry_run:
+            try:
+                _remove_locked(entry, cache_dir, locks)
+            except LockTimeout:
+                busy.add(entry.path)
+                report.busy.append(entry)
+                return
+        total -= entry.size
+        evicted.add(entry.path)
+        report.evicted.append(entry)
+
+    for entry in volatile:
+        if now - entry.last_used > volatile_max_age:
+            evict(entry)
+
+    for candidates in (volatile, settled):
+        for entry in candidates:
+            if total <= budget_bytes:
+                break
+            if entry.path not in evicted:
+                evict(entry)
+
+    for entry in entries:
+        if entry.path not in evicted:
+            report.kept[entry.kind] += 1
+    report.bytes_after = total
+
+    if total > budget_bytes:
+        logger.warning(
+            "FastF1 cache still uses %d bytes, over its %d byte budget "
+            "(%d bytes are never evicted)",
+            total,
+            budget_bytes,
+            pinned,
+        )
+    return report
+
+
+def _atomic_write_cache(cls: Any, data: Any, cache_file_path: str, **kwargs: Any):
+    """FastF1's ``Cache._write_cache``, renaming a finished file into place."""
+    new_cached = dict(**{"version": cls._API_CORE_VERSION, "data": data}, **kwargs)
+    directory = os.path.dirname(cache_file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            pickle.dump(new_cached, tmp_file)
+        os.replace(tmp_path, cache_file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _patch_write_cache(fastf1: Any) -> bool:
+    """Replace FastF1's cache writer, if it is still the one we know.
+
+    ``Cache._write_cache`` is private, so a FastF1 upgrade may rename or
+    change it. Then the cache stays enabled with FastF1's own writer (the
+    session locks still keep loads apart) and the mismatch is logged as an
+    error rather than patched blindly.
+    """
+    cache = fastf1.Cache
+    writer = getattr(cache, "_write_cache", None)
+    try:
+        parameters = list(inspect.signature(writer).parameters) if writer else None
+    except (TypeError, ValueError):
+        parameters = None
+    if parameters != WRITE_CACHE_PARAMETERS or not hasattr(cache, "_API_CORE_VERSION"):
+        logger.error(
+            "FastF1 %s has an unexpected Cache._write_cache%s; cache pickles "
+            "are not written atomically. Check fastf1_cache._atomic_write_cache "
+            "against this FastF1 version.",
+            getattr(fastf1, "__version__", "?"),
+            f"({', '.join(parameters)})" if parameters is not None else " (missing)",
+        )
+        return False
+    setattr(cache, "_write_cache", classmethod(_atomic_write_cache))
+    return True
+
+
+class DiskCache:
+    """The FastF1 cache enabled in ``cache_dir``, with per-session locks."""
+
+    def __init__(self, cache_dir: Path, lock_timeout: float):
+        self.cache_dir = Path(cache_dir)
+        self.locks = cache_locks(self.cache_dir, lock_timeout)
+
+    @contextmanager
+    def session_lock(self, api_path: str) -> Iterator[None]:
+        """Hold the lock for a FastF1 session while it loads.
+
+        If the lock is not free within the lock timeout (a load elsewhere is
+        stuck), carry on without it: pickles are written atomically, so the
+        worst case is loading the session twice rather than hanging.
+        """
+        key = api_path.removeprefix("/static/").strip("/")
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(self.locks.hold(key))
+            except LockTimeout as exc:
+                logger.warning("Loading %s without the cache lock: %s", key, exc)
+            yield
+
+
+def enable_disk_cache(
+    cache_dir: Path, lock_timeout: float = 30.0, http_expire_hours: float = 12
+) -> DiskCache:
+    """Enable FastF1's disk cache in ``cache_dir`` for use by many workers."""
+    import fastf1
+    from fastf1 import req
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    fastf1.Cache.enable_cache(str(cache_dir), use_requests_cache=False)
+    fastf1.Cache.set_enabled()
+    _patch_write_cache(fastf1)
+
+    # Same settings as FastF1's own HTTP cache, plus WAL and a busy timeout
+    fastf1.Cache._requests_session_cached = req._CachedSessionWithRateLimiting(
+        cache_name=str(cache_dir / HTTP_CACHE_NAME),
+        backend="sqlite",
+        allowable_methods=("GET", "POST"),
+        expire_after=timedelta(hours=http_expire_hours),
+        cache_control=True,
+        stale_if_error=True,
+        filter_fn=fastf1.Cache._custom_cache_filter,
+        wal=True,
+        busy_timeout=HTTP_CACHE_BUSY_TIMEOUT_MS,
+    )
+    return DiskCache(cache_dir, lock_timeout)
+
+
+def _redirect_adapter(base_url: str) -> Any:
+    """An adapter sending ``https://host/path?q`` to ``<base_url>/host/path?q``."""
+    # requests is only imported along with FastF1, not with this module
+    from requests.adapters import HTTPAdapter
+
+    base_url = base_url.rstrip("/")
+
+    class RedirectAdapter(HTTPAdapter):
+        def send(
+            self,
+            request,
+            stream=False,
+            timeout=None,
+            verify=True,
+            cert=None,
+            proxies=None,
+        ):
+            parts = urlsplit(request.url)
+            request = request.copy()
+            request.url = f"{base_url}/{parts.netloc}{parts.path}" + (
+                f"?{parts.query}" if parts.query else ""
+            )
+            return super().send(request, stream, timeout, verify, cert, proxies)
+
+    return RedirectAdapter()
+
+
+def redirect_upstream(base_url: str) -> None:
+    """Route FastF1's HTTP requests (cached or not) to ``base_url``.
+
+    FastF1's rate limits and HTTP cache still apply and still see the
+    original URLs; only the connection goes elsewhere. Call it after
+    ``enable_disk_cache``, which replaces the cached session.
+    """
+    import fastf1
+
+    adapter = _redirect_adapter(base_url)
+    sessions = [
+        fastf1.Cache._requests_session,
+        fastf1.Cache._requests_session_cached,
+    ]
+    for session in sessions:
+        if session is not None:
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+    logger.warning("FastF1 requests are redirected to %s", base_url)
+
+
+def forget_race_results(year: int, round_num: int) -> None:
+    """Drop the cached Ergast responses a race load reads its results from.
+
+    Ergast publishes results some hours after the flag, and until then
+    answers with an empty race that the HTTP cache would keep serving for
+    ``http_expire_hours``. The parsed live timing pickles are unaffected:
+    FastF1 only writes them once the data exists.
+    """
+    import fastf1
+    from fastf1.ergast.interface import BASE_URL
+
+    for endpoint in ("results", "laps/1"):
+        fastf1.Cache.delete_response(f"{BASE_URL}/{year}/{round_num}/{endpoint}.json")
@@ -0,0 +1,119 @@
+"""Per-key exclusive locks shared by threads and worker processes.
+
+``KeyedFileLock.hold(key)`` takes a process-local ``threading.Lock`` for the
+key first, so threads of one worker queue up without touching the disk, and
+then an ``flock`` on ``<lock_dir>/<hash of key>.lock``, which serializes the
+worker processes. Both waits are bounded by the timeout.
+
+Stale locks recover by themselves: the kernel drops an ``flock`` when the
+file descriptor closes, including when the holder crashes or is killed, so
+a lock can never outlive the process that took it. Lock files are left in
+place (deleting one while another process holds it would let a third take
+the same key) and only record who took the lock last, for diagnostics.
+
+Where ``fcntl`` is missing (Windows) only the thread lock is taken.
+"""
+
+import hashlib
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Polling interval bounds while another process holds the file lock
+_POLL_MIN = 0.005
+_POLL_MAX = 0.1
+
+
+class LockTimeout(TimeoutError):
+    def __init__(self, key: str, holder: str):
+        super().__init__(f"Timed out waiting for lock {key!r} (last taken by {holder})")
+        self.key = key
+        self.holder = holder
+
+
+class KeyedFileLock:
+    def __init__(self, lock_dir: Path, timeout: float = 30.0):
+        self.lock_dir = Path(lock_dir)
+        self.timeout = timeout
+        self._guard = threading.Lock()
+        self._thread_locks: dict[str, threading.Lock] = {}
+
+    def path_for(self, key: str) -> Path:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.lock_dir / f"{digest}.lock"
+
+    def holder(self, key: str) -> str:
+        """Who took the lock for key last, as written by that holder."""
+        try:
+            return self.path_for(key).read_text(encoding="utf-8").strip() or "unknown"
+        except OSError:
+            return "unknown"
+
+    @contextmanager
+    def hold(self, key: str, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold the lock for key, raising LockTimeout after ``timeout`` seconds.
+
+        A timeout of 0 tries once without waiting.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        thread_lock = self._thread_lock(key)
+        if timeout > 0:
+            acquired = thread_lock.acquire(timeout=timeout)
+        else:
+            acquired = thread_lock.acquire(blocking=False)
+        if not acquired:
+            raise LockTimeout(key, "another thread of this process")
+        try:
+            fd = self._acquire_file(key, deadline)
+            try:
+                yield
+            finally:
+                if fd is not None:
+                    os.close(fd)
+        finally:
+            thread_lock.release()
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            lock = self._thread_locks.get(key)
+            if lock is None:
+                lock = self._thread_locks[key] = threading.Lock()
+            return lock
+
+    def _acquire_file(self, key: str, deadline: float) -> Optional[int]:
+        if fcntl is None:
+            return None
+
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path_for(key), os.O_RDWR | os.O_CREAT, 0o644)
+        delay = _POLL_MIN
+        try:
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LockTimeout(key, self.holder(key))
+                    time.sleep(min(delay, remaining))
+                    delay = min(delay * 2, _POLL_MAX)
+
+            os.ftruncate(fd, 0)
+            owner = f"pid {os.getpid()} on {socket.gethostname()} at {time.time():.0f}"
+            os.pwrite(fd, f"{owner} for {key}\n".encode("utf-8"), 0)
+            return fd
+        except BaseException:
+            os.close(fd)
+            raise
@@ -0,0 +1,257 @@
+"""Single-pass highlights engine for the /highlights endpoint.
+
+Every lap column a category needs is pulled out of the lap frame once as a
+NumPy array. Each category then ranks its valid laps with one stable argsort,
+so the first entry is the overall extreme (ties go to the earliest lap row)
+and the leaderboard is the best lap of each of the top N drivers. All
+selected laps are joined to the results through a driver-number index and
+serialized in a single batch.
+
+Adding a category is one more ``Category`` in ``CATEGORIES``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+import columnar
+
+NAT = np.iinfo(np.int64).min
+
+
+@dataclass(frozen=True)
+class Category:
+    key: str
+    value_key: str
+    largest: bool
+    # Returns (sort key, valid mask, raw values) for every lap row
+    extract: Callable[["LapColumns"], tuple[np.ndarray, np.ndarray, np.ndarray]]
+    # Converts the raw values of the selected rows into JSON values
+    present: Callable[[np.ndarray], list[Any]]
+
+
+class LapColumns:
+    """Lazily materialized lap columns, each read at most once."""
+
+    def __init__(self, laps: pd.DataFrame):
+        self.laps = laps
+        self._cache: dict[str, np.ndarray] = {}
+
+    def timedelta_ns(self, name: str) -> np.ndarray:
+        if name not in self._cache:
+            values = columnar.column(self.laps, name)
+            if not pd.api.types.is_timedelta64_dtype(values.dtype):
+                values = pd.to_timedelta(values, errors="coerce")
+            self._cache[name] = (
+                values.to_numpy(dtype="timedelta64[ns]").view(np.int64).copy()
+            )
+        return self._cache[name]
+
+    def floats(self, name: str) -> np.ndarray:
+        if name not in self._cache:
+            values = columnar.column(self.laps, name)
+            if not pd.api.types.is_numeric_dtype(values.dtype):
+                values = cast(pd.Series, pd.to_numeric(values, errors="coerce"))
+            self._cache[name] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        return self._cache[name]
+
+    def deleted(self) -> np.ndarray:
+        if "Deleted" not in self._cache:
+            values = columnar.column(self.laps, "Deleted").to_numpy(dtype=object)
+            self._cache["Deleted"] = values == True  # noqa: E712
+        return self._cache["Deleted"]
+
+
+def _lap_time(columns: LapColumns):
+    lap_ns = columns.timedelta_ns("LapTime")
+    valid = (lap_ns != NAT) & ~columns.deleted()
+    return lap_ns, valid, lap_ns
+
+
+def _pit_duration(columns: LapColumns):
+    pit_in = columns.timedelta_ns("PitInTime")
+    pit_out = columns.timedelta_ns("PitOutTime")
+    valid = (pit_in != NAT) & (pit_out != NAT)
+    duration = np.where(valid, pit_in - pit_out, 0)
+    return duration, valid, duration
+
+
+def _speed(name: str):
+    def extract(columns: LapColumns):
+        speed = columns.floats(name)
+        return speed, ~np.isnan(speed), speed
+
+    return extract
+
+
+def _durations(raw: np.ndarray) -> list[Any]:
+    return columnar.format_durations(pd.Series(raw.astype("timedelta64[ns]")))
+
+
+def _speeds(raw: np.ndarray) -> list[Any]:
+    return raw.tolist()
+
+
+CATEGORIES = (
+    Category("fastestLap", "lapTime", False, _lap_time, _durations),
+    Category("fastestPitStop", "pitDuration", False, _pit_duration, _durations),
+    Category("fastestSpeed", "speed", True, _speed("SpeedFL"), _speeds),
+    Category("fastestSpeedI1", "speed", True, _speed("SpeedI1"), _speeds),
+    Category("fastestSpeedI2", "speed", True, _speed("SpeedI2"), _speeds),
+    Category("fastestSpeedST", "speed", True, _speed("SpeedST"), _speeds),
+)
+
+
+class DriverIndex:
+    """Driver number -> first matching row position in the results frame."""
+
+    def __init__(self, results: pd.DataFrame):
+        self.results = results
+        self.rows: dict[Any, int] = {}
+        for row, number in enumerate(results["DriverNumber"].tolist()):
+            self.rows.setdefault(number, row)
+
+    def lookup(self, numbers: list[Any]) -> list[Optional[int]]:
+        return [self.rows.get(number) for number in numbers]
+
+
+def serialize_lap_highlights(
+    laps: pd.DataFrame,
+    drivers: pd.DataFrame,
+    value_keys: list[str],
+    values: list[Any],
+) -> list[dict[str, Any]]:
+    """Serialize highlight laps, each paired row by row with its result row.
+
+    Row ``i`` carries ``values[i]`` under ``value_keys[i]`` between the lap
+    number and the team, matching the shape of every lap highlight.
+    """
+    lap_drivers = columnar.column(laps, "Driver")
+    codes = columnar.optional_strs(lap_drivers)
+    names = columnar.full_names(
+        columnar.column(drivers, "FirstName"), columnar.column(drivers, "LastName")
+    )
+    fallback_names = lap_drivers.astype(str).tolist()
+    lap_numbers = columnar.optional_ints(columnar.column(laps, "LapNumber"))
+    teams = columnar.optional_strs(columnar.column(laps, "Team"))
+    team_colors = columnar.optional_strs(columnar.column(drivers, "TeamColor"))
+
+    return [
+        {
+            "driverCode": codes[row],
+            "driverName": (
+                names[row] if names[row] is not None else fallback_names[row]
+            ),
+            "lapNumber": lap_numbers[row],
+            value_keys[row]: values[row],
+            "team": teams[row],
+            "teamColor": team_colors[row],
+        }
+        for row in range(len(laps))
+    ]
+
+
+def serialize_winner(results: pd.DataFrame) -> dict[str, Any]:
+    winner = results.iloc[[0]]
+    return columnar.records(
+        {
+            "driverCode": columnar.optional_strs(winner["Abbreviation"]),
+            "driverName": columnar.full_names(winner["FirstName"], winner["LastName"]),
+            "raceTime": columnar.format_durations(winner["Time"]),
+            "team": columnar.optional_strs(winner["TeamName"]),
+            "teamColor": columnar.optional_strs(winner["TeamColor"]),
+            "points": columnar.optional_floats(winner["Points"], default=0),
+        }
+    )[0]
+
+
+def _ranked(category: Category, columns: LapColumns) -> tuple[np.ndarray, np.ndarray]:
+    """Valid row positions ordered best first, plus the raw values per row."""
+    keys, valid, raw = category.extract(columns)
+    candidates = np.flatnonzero(valid)
+    candidate_keys = keys[candidates]
+    if category.largest:
+        # Negate instead of reversing so ties keep the earliest row first
+        candidate_keys = -candidate_keys
+    order = np.argsort(candidate_keys, kind="stable")
+    return candidates[order], raw
+
+
+def compute_lap_highlights(
+    laps: Optional[pd.DataFrame],
+    results: pd.DataFrame,
+    top_n: int = 5,
+    categories: tuple[Category, ...] = CATEGORIES,
+) -> dict[str, Any]:
+    """Return every category's best lap plus a per-driver top-N leaderboard."""
+    highlights: dict[str, Any] = {category.key: None for category in categories}
+    leaderboards: dict[str, list[dict[str, Any]]] = {
+        category.key: [] for category in categories
+    }
+
+    if laps is None or laps.empty:
+        highlights["leaderboards"] = leaderboards
+        return highlights
+
+    columns = LapColumns(laps)
+    driver_index = DriverIndex(results)
+    lap_drivers = columnar.column(laps, "DriverNumber").to_numpy(dtype=object)
+    result_rows = np.array(
+        [
+            row if row is not None else -1
+            for row in driver_index.lookup(lap_drivers.tolist())
+        ],
+        dtype=np.int64,
+    )
+    driver_codes, _ = pd.factorize(lap_drivers)
+
+    # (category, is_leaderboard, lap row, result row, raw value)
+    picks: list[tuple[Category, bool, int, int, Any]] = []
+    for category in categories:
+        ranked, raw = _ranked(category, columns)
+        if ranked.size == 0:
+            continue
+
+        # The overall best lap is reported even if its driver has no result
+        # row, in which case the highlight is None
+        best = int(ranked[0])
+        if result_rows[best] >= 0:
+            picks.append((category, False, best, int(result_rows[best]), raw[best]))
+
+        # Each driver's best lap in rank order, skipping unclassified drivers
+        matched = ranked[result_rows[ranked] >= 0]
+        _, first = np.unique(driver_codes[matched], return_index=True)
+        for row in matched[np.sort(first)[:top_n]]:
+            picks.append((category, True, int(row), int(result_rows[row]), raw[row]))
+
+    if not picks:
+        highlights["leaderboards"] = leaderboards
+        return highlights
+
+    # Format raw values per category, then serialize every pick at once
+    values: list[Any] = [None] * len(picks)
+    for category in categories:
+        indices = [i for i, pick in enumerate(picks) if pick[0] is category]
+        if indices:
+            formatted = category.present(np.array([picks[i][4] for i in indices]))
+            for i, value in zip(indices, formatted):
+                values[i] = value
+
+    entries = serialize_lap_highlights(
+        laps.iloc[[pick[2] for pick in picks]],
+        results.iloc[[pick[3] for pick in picks]],
+        [pick[0].value_key for pick in picks],
+        values,
+    )
+
+    for pick, entry in zip(picks, entries):
+        category, is_leaderboard = pick[0], pick[1]
+        if is_leaderboard:
+            leaderboards[category.key].append(entry)
+        else:
+            highlights[category.key] = entry
+
+    highlights["leaderboards"] = leaderboards
+    return highlights
@@ -0,0 +1,241 @@
+"""Rendered JSON responses with strong ETags and conditional GET support.
+
+Payloads are serialized once (with orjson when it is installed) into the
+exact bytes we send, and gzip and brotli variants of larger bodies are
+compressed at the same time. A request then only picks the variant its
+``Accept-Encoding`` allows; nothing is encoded or compressed per request.
+
+The ETag is a hash of the uncompressed bytes, with a suffix per content
+coding, so every variant has its own strong validator. ``RenderedPayload``
+also records whether it may be cached forever (a settled race). Entries
+that may still change remember the object they were built from (a loaded
+session or a schedule frame) through a weak reference; as long as that
+same object is still the cached one, the rendered body is still current
+and a revalidation can be answered without rebuilding anything.
+"""
+
+import gzip
+import hashlib
+import json
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli  # pyright: ignore[reportMissingImports]
+except ImportError:  # pragma: no cover - optional, gzip still works
+    brotli = None
+
+SETTLED_MAX_AGE = 365 * 24 * 3600
+
+# Smaller bodies are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Preferred first when a client accepts several codings equally
+ENCODING_PREFERENCE = ("br", "gzip")
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+def render_json(payload: Any) -> bytes:
+    """Serialize a payload to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(
+            payload,
+            default=jsonable_encoder,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def compose_object(fields: list[tuple[str, bytes]]) -> bytes:
+    """Join already rendered values into one JSON object body."""
+    members = [render_json(name) + b":" + value for name, value in fields]
+    return b"{" + b",".join(members) + b"}"
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    """Compressed encodings of a body, keyed by content coding."""
+    if len(body) < COMPRESS_MIN_BYTES:
+        return {}
+
+    variants = {"gzip": gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(
+            body, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY
+        )
+    return variants
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def cache_control(max_age: int, immutable: bool = False) -> str:
+    value = f"public, max-age={int(max_age)}"
+    return value + ", immutable" if immutable else value
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> dict[str, float]:
+    """Parse Accept-Encoding into ``{coding: q}``."""
+    accepted: dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etags: set[str]) -> bool:
+    """Weak comparison of an If-None-Match header against our ETags."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in etags:
+            return True
+    return False
+
+
+def _weak_source(source: Any) -> Optional[Callable[[], Any]]:
+    if source is None:
+        return None
+    try:
+        return weakref.ref(source)
+    except TypeError:
+        # Not weak-referenceable: never treat the entry as current
+        return lambda: None
+
+
+@dataclass(frozen=True)
+class RenderedPayload:
+    body: bytes
+    etag: str
+    settled: bool
+    variants: dict[str, bytes] = field(default_factory=dict, repr=False)
+    _source: Optional[Callable[[], Any]] = field(default=None, repr=False)
+
+    @classmethod
+    def render(
+        cls, payload: Any, settled: bool, source: Any = None
+    ) -> "RenderedPayload":
+        body = render_json(payload)
+        return cls.from_body(body, settled, source)
+
+    @classmethod
+    def from_body(
+        cls, body: bytes, settled: bool, source: Any = None
+    ) -> "RenderedPayload":
+        return cls(
+            body=body,
+            etag=etag_for(body),
+            settled=settled,
+            variants=compress_variants(body),
+            _source=None if settled else _weak_source(source),
+        )
+
+    def dumps(self) -> bytes:
+        """Serialize for the shared cache (without the source reference).
+
+        A JSON header line (ETag, settled, the length of each variant) and
+        then the raw bodies, so reading an entry never unpickles anything.
+        """
+        bodies = {"identity": self.body, **self.variants}
+        header = {
+            "etag": self.etag,
+            "settled": self.settled,
+            "lengths": {encoding: len(body) for encoding, body in bodies.items()},
+        }
+        return json.dumps(header).encode("utf-8") + b"\n" + b"".join(bodies.values())
+
+    @classmethod
+    def loads(cls, data: bytes) -> "RenderedPayload":
+        """Read ``dumps`` output; raises ValueError if it does not add up."""
+        line, _, rest = data.partition(b"\n")
+        header = json.loads(line)
+        bodies: dict[str, bytes] = {}
+        offset = 0
+        for encoding, length in header["lengths"].items():
+            if encoding not in ETAG_SUFFIXES:
+                raise ValueError(f"unknown encoding {encoding!r}")
+            bodies[encoding] = rest[offset : offset + length]
+            offset += length
+        if offset != len(rest):
+            raise ValueError(f"{len(rest)} bytes of bodies, expected {offset}")
+        body = bodies.pop("identity")
+        if etag_for(body) != header["etag"]:
+            raise ValueError("the ETag does not match the body")
+        return cls(
+            body=body, etag=header["etag"], settled=header["settled"], variants=bodies
+        )
+
+    def built_from(self, source: Any) -> bool:
+        """True if this body was rendered from exactly ``source``."""
+        return self._source is not None and self._source() is source
+
+    def etag_for_encoding(self, encoding: str) -> str:
+        return self.etag[:-1] + ETAG_SUFFIXES[encoding] + '"'
+
+    def select(self, accept_encoding: Optional[str]) -> tuple[str, bytes]:
+        """Pick the best pre-compressed variant the client accepts."""
+        if self.variants:
+            accepted = accepted_encodings(accept_encoding)
+            wildcard = accepted.get("*", 0.0)
+            best, best_quality = None, 0.0
+            for encoding in ENCODING_PREFERENCE:
+                quality = accepted.get(encoding, wildcard)
+                if encoding in self.variants and quality > best_quality:
+                    best, best_quality = encoding, quality
+            if best is not None:
+                return best, self.variants[best]
+        return "identity", self.body
+
+
+def conditional_response(
+    request: Request, rendered: RenderedPayload, cache_control_value: str
+) -> Response:
+    """A 304 if the client already has this body, otherwise the best variant."""
+    encoding, content = rendered.select(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": rendered.etag_for_encoding(encoding),
+        "Cache-Control": cache_control_value,
+    }
+    if rendered.variants:
+        headers["Vary"] = "Accept-Encoding"
+
+    known = {rendered.etag_for_encoding(coding) for coding in rendered.variants}
+    known.add(rendered.etag)
+    if etag_matches(request.headers.get("if-none-match"), known):
+        return Response(status_code=304, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,371 @@
+"""Compact on-disk lap, result and weather tables for settled races.
+
+Each race is a directory of one ``.npy`` file per column::
+
+    <root>/<version>/<year>/<round>/
+        meta.json            event fields and the column layout
+        laps/<Column>.npy
+        results/<Column>.npy
+        weather/<Column>.npy
+
+Numeric, boolean and timedelta columns are stored as their NumPy arrays.
+String columns are stored as integer codes plus a category list in
+``meta.json`` (code -1 means missing). Only the columns our endpoints read
+are kept. A race directory is written under a temporary name and renamed
+into place, so readers never see a half-written race, and it is never
+rewritten afterwards (``delete`` drops it, and the next ingest writes it
+again).
+
+Reads memory-map the column files, so numeric and timedelta columns are
+zero-copy views of the OS page cache and every worker process serving the
+same race shares one copy. ``open_race`` wraps the tables in a
+``StoredSession`` that the payload builders accept in place of a loaded
+FastF1 session.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Optional
+
+from warmup import LazyModule
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    # Imported on first use, so the server can start answering before them
+    np = LazyModule("numpy")
+    pd = LazyModule("pandas")
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the stored columns or their encoding change
+LAP_STORE_VERSION = 1
+
+TABLE_COLUMNS = {
+    "laps": [
+        "DriverNumber",
+        "Driver",
+        "Team",
+        "LapNumber",
+        "Position",
+        "LapTime",
+        "PitInTime",
+        "PitOutTime",
+        "Deleted",
+        "SpeedI1",
+        "SpeedI2",
+        "SpeedFL",
+        "SpeedST",
+    ],
+    "results": [
+        "DriverNumber",
+        "Abbreviation",
+        "FirstName",
+        "LastName",
+        "TeamName",
+        "TeamColor",
+        "Position",
+        "GridPosition",
+        "Status",
+        "Points",
+        "Time",
+    ],
+    "weather": ["AirTemp", "TrackTemp", "Humidity"],
+}
+
+EVENT_FIELDS = [
+    "RoundNumber",
+    "EventName",
+    "OfficialEventName",
+    "Location",
+    "Country",
+    "Session5DateUtc",
+]
+
+
+def _encode_column(values: pd.Series) -> tuple[np.ndarray, dict[str, Any]]:
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return values.to_numpy(dtype=bool), {"kind": "bool"}
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return values.to_numpy(dtype="timedelta64[ns]"), {"kind": "timedelta"}
+    if pd.api.types.is_numeric_dtype(dtype):
+        return values.to_numpy(), {"kind": "numeric"}
+
+    raw = values.to_numpy(dtype=object)
+    present = pd.notna(raw)
+    if present.any() and all(isinstance(v, (bool, np.bool_)) for v in raw[present]):
+        # Object-typed flags such as Deleted; missing counts as False
+        return np.where(present, raw, False).astype(bool), {"kind": "bool"}
+
+    # Strings (and anything else) become categorical codes
+    labels, categories = pd.factorize(np.array([str(v) for v in raw[present]]))
+    code_dtype = np.int16 if len(categories) < np.iinfo(np.int16).max else np.int32
+    codes = np.full(len(raw), -1, dtype=code_dtype)
+    codes[present] = labels
+    return codes, {
+        "kind": "category",
+        "categories": [str(category) for category in categories],
+    }
+
+
+def _decode_column(array: np.ndarray, spec: dict[str, Any]) -> Any:
+    if spec["kind"] != "category":
+        return array
+    categories = np.array(spec["categories"] + [None], dtype=object)
+    # Code -1 indexes the trailing None
+    return categories[array]
+
+
+def _event_record(event: Any) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for field in EVENT_FIELDS:
+        value = None
+        if event is not None:
+            try:
+                value = event.get(field)
+            except AttributeError:
+                value = getattr(event, field, None)
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            record[field] = None
+        elif isinstance(value, pd.Timestamp):
+            record[field] = value.isoformat()
+        elif isinstance(value, (np.integer, np.floating)):
+            record[field] = value.item()
+        else:
+            record[field] = value
+    return record
+
+
+def _num_corners(session: Any) -> Optional[int]:
+    try:
+        circuit_info = session.get_circuit_info()
+    except Exception:
+        return None
+    corners = getattr(circuit_info, "corners", None)
+    return len(corners) if corners is not None else None
+
+
+class StoredSession:
+    """Read-only stand-in for a loaded FastF1 race session."""
+
+    def __init__(
+        self,
+        laps: Optional[pd.DataFrame],
+        results: Optional[pd.DataFrame],
+        weather_data: Optional[pd.DataFrame],
+        event: Optional[pd.Series],
+        num_corners: Optional[int],
+    ):
+        self.laps = laps
+        self.results = results
+        self.weather_data = weather_data
+        self.event = event
+        self.num_corners = num_corners
+
+    def get_circuit_info(self) -> Any:
+        corners = range(self.num_corners) if self.num_corners is not None else None
+        return SimpleNamespace(corners=corners)
+
+
+class LapStore:
+    def __init__(self, root: Optional[Path], version: str = f"v{LAP_STORE_VERSION}"):
+        self.root = Path(root) if root else None
+        self.version = version
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def race_dir(self, year: int, round_num: int) -> Path:
+        assert self.root is not None
+        return self.root / self.version / str(int(year)) / f"{int(round_num):02d}"
+
+    def has_race(self, year: int, round_num: int) -> bool:
+        if self.root is None:
+            return False
+        return (self.race_dir(year, round_num) / "meta.json").exists()
+
+    def write_race(
+        self,
+        year: int,
+        round_num: int,
+        session: Any,
+        missing_sections: Optional[dict[str, str]] = None,
+    ) -> bool:
+        """Write a race's tables once; returns False if it already exists.
+
+        ``missing_sections`` maps endpoint sections that have no data for this
+        race (a 404 from their builder) to the reason, so the ingest knows the
+        race is complete without a stored payload for them.
+        """
+        if self.root is None or self.has_race(year, round_num):
+            return False
+
+        target = self.race_dir(year, round_num)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}."))
+
+        try:
+            tables: dict[str, Any] = {}
+            for table, columns in TABLE_COLUMNS.items():
+                frame = getattr(
+                    session, "weather_data" if table == "weather" else table, None
+                )
+                table_dir = staging / table
+                table_dir.mkdir()
+                layout: dict[str, Any] = {}
+                rows = 0
+                if frame is not None and not frame.empty:
+                    rows = len(frame)
+                    for column in columns:
+                        if column not in frame.columns:
+                            continue
+                        array, spec = _encode_column(frame[column])
+                        np.save(table_dir / f"{column}.npy", array, allow_pickle=False)
+                        layout[column] = spec
+                tables[table] = {"rows": rows, "columns": layout}
+
+            meta = {
+                "version": self.version,
+                "year": int(year),
+                "round": int(round_num),
+                "event": _event_record(getattr(session, "event", None)),
+                "numCorners": _num_corners(session),
+                "missingSections": dict(missing_sections or {}),
+                "tables": tables,
+            }
+            with (staging / "meta.json").open("w", encoding="utf-8") as handle:
+                json.dump(meta, handle, separators=(",", ":"))
+
+            try:
+                os.rename(staging, target)
+            except OSError:
+                if self.has_race(year, round_num):
+                    # Another writer finished first; theirs is just as good
+                    return False
+                raise
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+        return True
+
+    def delete(self, year: int, round_num: Optional[int] = None) -> int:
+        """Remove a stored race, or a whole season; returns the races removed.
+
+        The directory is renamed away before it is deleted, so readers see
+        the race either complete or gone.
+        """
+        if self.root is None:
+            return 0
+        season = self.root / self.version / str(int(year))
+        target = season if round_num is None else self.race_dir(year, round_num)
+        if not target.exists():
+            return 0
+        removed = sum(1 for _ in target.glob("**/meta.json"))
+        doomed = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}."))
+        os.replace(target, doomed / target.name)
+        shutil.rmtree(doomed, ignore_errors=True)
+        return removed
+
+    def set_missing_sections(
+        self, year: int, round_num: int, missing_sections: dict[str, str]
+    ) -> bool:
+        """Record the sections without data for a race written earlier."""
+        meta = self.read_meta(year, round_num)
+        if meta is None:
+            return False
+        if meta.get("missingSections") == missing_sections:
+            return True
+        meta["missingSections"] = dict(missing_sections)
+
+        path = self.race_dir(year, round_num) / "meta.json"
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".meta.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(meta, handle, separators=(",", ":"))
+            # Readers only ever see the old or the new meta.json
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return True
+
+    def missing_sections(self, year: int, round_num: int) -> dict[str, str]:
+        meta = self.read_meta(year, round_num)
+        return dict(meta.get("missingSections") or {}) if meta else {}
+
+    def read_meta(self, year: int, round_num: int) -> Optional[dict[str, Any]]:
+        if self.root is None:
+            return None
+        path = self.race_dir(year, round_num) / "meta.json"
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable lap store entry %s: %s", path, exc)
+            return None
+        if meta.get("version") != self.version:
+            return None
+        return meta
+
+    def read_table(
+        self, year: int, round_num: int, table: str, meta: Optional[dict] = None
+    ) -> Optional[pd.DataFrame]:
+        meta = meta or self.read_meta(year, round_num)
+        if meta is None:
+            return None
+        layout = meta["tables"].get(table)
+        if layout is None:
+            return None
+
+        table_dir = self.race_dir(year, round_num) / table
+        data = {
+            column: _decode_column(
+                np.load(table_dir / f"{column}.npy", mmap_mode="r"), spec
+            )
+            for column, spec in layout["columns"].items()
+        }
+        # copy=False keeps each memory-mapped column as its own block
+        return pd.DataFrame(data, index=pd.RangeIndex(layout["rows"]), copy=False)
+
+    def open_race(self, year: int, round_num: int) -> Optional[StoredSession]:
+        """Return a race's stored tables as a session, or None if not stored."""
+        meta = self.read_meta(year, round_num)
+        if meta is None:
+            return None
+
+        try:
+            tables = {
+                table: self.read_table(year, round_num, table, meta)
+                for table in TABLE_COLUMNS
+            }
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "Ignoring unreadable lap store race %s-%s: %s", year, round_num, exc
+            )
+            return None
+
+        event = pd.Series(meta["event"], dtype=object)
+        race_time = meta["event"].get("Session5DateUtc")
+        if race_time is not None:
+            event["Session5DateUtc"] = pd.Timestamp(race_time)
+
+        return StoredSession(
+            laps=tables["laps"],
+            results=tables["results"],
+            weather_data=tables["weather"],
+            event=event,
+            num_corners=meta.get("numCorners"),
+        )
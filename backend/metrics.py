@@ -0,0 +1,320 @@
+"""In-process metrics rendered in the Prometheus text format.
+
+A deliberately small implementation (counters, histograms and gauges read
+at scrape time) so the API does not need ``prometheus_client``. Every
+uvicorn worker keeps its own numbers; each sample carries a ``worker``
+label with the process id so scrapes of different workers do not collide.
+
+``current_route`` holds the route template of the request being served. The
+metrics middleware sets it, and it follows the request into coalesced tasks
+and (through ``contextvars.copy_context``) into the build pool, so phase
+timings are attributed to the route that triggered the work. Work started
+outside a request (background refreshes) is labelled ``background``.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Optional
+
+current_route: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_route", default="background"
+)
+
+# Seconds; FastF1 loads take tens of seconds, cached responses microseconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+    def samples(self, base: dict[str, str]) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def samples(self, base: dict[str, str]) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        names = tuple(base) + self.labels
+        return [
+            f"{self.name}{_format_labels(names, tuple(base.values()) + key)} "
+            f"{_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = (
+                    [0] * (len(self.buckets) + 1),
+                    [0.0],
+                )
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return sum(series[0]) if series else 0
+
+    def samples(self, base: dict[str, str]) -> list[str]:
+        with self._lock:
+            series = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._series.items()
+            )
+        names = tuple(base) + self.labels
+        lines = []
+        for key, (counts, total) in series:
+            values = tuple(base.values()) + key
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(
+                    names + ("le",), values + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(names, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A value read from ``read`` at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        read: Callable[[], float],
+    ):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def samples(self, base: dict[str, str]) -> list[str]:
+        names = tuple(base)
+        labels = _format_labels(names, base.values())
+        return [f"{self.name}{labels} {_format_value(float(self.read()))}"]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self, name: str, help_text: str, labels: Iterable[str] = ()
+    ) -> Histogram:
+        metric = Histogram(name, help_text, labels)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> Gauge:
+        metric = Gauge(name, help_text, read)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        base = {"worker": str(os.getpid())}
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples(base))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "f1_http_request_duration_seconds",
+    "Time to serve a request, by route template and status",
+    ("route", "method", "status"),
+)
+PHASE_DURATION = REGISTRY.histogram(
+    "f1_phase_duration_seconds",
+    "Time spent per phase (upstream_load, transform, serialize) by route",
+    ("route", "phase"),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "f1_upstream_errors_total",
+    "Failed upstream FastF1 calls by operation and kind "
+    "(timeout, rate_limited, rejected)",
+    ("operation", "kind"),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "f1_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ("cache", "result"),
+)
+PREFETCH_RUNS = REGISTRY.counter(
+    "f1_prefetch_runs_total",
+    "Background prefetch attempts by kind (poll, warm) and outcome "
+    "(complete, incomplete, busy, error, gave_up)",
+    ("kind", "outcome"),
+)
+
+UPSTREAM_LOAD = "upstream_load"
+TRANSFORM = "transform"
+SERIALIZE = "serialize"
+
+
+def phase(name: str, route: Optional[str] = None):
+    """Time a block as phase ``name`` of the current route."""
+    return PHASE_DURATION.time(route or current_route.get(), name)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def upstream_error(operation: str, kind: str) -> None:
+    UPSTREAM_ERRORS.inc(operation, kind)
+
+
+def prefetch_run(kind: str, outcome: str) -> None:
+    PREFETCH_RUNS.inc(kind, outcome)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route template.
+
+    ``route_for`` maps a scope to its template (say ``/race/{year}/{round}``)
+    so that the label set stays bounded; unknown paths are ``unmatched``.
+    """
+
+    def __init__(self, app, route_for: Callable[[dict], str]):
+        self.app = app
+        self.route_for = route_for
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self.route_for(scope)
+        token = current_route.set(route)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                route,
+                scope.get("method", ""),
+                str(status["code"]),
+            )
+            current_route.reset(token)
@@ -0,0 +1,161 @@
+"""Disk-backed store of finished endpoint payloads for settled races.
+
+Once a race is older than the settle window its results no longer change, so
+the JSON we build from a full FastF1 load can be written once and served from
+disk forever after. Entries live at::
+
+    <root>/<version>/<year>/<round>/<endpoint>.json
+
+``version`` combines our payload schema version with the installed FastF1
+version, so bumping either simply starts a fresh tree and old entries are
+ignored. Entries are written atomically and never overwritten; ``delete``
+removes a race (or season) so that it is built and stored again.
+
+This module deliberately does not import FastF1 or pandas: serving a stored
+payload must not pay for either.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shape of any stored endpoint payload changes
+PAYLOAD_SCHEMA_VERSION = 2
+
+
+def fastf1_version() -> str:
+    try:
+        return metadata.version("fastf1")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def default_version_tag() -> str:
+    return f"v{PAYLOAD_SCHEMA_VERSION}-fastf1-{fastf1_version()}"
+
+
+class PayloadStore:
+    def __init__(
+        self,
+        root: Optional[Path],
+        version: str,
+        settle_seconds: float,
+    ):
+        self.root = Path(root) if root else None
+        self.version = version
+        self.settle_seconds = settle_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def path_for(self, year: int, round_num: int, endpoint: str) -> Path:
+        assert self.root is not None
+        return (
+            self.root
+            / self.version
+            / str(int(year))
+            / f"{int(round_num):02d}"
+            / f"{endpoint}.json"
+        )
+
+    def is_settled(self, race_time: Optional[datetime]) -> bool:
+        """True when the race finished more than the settle window ago."""
+        if race_time is None:
+            return False
+        if race_time.tzinfo is None:
+            race_time = race_time.replace(tzinfo=timezone.utc)
+        age = time.time() - race_time.timestamp()
+        return age > self.settle_seconds
+
+    def get(self, year: int, round_num: int, endpoint: str) -> Optional[Any]:
+        if self.root is None:
+            return None
+
+        path = self.path_for(year, round_num, endpoint)
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable payload entry %s: %s", path, exc)
+            return None
+
+        if entry.get("version") != self.version:
+            return None
+        return entry.get("payload")
+
+    def put(
+        self,
+        year: int,
+        round_num: int,
+        endpoint: str,
+        payload: Any,
+        race_time: Optional[datetime],
+    ) -> bool:
+        """Persist a payload if the race has settled; returns True if written."""
+        if self.root is None or not self.is_settled(race_time):
+            return False
+
+        path = self.path_for(year, round_num, endpoint)
+        if path.exists():
+            # Settled entries are immutable
+            return False
+
+        assert race_time is not None
+        entry = {
+            "version": self.version,
+            "year": int(year),
+            "round": int(round_num),
+            "endpoint": endpoint,
+            "raceDateUtc": race_time.isoformat(),
+            "storedAt": time.time(),
+            "payload": payload,
+        }
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(
+                dir=path.parent, prefix=f".{endpoint}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(entry, handle, separators=(",", ":"))
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as exc:
+            logger.warning("Could not persist payload %s: %s", path, exc)
+            return False
+
+        return True
+
+    def delete(self, year: int, round_num: Optional[int] = None) -> int:
+        """Remove a race's stored payloads, or a whole season's.
+
+        Returns the number of payloads removed. The next request for them
+        builds them again and, since the race is settled, stores them anew.
+        """
+        if self.root is None:
+            return 0
+        season = self.root / self.version / str(int(year))
+        target = season if round_num is None else season / f"{int(round_num):02d}"
+        if not target.exists():
+            return 0
+        removed = sum(1 for _ in target.glob("**/*.json"))
+        # Renamed away first, so a reader finds a race's payloads or none
+        doomed = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{target.name}."))
+        os.replace(target, doomed / target.name)
+        shutil.rmtree(doomed, ignore_errors=True)
+        return removed
@@ -0,0 +1,121 @@
+"""Columnar driver x lap position matrix for the /positions endpoint.
+
+Replaces the per-driver filter/sort/iterrows loop with a single pass over
+the lap columns: every (driver, lap) cell is scattered into a NumPy matrix,
+pit laps into a boolean mask of the same shape, and the per-driver lists are
+sliced out at the end.
+
+A lap only counts when both its lap number and its position are present and
+non-zero, exactly like the old loop. Missing laps inside a driver's range are
+None; the row stops at the driver's last counted lap.
+"""
+
+from typing import Any, Optional, cast
+
+import numpy as np
+import pandas as pd
+
+
+def _column(laps: pd.DataFrame, name: str) -> Optional[pd.Series]:
+    return cast(pd.Series, laps[name]) if name in laps.columns else None
+
+
+def _floats(laps: pd.DataFrame, name: str) -> np.ndarray:
+    """A column as float64 with NaN for missing or non-numeric values."""
+    values = cast(pd.Series, pd.to_numeric(laps[name], errors="coerce"))
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    if value is None or pd.isna(value):
+        return None
+    return str(value)
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or pd.isna(value):
+        return None
+    return int(value)
+
+
+def build_position_rows(
+    laps: pd.DataFrame, team_colors: dict[int, str]
+) -> list[dict[str, Any]]:
+    """Return one /positions driver entry per driver, in order of appearance."""
+    if laps is None or laps.empty:
+        return []
+
+    # Drivers in order of first appearance; NaN driver numbers get code -1
+    driver_codes, driver_numbers = pd.factorize(laps["DriverNumber"])
+    n_drivers = len(driver_numbers)
+    if n_drivers == 0:
+        return []
+
+    lap_values = _floats(laps, "LapNumber")
+    position_values = _floats(laps, "Position")
+
+    # int() truncation, then the old `if lap_num and position` truthiness test
+    lap_known = ~np.isnan(lap_values)
+    position_known = ~np.isnan(position_values)
+    lap_ints = np.zeros(len(laps), dtype=np.int64)
+    position_ints = np.zeros(len(laps), dtype=np.int64)
+    lap_ints[lap_known] = np.trunc(lap_values[lap_known])
+    position_ints[position_known] = np.trunc(position_values[position_known])
+
+    counted = (driver_codes >= 0) & (lap_ints >= 1) & (position_ints != 0)
+
+    rows = driver_codes[counted]
+    cols = lap_ints[counted] - 1
+    width = int(cols.max()) + 1 if cols.size else 0
+
+    # 0 marks "no position" since counted laps never have position 0
+    matrix = np.zeros((n_drivers, width), dtype=np.int64)
+    matrix[rows, cols] = position_ints[counted]
+
+    lengths = np.zeros(n_drivers, dtype=np.int64)
+    np.maximum.at(lengths, rows, cols + 1)
+
+    pit_out = _column(laps, "PitOutTime")
+    pit_mask = np.zeros((n_drivers, width), dtype=bool)
+    if pit_out is not None:
+        pitted = counted & pit_out.notna().to_numpy()
+        pit_mask[driver_codes[pitted], lap_ints[pitted] - 1] = True
+
+    cells = matrix.astype(object)
+    cells[matrix == 0] = None
+    position_lists = cells.tolist()
+
+    pit_rows, pit_cols = np.nonzero(pit_mask)
+    pit_bounds = np.searchsorted(pit_rows, np.arange(n_drivers + 1))
+    pit_laps = (pit_cols + 1).tolist()
+
+    # Each driver's code and team come from their lowest-numbered lap
+    lap_sort_key = np.where(lap_known, lap_values, np.inf)
+    order = np.lexsort((np.arange(len(laps)), lap_sort_key, driver_codes))
+    sorted_codes = driver_codes[order]
+    first_offsets = np.searchsorted(sorted_codes, np.arange(n_drivers))
+    first_rows = order[first_offsets]
+
+    first_laps = laps.iloc[first_rows]
+    first_numbers = first_laps["DriverNumber"].tolist()
+    first_codes = first_laps["Driver"].tolist()
+    first_teams = first_laps["Team"].tolist()
+
+    drivers_data = []
+    for index in range(n_drivers):
+        driver_num = _optional_int(first_numbers[index])
+        drivers_data.append(
+            {
+                "driverNumber": driver_num,
+                "code": _optional_str(first_codes[index]),
+                "team": _optional_str(first_teams[index]),
+                "teamColor": (
+                    team_colors.get(driver_num) if driver_num is not None else None
+                ),
+                "positions": position_lists[index][: lengths[index]],
+                "pitLaps": pit_laps[pit_bounds[index] : pit_bounds[index + 1]],
+                "dnfLap": None,
+            }
+        )
+
+    return drivers_data
@@ -0,0 +1,229 @@
+"""Background prefetch of race payloads around race weekends.
+
+The first visitors after a race used to pay for the cold FastF1 load, right
+when traffic peaks. ``PrefetchScheduler`` runs on the event loop and, from
+the season schedules (each race's ``Session5DateUtc``):
+
+* once a race is ``first_poll_after`` past its start, polls it every
+  ``poll_interval`` until its data is complete (results published, laps
+  available), then materializes its endpoint payloads; it gives up
+  ``poll_window`` after the start;
+* on startup, warms the latest ``warm_races`` finished races.
+
+The scheduler only decides *when*. ``poll`` and ``warm`` are the app's own
+load-and-render paths, so every FastF1 call goes through the same upstream
+executor (and its limits) as user requests, and joins user requests for the
+same race instead of loading it twice. Work is deferred while
+``has_capacity`` says the executor is busy with user traffic.
+
+With several worker processes only the one holding the leader lock runs the
+schedule; the others keep trying to take it over and meanwhile pick up the
+materialized payloads through the shared cache.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Sequence
+
+import metrics
+from file_lock import KeyedFileLock, LockTimeout
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK_KEY = "prefetch-scheduler"
+
+POLL = "poll"
+WARM = "warm"
+
+
+@dataclass
+class RaceState:
+    year: int
+    round: int
+    race_time: datetime
+    kind: str
+    attempts: int = 0
+    next_attempt: float = 0.0
+    done: bool = False
+    last_error: Optional[str] = None
+
+
+class PrefetchScheduler:
+    def __init__(
+        self,
+        race_times: Callable[[int], Awaitable[Sequence[tuple[int, datetime]]]],
+        poll: Callable[[int, int], Awaitable[bool]],
+        warm: Callable[[int, int], Awaitable[None]],
+        has_capacity: Callable[[], bool],
+        warm_races: int = 3,
+        first_poll_after: float = 2 * 3600,
+        poll_interval: float = 600,
+        poll_window: float = 48 * 3600,
+        busy_retry: float = 30,
+        tick_interval: float = 60,
+        max_warm_attempts: int = 3,
+        locks: Optional[KeyedFileLock] = None,
+    ):
+        self.race_times = race_times
+        self.poll = poll
+        self.warm = warm
+        self.has_capacity = has_capacity
+        self.warm_races = max(0, warm_races)
+        self.first_poll_after = first_poll_after
+        self.poll_interval = poll_interval
+        self.poll_window = poll_window
+        self.busy_retry = busy_retry
+        self.tick_interval = tick_interval
+        self.max_warm_attempts = max(1, max_warm_attempts)
+        self.locks = locks
+        self.races: dict[tuple[int, int], RaceState] = {}
+        self._warmed = False
+        self._leader: Optional[ExitStack] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, after: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        """Run the schedule on the event loop, once ``after`` (if any) is done."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(
+                self.run(after), name="prefetch-scheduler"
+            )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._leader is not None:
+            self._leader.close()
+            self._leader = None
+
+    async def run(self, after: Optional[Callable[[], Awaitable[None]]] = None) -> None:
+        if after is not None:
+            await after()
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Prefetch tick failed")
+            await asyncio.sleep(self.tick_interval)
+
+    def is_leader(self) -> bool:
+        """Take the leader lock if nobody holds it; True while we do."""
+        if self.locks is None or self._leader is not None:
+            return True
+        stack = ExitStack()
+        try:
+            stack.enter_context(self.locks.hold(LEADER_LOCK_KEY, timeout=0))
+        except LockTimeout:
+            return False
+        logger.info("Prefetch scheduler running in this worker")
+        self._leader = stack
+        return True
+
+    async def tick(self, now: Optional[datetime] = None) -> None:
+        """Refresh the tracked races from the schedule and run the due ones."""
+        if not self.is_leader():
+            return
+        now = datetime.now(timezone.utc) if now is None else now
+        await self.track(now)
+
+        clock = time.time()
+        due = [
+            state
+            for state in self.races.values()
+            if not state.done and state.next_attempt <= clock
+        ]
+        # Latest race first: that is where the traffic is
+        for state in sorted(due, key=lambda state: state.race_time, reverse=True):
+            if not self.has_capacity():
+                logger.info("Upstream busy; deferring prefetch")
+                break
+            await self.attempt(state)
+
+    async def track(self, now: datetime) -> None:
+        """Start tracking races that became due; forget expired ones."""
+        first_poll = timedelta(seconds=self.first_poll_after)
+        window = timedelta(seconds=self.poll_window)
+
+        finished: list[tuple[datetime, int, int]] = []
+        years = [now.year]
+        if not self._warmed or (now - window).year != now.year:
+            years.append(now.year - 1)
+        for year in years:
+            try:
+                races = await self.race_times(year)
+            except Exception as exc:
+                logger.warning("Prefetch has no schedule for %s: %s", year, exc)
+                continue
+            for round_num, race_time in races:
+                if race_time + first_poll <= now:
+                    finished.append((race_time, year, round_num))
+        finished.sort(reverse=True)
+
+        for race_time, year, round_num in finished:
+            if now - race_time <= window:
+                self._add(year, round_num, race_time, POLL)
+        if not self._warmed:
+            self._warmed = True
+            for race_time, year, round_num in finished[: self.warm_races]:
+                self._add(year, round_num, race_time, WARM)
+
+        for key, state in list(self.races.items()):
+            if state.kind == POLL and now - state.race_time > window:
+                if not state.done:
+                    logger.warning(
+                        "Gave up prefetching %s-%s: data still incomplete (%s)",
+                        state.year,
+                        state.round,
+                        state.last_error or "no results yet",
+                    )
+                    metrics.prefetch_run(state.kind, "gave_up")
+                del self.races[key]
+
+    def _add(self, year: int, round_num: int, race_time: datetime, kind: str):
+        if (year, round_num) not in self.races:
+            self.races[(year, round_num)] = RaceState(year, round_num, race_time, kind)
+
+    async def attempt(self, state: RaceState) -> None:
+        state.attempts += 1
+        try:
+            if state.kind == POLL:
+                state.done = await self.poll(state.year, state.round)
+                if not state.done:
+                    state.last_error = "incomplete"
+            else:
+                await self.warm(state.year, state.round)
+                state.done = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            state.last_error = str(getattr(exc, "detail", exc))
+            status = getattr(exc, "status_code", None)
+            logger.warning(
+                "Prefetch of %s-%s failed: %s",
+                state.year,
+                state.round,
+                state.last_error,
+            )
+            metrics.prefetch_run(state.kind, "busy" if status == 503 else "error")
+            retry = self.busy_retry if status == 503 else self.poll_interval
+            state.next_attempt = time.time() + retry
+            if state.kind == WARM and state.attempts >= self.max_warm_attempts:
+                del self.races[(state.year, state.round)]
+            return
+
+        if state.done:
+            logger.info("Prefetched %s-%s (%s)", state.year, state.round, state.kind)
+            metrics.prefetch_run(state.kind, "complete")
+        else:
+            metrics.prefetch_run(state.kind, "incomplete")
+            state.next_attempt = time.time() + self.poll_interval
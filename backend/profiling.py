@@ -0,0 +1,254 @@
+"""Opt-in sampling profiler for individual requests.
+
+When PROFILING_ENABLED and PROFILING_TOKEN are both set, app.py installs
+``ProfilingMiddleware`` and the /debug/profiles routes. A request whose
+``X-Profile`` header carries the token is then served while a background
+thread samples the Python stack of every thread each ``interval`` seconds. A
+sampler rather than cProfile, because the interesting work
+(``session.load``, ``get_circuit_info``, the payload builders) runs on the
+upstream executor and build pool threads, not on the thread that handled the
+request.
+
+Each profiled request leaves two files in the profile directory:
+
+* ``<id>.folded``: collapsed stacks (``thread;frame;frame count``), which
+  speedscope, flamegraph.pl or inferno turn into a flamegraph;
+* ``<id>.json``: the request, its timing and the functions with the most
+  samples, listed by the index endpoint.
+
+Samples cover the whole process, so profile one request at a time on a
+quiet instance; only one request is profiled at once and others are served
+normally meanwhile. Threads that are idle (waiting on a lock, a queue or
+the selector) are not counted. Without both settings nothing is installed,
+so there is no overhead at all; there is no tokenless mode, since profiles
+expose stack frames and the profiler slows the whole process down.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+PROFILE_HEADER = "x-profile"
+
+# Frames under here (thread and event loop plumbing) stay out of the top list
+_STDLIB = os.path.normcase(sysconfig.get_paths()["stdlib"]) + os.sep
+
+# (file name, function) of leaf frames that mean "this thread is idle"
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(code: Any) -> str:
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class StackSampler:
+    """Samples the stacks of all other threads until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.stdlib_frames: set[str] = set()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                leaf = frame.f_code
+                if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+                    continue
+                labels = []
+                while frame is not None:
+                    label = _frame_label(frame.f_code)
+                    if os.path.normcase(frame.f_code.co_filename).startswith(_STDLIB):
+                        self.stdlib_frames.add(label)
+                    labels.append(label)
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+
+def top_functions(
+    stacks: Counter[str], skip: Iterable[str] = frozenset(), limit: int = 25
+) -> list[dict[str, Any]]:
+    """Functions by inclusive samples, with their self samples."""
+    total: Counter[str] = Counter()
+    own: Counter[str] = Counter()
+    skip = set(skip)
+    for stack, count in stacks.items():
+        frames = stack.split(";")[1:]
+        for frame in set(frames) - skip:
+            total[frame] += count
+        if frames:
+            own[frames[-1]] += count
+    return [
+        {"function": name, "totalSamples": count, "selfSamples": own[name]}
+        for name, count in total.most_common(limit)
+    ]
+
+
+class ProfileStore:
+    """Profile artifacts in a directory, keeping only the newest ``keep``."""
+
+    def __init__(self, directory: Path, keep: int = 50):
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+
+    def save(self, meta: dict[str, Any], sampler: StackSampler) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = meta["id"]
+        stacks = sampler.stacks
+        folded = "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+        (self.directory / f"{profile_id}.folded").write_text(folded, encoding="utf-8")
+        meta = dict(meta, top=top_functions(stacks, sampler.stdlib_frames))
+        (self.directory / f"{profile_id}.json").write_text(
+            json.dumps(meta, indent=2), encoding="utf-8"
+        )
+        self._trim()
+
+    def list(self) -> list[dict[str, Any]]:
+        entries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                meta = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            meta.pop("top", None)
+            entries.append(meta)
+        return entries
+
+    def path_for(self, name: str) -> Optional[Path]:
+        """The artifact called ``name``, or None if there is no such file."""
+        if "/" in name or "\\" in name or name.startswith("."):
+            return None
+        path = self.directory / name
+        if path.suffix not in (".json", ".folded") or not path.is_file():
+            return None
+        return path
+
+    def _trim(self) -> None:
+        metas = sorted(self.directory.glob("*.json"), reverse=True)
+        for stale in metas[self.keep :]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def token_matches(value: Optional[str], token: str) -> bool:
+    """True if ``value`` (an X-Profile header) is the non-empty ``token``."""
+    if not token or not value:
+        return False
+    return hmac.compare_digest(value.strip().encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling requests that carry the token."""
+
+    def __init__(
+        self,
+        app,
+        store: ProfileStore,
+        route_for: Callable[[dict], str],
+        token: str,
+        interval: float = 0.002,
+    ):
+        if not token:
+            raise ValueError("ProfilingMiddleware needs a token")
+        self.app = app
+        self.store = store
+        self.route_for = route_for
+        self.token = token
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _wants_profile(self, scope: dict) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER.encode("latin-1"):
+                return token_matches(value.decode("latin-1"), self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, _with_header(send, "busy"))
+            return
+
+        started_at = datetime.now(timezone.utc)
+        profile_id = started_at.strftime("%Y%m%dT%H%M%S%fZ") + f"-{os.getpid()}"
+        status = {"code": 500}
+        tagged_send = _with_header(send, profile_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await tagged_send(message)
+
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            await asyncio.to_thread(sampler.stop)
+            meta = {
+                "id": profile_id,
+                "method": scope.get("method", ""),
+                "path": scope.get("path", ""),
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "route": self.route_for(scope),
+                "status": status["code"],
+                "startedAt": started_at.isoformat(),
+                "durationMs": round(elapsed * 1000, 3),
+                "intervalMs": self.interval * 1000,
+                "samples": sampler.samples,
+                "pid": os.getpid(),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, meta, sampler)
+            finally:
+                self._busy.release()
+
+
+def _with_header(send, profile_id: str):
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            headers = list(message.get("headers", []))
+            headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+            message = dict(message, headers=headers)
+        await send(message)
+
+    return wrapped
@@ -0,0 +1,66 @@
+"""Coalescing of identical in-flight async requests.
+
+Concurrent callers of ``RequestCoalescer.run`` with the same key share one
+asyncio task. Each caller awaits it through ``asyncio.shield``, so a single
+caller going away (say, its client disconnected) does not cancel the work
+for everybody else. Only when the last waiter leaves is the shared task
+cancelled, and a new caller arriving after that starts a fresh task instead
+of joining the cancelled one.
+
+Everything here runs on the event loop thread, so no locking is needed.
+Results and failures are never kept after the task finishes; caching is the
+job of the session cache and payload store.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, _Flight] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight task for key, starting it with factory if absent."""
+        flight = self._inflight.get(key)
+        if flight is None or flight.task.get_loop() is not asyncio.get_running_loop():
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to receive the result
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def running(self, key: Hashable) -> bool:
+        """True if a task for key is in flight on the current event loop."""
+        flight = self._inflight.get(key)
+        return (
+            flight is not None and flight.task.get_loop() is asyncio.get_running_loop()
+        )
+
+    def inflight(self, kind: Optional[Hashable] = None) -> int:
+        """Number of tasks in flight, or of those whose key starts with kind."""
+        if kind is None:
+            return len(self._inflight)
+        return sum(
+            1 for key in self._inflight if isinstance(key, tuple) and key[:1] == (kind,)
+        )
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
@@ -0,0 +1,195 @@
+"""Per-year event schedule cache with stale-while-revalidate refreshes.
+
+Entries for seasons that ``is_permanent`` reports as finished never expire.
+Current-season entries go stale after ``ttl`` seconds, but stay servable: a
+stale read returns the old copy immediately and the caller may kick off a
+single background refresh for that year.
+
+With a ``shared`` cache, every stored schedule is also written there, and a
+missing or stale local entry is replaced by a newer copy another worker has
+stored, so N workers do not each fetch every schedule. Entries keep wall
+clock timestamps so that they compare across processes. Shared copies are
+JSON (``encode_schedule``), so reading one never unpickles anything.
+
+The cache lock only guards the dicts below. Fetches run in their own daemon
+thread without holding it.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from shared_cache import SharedCache
+from warmup import LazyModule
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    # Imported on first use, so the server can start answering before it
+    pd = LazyModule("pandas")
+
+logger = logging.getLogger(__name__)
+
+
+def _json_value(value: Any) -> Any:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    # NumPy scalars to plain Python ones
+    item = getattr(value, "item", None)
+    return item() if callable(item) else value
+
+
+def encode_schedule(schedule: Any) -> bytes:
+    """A season schedule (FastF1's EventSchedule) as JSON.
+
+    Each column keeps its dtype; timestamps, including the tz-aware local
+    session times FastF1 keeps in object columns, are ISO 8601 strings.
+    """
+    columns = []
+    for name in schedule.columns:
+        values = schedule[name]
+        timestamps = any(isinstance(value, pd.Timestamp) for value in values)
+        columns.append(
+            {
+                "name": name,
+                "dtype": str(values.dtype),
+                "timestamps": timestamps,
+                "values": [_json_value(value) for value in values],
+            }
+        )
+    document = {
+        "year": getattr(schedule, "year", None),
+        "index": [_json_value(value) for value in schedule.index],
+        "columns": columns,
+    }
+    return json.dumps(document).encode("utf-8")
+
+
+def decode_schedule(data: bytes) -> Any:
+    """The schedule ``encode_schedule`` wrote, as a FastF1 EventSchedule."""
+    from fastf1.events import EventSchedule
+
+    document = json.loads(data)
+    columns = {}
+    for column in document["columns"]:
+        values, dtype = column["values"], column["dtype"]
+        if dtype.startswith("datetime64"):
+            columns[column["name"]] = pd.to_datetime(pd.Series(values)).astype(dtype)
+        elif column["timestamps"]:
+            columns[column["name"]] = pd.Series(
+                [None if value is None else pd.Timestamp(value) for value in values],
+                dtype=object,
+            )
+        else:
+            columns[column["name"]] = pd.Series(values, dtype=dtype)
+    frame = pd.DataFrame(columns)
+    frame.index = pd.Index(document["index"])
+    return EventSchedule(frame, year=document["year"] or 0)
+
+
+class ScheduleCache:
+    def __init__(
+        self,
+        ttl: float,
+        is_permanent: Callable[[int], bool],
+        retry_interval: float = 60.0,
+        shared: Optional[SharedCache] = None,
+    ):
+        self.ttl = ttl
+        self.is_permanent = is_permanent
+        self.retry_interval = retry_interval
+        self.shared = shared
+        self._lock = threading.Lock()
+        # year -> (schedule, stored_at)
+        self._entries: dict[int, tuple[Any, float]] = {}
+        self._refreshing: set[int] = set()
+        # year -> monotonic time of the last failed refresh
+        self._failed_at: dict[int, float] = {}
+
+    def lookup(self, year: int) -> Optional[tuple[Any, bool]]:
+        """Return ``(schedule, is_fresh)`` for a cached year, or None."""
+        with self._lock:
+            entry = self._entries.get(year)
+        if entry is None or not self._is_fresh(year, entry[1]):
+            entry = self._adopt_shared(year, entry)
+        if entry is None:
+            return None
+        schedule, stored_at = entry
+        return schedule, self._is_fresh(year, stored_at)
+
+    def put(self, year: int, schedule: Any) -> None:
+        stored_at = time.time()
+        with self._lock:
+            self._entries[year] = (schedule, stored_at)
+            self._failed_at.pop(year, None)
+        if self.shared is not None:
+            self.shared.put("schedule", str(year), encode_schedule(schedule))
+
+    def _is_fresh(self, year: int, stored_at: float) -> bool:
+        return self.is_permanent(year) or time.time() - stored_at < self.ttl
+
+    def _adopt_shared(
+        self, year: int, entry: Optional[tuple[Any, float]]
+    ) -> Optional[tuple[Any, float]]:
+        """Swap in another worker's copy if it is newer than ours."""
+        if self.shared is None:
+            return entry
+        found = self.shared.get("schedule", str(year))
+        if found is None or (entry is not None and found[1] <= entry[1]):
+            return entry
+        try:
+            shared_entry = (decode_schedule(found[0]), found[1])
+        except Exception as exc:
+            logger.warning("Ignoring unreadable shared schedule for %s: %s", year, exc)
+            return entry
+        with self._lock:
+            self._entries[year] = shared_entry
+        return shared_entry
+
+    def invalidate(self, year: Optional[int] = None) -> None:
+        with self._lock:
+            if year is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(year, None)
+
+    def refresh_in_background(self, year: int, fetch: Callable[[], Any]) -> bool:
+        """Start a background refresh unless one is running or recently failed."""
+        now = time.monotonic()
+        with self._lock:
+            if year in self._refreshing:
+                return False
+            failed_at = self._failed_at.get(year)
+            if failed_at is not None and now - failed_at < self.retry_interval:
+                return False
+            self._refreshing.add(year)
+
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(year, fetch),
+            name=f"schedule-refresh-{year}",
+            daemon=True,
+        )
+        thread.start()
+        return True
+
+    def _refresh(self, year: int, fetch: Callable[[], Any]) -> None:
+        try:
+            schedule = fetch()
+        except Exception as exc:
+            logger.warning(
+                "Background schedule refresh for %s failed; serving stale copy",
+                year,
+                exc_info=exc,
+            )
+            with self._lock:
+                self._failed_at[year] = time.monotonic()
+        else:
+            self.put(year, schedule)
+        finally:
+            with self._lock:
+                self._refreshing.discard(year)
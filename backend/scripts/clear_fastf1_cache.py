@@ -1,8 +1,33 @@
 #!/usr/bin/env python3
+"""Keep the FastF1 disk cache within a byte budget.
+
+By default evicts least recently used sessions until the cache fits in
+FASTF1_CACHE_BUDGET_MB, volatile (current race weekend) sessions first and
+settled ones only if that is not enough; see fastf1_cache.py. Sessions a
+server is loading right now are locked and left alone. ``--wipe`` restores
+the old behaviour of deleting everything.
+
+    python scripts/clear_fastf1_cache.py --budget-mb 512 --report cache.json
+"""
+
+import argparse
+import json
 import logging
+import os
 import shutil
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastf1_cache import (  # noqa: E402
+    LOCK_DIR_NAME,
+    SETTLED,
+    VOLATILE,
+    cache_locks,
+    enforce_budget,
+)
+
 CACHE_DIR = Path(__file__).resolve().parent.parent / "f1_cache"
 
 
@@ -14,6 +39,9 @@ def clear_cache(cache_dir: Path) -> None:
     logging.info("Clearing FastF1 cache at %s", cache_dir)
 
     for child in cache_dir.iterdir():
+        if child.name == LOCK_DIR_NAME:
+            # Running servers may hold these
+            continue
         if child.is_dir():
             shutil.rmtree(child, ignore_errors=True)
         else:
@@ -22,8 +50,86 @@ def clear_cache(cache_dir: Path) -> None:
     logging.info("FastF1 cache cleared at %s", cache_dir)
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Keep the FastF1 disk cache within a byte budget."
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(os.getenv("FASTF1_CACHE", str(CACHE_DIR))),
+    )
+    parser.add_argument(
+        "--budget-mb",
+        type=float,
+        default=float(os.getenv("FASTF1_CACHE_BUDGET_MB", "512")),
+    )
+    parser.add_argument(
+        "--volatile-max-age-hours",
+        type=float,
+        default=6.0,
+        help="Always evict volatile sessions unused for this long",
+    )
+    parser.add_argument(
+        "--settle-days",
+        type=float,
+        default=float(os.getenv("PAYLOAD_SETTLE_DAYS", "7")),
+        help="Sessions older than this are settled and kept preferentially",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--wipe", action="store_true", help="Delete everything")
+    parser.add_argument("--report", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.wipe:
+        clear_cache(args.cache_dir)
+        return 0
+
+    report = enforce_budget(
+        args.cache_dir,
+        budget_bytes=int(args.budget_mb * 1024 * 1024),
+        volatile_max_age=args.volatile_max_age_hours * 3600,
+        settle_seconds=args.settle_days * 86400,
+        dry_run=args.dry_run,
+        locks=cache_locks(args.cache_dir),
+    )
+
+    reclaimed = report.reclaimed_by_kind()
+    logging.info(
+        "%sFastF1 cache %s: %.1f MB -> %.1f MB (budget %.1f MB), reclaimed "
+        "%.1f MB from %d sessions (%.1f MB volatile, %.1f MB settled); kept "
+        "%d settled and %d volatile sessions",
+        "[dry run] " if args.dry_run else "",
+        args.cache_dir,
+        report.bytes_before / 2**20,
+        report.bytes_after / 2**20,
+        args.budget_mb,
+        report.reclaimed_bytes / 2**20,
+        len(report.evicted),
+        reclaimed[VOLATILE] / 2**20,
+        reclaimed[SETTLED] / 2**20,
+        report.kept[SETTLED],
+        report.kept[VOLATILE],
+    )
+    if report.http_expired:
+        logging.info(
+            "Purged %d expired HTTP cache responses (%.1f MB)",
+            report.http_expired,
+            report.http_purged_bytes / 2**20,
+        )
+    if report.busy:
+        logging.info("Skipped %d sessions that were being loaded", len(report.busy))
+    for entry in report.evicted:
+        logging.debug("Evicted %s (%s, %d bytes)", entry.path, entry.kind, entry.size)
+
+    if args.report:
+        args.report.write_text(json.dumps(report.as_dict(), indent=2), encoding="utf-8")
+
+    return 0
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
     )
-    clear_cache(CACHE_DIR)
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Pre-warm whole seasons: endpoint payloads and compact lap tables.
+
+Loads every settled race of the given seasons in a process pool and writes
+the overview/drivers/positions/highlights payloads to the payload store and
+the lap, result and weather tables to the lap store, using the same
+locations and settle window as the server (PAYLOAD_STORE_DIR, LAP_STORE_DIR,
+PAYLOAD_SETTLE_DAYS). Races that are already fully stored are skipped, so
+the command can be interrupted and re-run at any time. A section with no data
+for a race (its builder answers 404, e.g. no lap positions) is recorded in
+the race's lap store meta.json, so that race counts as stored without it:
+
+    python scripts/ingest.py --years 2018-2025 --workers 4 --report ingest.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def parse_years(spec: str) -> list[int]:
+    """Parse ``2018-2025``, ``2021,2023`` or a mix of both."""
+    years: set[int] = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+            years.update(range(min(start, end), max(start, end) + 1))
+        else:
+            years.add(int(part))
+    return sorted(years)
+
+
+def is_race_stored(app: Any, year: int, round_num: int) -> bool:
+    if not app._lap_store.has_race(year, round_num):
+        return False
+    missing = app._lap_store.missing_sections(year, round_num)
+    return all(
+        section in missing
+        or app.get_stored_payload(year, round_num, section) is not None
+        for section in app.BUNDLE_SECTIONS
+    )
+
+
+def list_settled_races(app: Any, year: int) -> tuple[list[int], list[int]]:
+    """Return (settled rounds, rounds still inside the settle window)."""
+    schedule = app.fetch_schedule(year)
+    settled, pending = [], []
+    for _, event in schedule.iterrows():
+        round_num = app.to_optional_int(event.get("RoundNumber"))
+        if round_num is None or round_num < 1:
+            continue
+        race_time = app.normalize_datetime(event.get("Session5DateUtc"))
+        if app._payload_store.is_settled(race_time):
+            settled.append(round_num)
+        else:
+            pending.append(round_num)
+    return settled, pending
+
+
+def ingest_race(year: int, round_num: int) -> dict[str, Any]:
+    """Load one race and write its payloads and tables (runs in a worker)."""
+    import app
+    from fastapi import HTTPException
+
+    result: dict[str, Any] = {
+        "year": year,
+        "round": round_num,
+        "status": "ok",
+        "sections": {},
+        "pid": os.getpid(),
+    }
+
+    started = time.perf_counter()
+    try:
+        session = app.load_session(year, round_num)
+    except Exception as exc:
+        result.update(status="failed", error=f"load: {exc}")
+        result["loadSeconds"] = round(time.perf_counter() - started, 3)
+        return result
+    loaded = time.perf_counter()
+
+    missing: dict[str, str] = {}
+    for section in app.BUNDLE_SECTIONS:
+        try:
+            app.build_bundle_section(section, session, year, round_num)
+            result["sections"][section] = "ok"
+        except HTTPException as exc:
+            result["sections"][section] = f"{exc.status_code}: {exc.detail}"
+            if exc.status_code == 404:
+                # No data for this section; nothing to retry
+                missing[section] = str(exc.detail)
+            else:
+                result["status"] = "partial"
+        except Exception as exc:
+            result["sections"][section] = f"error: {exc}"
+            result["status"] = "partial"
+    built = time.perf_counter()
+
+    try:
+        if not app._lap_store.write_race(year, round_num, session, missing):
+            # Tables from an earlier run; bring its record of missing data up to date
+            app._lap_store.set_missing_sections(year, round_num, missing)
+    except Exception as exc:
+        result.update(status="partial", error=f"tables: {exc}")
+    written = time.perf_counter()
+
+    result["loadSeconds"] = round(loaded - started, 3)
+    result["buildSeconds"] = round(built - loaded, 3)
+    result["writeSeconds"] = round(written - built, 3)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Pre-warm whole seasons: endpoint payloads and compact lap tables."
+    )
+    parser.add_argument(
+        "--years", required=True, help="Seasons, e.g. 2018-2025 or 2021,2023"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Worker processes (each holds one loaded session; default 2)",
+    )
+    parser.add_argument(
+        "--report", type=Path, help="Write per-race results as JSON to this file"
+    )
+    args = parser.parse_args()
+
+    import app
+
+    if not app._payload_store.enabled or not app._lap_store.enabled:
+        logging.error("PAYLOAD_STORE_DIR and LAP_STORE_DIR must both be set")
+        return 2
+
+    todo: list[tuple[int, int]] = []
+    report: list[dict[str, Any]] = []
+    for year in parse_years(args.years):
+        try:
+            settled, pending = list_settled_races(app, year)
+        except Exception as exc:
+            logging.error("Could not load the %s schedule: %s", year, exc)
+            report.append({"year": year, "status": "failed", "error": str(exc)})
+            continue
+
+        for round_num in pending:
+            report.append({"year": year, "round": round_num, "status": "unsettled"})
+        for round_num in settled:
+            if is_race_stored(app, year, round_num):
+                report.append({"year": year, "round": round_num, "status": "stored"})
+            else:
+                todo.append((year, round_num))
+
+    already = sum(1 for entry in report if entry["status"] == "stored")
+    logging.info(
+        "%d races to ingest, %d already stored, %d not settled yet",
+        len(todo),
+        already,
+        sum(1 for entry in report if entry["status"] == "unsettled"),
+    )
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(ingest_race, year, round_num): (year, round_num)
+            for year, round_num in todo
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            year, round_num = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {
+                    "year": year,
+                    "round": round_num,
+                    "status": "failed",
+                    "error": f"worker: {exc}",
+                }
+            report.append(result)
+            logging.info(
+                "[%d/%d] %s R%02d %s load %.1fs build %.2fs write %.2fs%s",
+                done,
+                len(todo),
+                year,
+                round_num,
+                result["status"],
+                result.get("loadSeconds", 0.0),
+                result.get("buildSeconds", 0.0),
+                result.get("writeSeconds", 0.0),
+                f" ({result['error']})" if result.get("error") else "",
+            )
+
+    elapsed = time.perf_counter() - started
+    failed = [entry for entry in report if entry["status"] in ("failed", "partial")]
+    logging.info(
+        "Ingested %d races in %.1fs with %d workers, %d failed or partial",
+        len(todo),
+        elapsed,
+        args.workers,
+        len(failed),
+    )
+
+    if args.report:
+        args.report.write_text(
+            json.dumps(
+                {"elapsedSeconds": round(elapsed, 3), "races": report}, indent=2
+            ),
+            encoding="utf-8",
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Invalidate the cache shared by the uvicorn workers.
+
+Deletes matching entries from shared_cache.sqlite and bumps its generation,
+so every running worker also drops its in-process schedules, rendered
+payloads and opened lap store races within SHARED_CACHE_SYNC_INTERVAL
+seconds. Settled races are served from the payload store and the lap store
+rather than the shared cache, so ``--year`` (and ``--round``) also deletes
+their entries there; run scripts/ingest.py to store the lap tables again:
+
+    python scripts/invalidate_shared_cache.py --year 2025 --round 3
+    python scripts/invalidate_shared_cache.py --schedules
+    python scripts/invalidate_shared_cache.py --all
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lap_store import LapStore  # noqa: E402
+from payload_store import PayloadStore, default_version_tag  # noqa: E402
+from shared_cache import SharedCache  # noqa: E402
+
+BACKEND = Path(__file__).resolve().parent.parent
+SHARED_CACHE_PATH = BACKEND / "shared_cache.sqlite"
+PAYLOAD_STORE_DIR = BACKEND / "payload_store"
+LAP_STORE_DIR = BACKEND / "lap_tables"
+
+
+def drop_stored_races(year: int, round_num: Optional[int]) -> None:
+    """Delete the payload store and lap store entries of a race or season."""
+    payload_dir = os.getenv("PAYLOAD_STORE_DIR", str(PAYLOAD_STORE_DIR))
+    lap_dir = os.getenv("LAP_STORE_DIR", str(LAP_STORE_DIR))
+    # The settle window does not matter for deleting
+    payloads = PayloadStore(
+        Path(payload_dir) if payload_dir else None,
+        version=default_version_tag(),
+        settle_seconds=0,
+    ).delete(year, round_num)
+    races = LapStore(Path(lap_dir) if lap_dir else None).delete(year, round_num)
+    logging.info("Deleted %d stored payloads and %d lap store races", payloads, races)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Invalidate the cache shared by the uvicorn workers."
+    )
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=Path(os.getenv("SHARED_CACHE_PATH", str(SHARED_CACHE_PATH))),
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--all", action="store_true", help="Drop every entry")
+    target.add_argument("--schedules", action="store_true")
+    target.add_argument(
+        "--year", type=int, help="Rendered and stored payloads of a season"
+    )
+    target.add_argument("--stats", action="store_true", help="Only print stats")
+    parser.add_argument("--round", type=int, help="Limit --year to one round")
+    args = parser.parse_args()
+
+    if args.round is not None and args.year is None:
+        parser.error("--round needs --year")
+    if args.year is not None:
+        drop_stored_races(args.year, args.round)
+    if not args.path.exists():
+        logging.info("No shared cache at %s; nothing else to do", args.path)
+        return 0
+
+    cache = SharedCache(args.path)
+    if args.stats:
+        print(json.dumps(cache.stats(), indent=2))
+        return 0
+
+    if args.all:
+        deleted = cache.invalidate()
+    elif args.schedules:
+        deleted = cache.invalidate("schedule")
+    else:
+        prefix = f"{args.year}/" if args.round is None else f"{args.year}/{args.round}/"
+        deleted = cache.invalidate("rendered", prefix)
+
+    logging.info(
+        "Deleted %d shared entries; generation is now %d",
+        deleted,
+        cache.generation(),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Load one race from many threads and processes through the locked FastF1 cache.
+
+Uses FastF1's real cache wrapper around a fake, slow API call, so it runs
+offline in a temporary directory and fails loudly on a hang:
+
+    python scripts/stress_fastf1_cache.py --processes 4 --threads 8
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fastf1_cache  # noqa: E402
+from fastf1_cache import enforce_budget  # noqa: E402
+
+API_PATH = "/static/2024/2024-03-02_Bahrain_Grand_Prix/2024-03-02_Race/"
+CALL_SECONDS = 0.5
+
+
+def fake_loader(cache_dir: Path, calls_file: Path, lock_timeout: float = 30.0):
+    """A FastF1-cached API call that records every real (uncached) run."""
+    import fastf1
+
+    fastf1.set_log_level("WARNING")
+    disk_cache = fastf1_cache.enable_disk_cache(cache_dir, lock_timeout=lock_timeout)
+
+    def timing_data(api_path):
+        with open(calls_file, "a", encoding="utf-8") as calls:
+            calls.write(f"{os.getpid()}\n")
+        time.sleep(CALL_SECONDS)
+        return {"laps": list(range(1000)), "path": api_path}
+
+    cached_call = fastf1.Cache.api_request_wrapper(timing_data)
+
+    def load():
+        with disk_cache.session_lock(API_PATH):
+            return cached_call(API_PATH)
+
+    return disk_cache, load
+
+
+def count_calls(calls_file: Path) -> int:
+    if not calls_file.exists():
+        return 0
+    return len(calls_file.read_text(encoding="utf-8").split())
+
+
+def load_from_threads(cache_dir: Path, calls_file: Path, threads: int) -> None:
+    _, load = fake_loader(cache_dir, calls_file)
+    barrier = threading.Barrier(threads)
+    errors: list[BaseException] = []
+
+    def client():
+        barrier.wait()
+        try:
+            data = load()
+            assert data["laps"][-1] == 999, "loaded a broken pickle"
+        except BaseException as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=client, daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+def check_concurrent_loads(processes: int, threads: int, deadline: float) -> None:
+    """Every loader asks for the same cold race; it may only be fetched once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir, calls_file = Path(tmp) / "cache", Path(tmp) / "calls"
+        context = multiprocessing.get_context("spawn")
+        children = [
+            context.Process(
+                target=load_from_threads, args=(cache_dir, calls_file, threads)
+            )
+            for _ in range(processes)
+        ]
+        started = time.monotonic()
+        for child in children:
+            child.start()
+        for child in children:
+            child.join(timeout=max(0.0, deadline - (time.monotonic() - started)))
+        hung = [child for child in children if child.is_alive()]
+        for child in hung:
+            child.kill()
+        elapsed = time.monotonic() - started
+
+        assert not hung, f"{len(hung)} loader processes hung"
+        failed = [child.exitcode for child in children if child.exitcode != 0]
+        assert not failed, f"loader processes failed: {failed}"
+        calls = count_calls(calls_file)
+        assert calls == 1, f"the race was fetched {calls} times"
+        leftovers = list(cache_dir.rglob("*.tmp"))
+        assert not leftovers, f"temporary files left behind: {leftovers}"
+        logging.info(
+            "concurrent: %d loaders in %d processes, %d fetch, %.2fs",
+            processes * threads,
+            processes,
+            calls,
+            elapsed,
+        )
+
+
+def hold_and_die(cache_dir: Path, ready) -> None:
+    locks = fastf1_cache.cache_locks(cache_dir)
+    with locks.hold(API_PATH.removeprefix("/static/").strip("/")):
+        ready.set()
+        time.sleep(3600)
+
+
+def check_crashed_holder() -> None:
+    """A lock held by a killed process must be free again straight away."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir, calls_file = Path(tmp) / "cache", Path(tmp) / "calls"
+        context = multiprocessing.get_context("spawn")
+        ready = context.Event()
+        holder = context.Process(target=hold_and_die, args=(cache_dir, ready))
+        holder.start()
+        assert ready.wait(30), "lock holder did not start"
+        assert holder.pid is not None
+        os.kill(holder.pid, signal.SIGKILL)
+        holder.join()
+
+        _, load = fake_loader(cache_dir, calls_file, lock_timeout=5.0)
+        started = time.monotonic()
+        load()
+        waited = time.monotonic() - started
+        assert waited < CALL_SECONDS + 1.0, f"waited {waited:.2f}s on a dead holder"
+        logging.info("crashed holder: lock taken over after %.2fs", waited)
+
+
+def check_stuck_holder() -> None:
+    """A holder that never finishes delays loaders by the timeout, no more."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir, calls_file = Path(tmp) / "cache", Path(tmp) / "calls"
+        context = multiprocessing.get_context("spawn")
+        ready = context.Event()
+        holder = context.Process(target=hold_and_die, args=(cache_dir, ready))
+        holder.start()
+        try:
+            assert ready.wait(30), "lock holder did not start"
+            _, load = fake_loader(cache_dir, calls_file, lock_timeout=0.5)
+            started = time.monotonic()
+            load()
+            waited = time.monotonic() - started
+        finally:
+            holder.kill()
+            holder.join()
+        assert waited < 0.5 + CALL_SECONDS + 1.0, f"waited {waited:.2f}s"
+        logging.info("stuck holder: loaded without the lock after %.2fs", waited)
+
+
+def check_eviction_skips_locked() -> None:
+    """Eviction leaves a session alone while its lock is held."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir, calls_file = Path(tmp) / "cache", Path(tmp) / "calls"
+        disk_cache, load = fake_loader(cache_dir, calls_file)
+        load()
+        session_dir = cache_dir / API_PATH.removeprefix("/static/").strip("/")
+        locks = fastf1_cache.cache_locks(cache_dir)
+
+        with disk_cache.session_lock(API_PATH):
+            started = time.monotonic()
+            report = enforce_budget(cache_dir, 0, locks=locks)
+            waited = time.monotonic() - started
+            assert waited < 1.0, f"eviction waited {waited:.2f}s for a held lock"
+            assert session_dir.exists(), "evicted a session while it was loading"
+            busy = [entry.path for entry in report.busy]
+            assert busy == [session_dir], f"busy entries: {busy}"
+
+        report = enforce_budget(cache_dir, 0, locks=locks)
+        assert not session_dir.exists(), "did not evict the session once unlocked"
+        assert not report.busy, "unlocked session reported busy"
+        logging.info("eviction: skipped the locked session, evicted it afterwards")
+
+
+def check_http_cache_purge() -> None:
+    """Expired HTTP responses are purged before the budget is enforced."""
+    from datetime import datetime, timedelta, timezone
+
+    from requests_cache import CachedRequest, CachedResponse
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir, calls_file = Path(tmp) / "cache", Path(tmp) / "calls"
+        _, load = fake_loader(cache_dir, calls_file)
+        load()
+        session_dir = cache_dir / API_PATH.removeprefix("/static/").strip("/")
+
+        # Write through the server's own session, which keeps it open
+        import fastf1
+
+        session = fastf1.Cache._requests_session_cached
+        assert session is not None, "the HTTP cache is not enabled"
+        responses = session.cache.responses
+        now = datetime.now(timezone.utc)
+        for i in range(21):
+            url = f"https://api.example.com/{i}.json"
+            expires = now + timedelta(hours=1) if i == 0 else now - timedelta(hours=1)
+            response = CachedResponse(
+                status_code=200,
+                url=url,
+                request=CachedRequest(method="GET", url=url),
+                expires=expires,
+            )
+            response._content = os.urandom(200_000)
+            responses[f"response-{i}"] = response
+
+        # Without the purge the expired responses alone exceed the budget
+        http_before = fastf1_cache._http_cache_size(cache_dir)
+        budget = fastf1_cache._usage(session_dir)[0] + 1024 * 1024
+        assert http_before > budget, f"only {http_before} bytes of HTTP cache"
+        report = enforce_budget(
+            cache_dir, budget, locks=fastf1_cache.cache_locks(cache_dir)
+        )
+
+        assert report.http_expired == 20, f"purged {report.http_expired} responses"
+        assert session_dir.exists(), "evicted a session instead of purging"
+        assert not report.evicted, f"evicted {len(report.evicted)} entries"
+        assert report.bytes_after <= budget, f"{report.bytes_after} bytes left"
+        assert list(responses.keys()) == ["response-0"], "lost a live response"
+        logging.info(
+            "HTTP cache purge: %d expired responses, %.1f MB -> %.1f MB",
+            report.http_expired,
+            http_before / 2**20,
+            fastf1_cache._http_cache_size(cache_dir) / 2**20,
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Load one race from many threads and processes through the locked FastF1 cache."
+    )
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--deadline", type=float, default=60.0)
+    args = parser.parse_args()
+
+    try:
+        check_concurrent_loads(args.processes, args.threads, args.deadline)
+        check_crashed_holder()
+        check_stuck_holder()
+        check_eviction_skips_locked()
+        check_http_cache_purge()
+    except AssertionError as exc:
+        logging.error("FAILED: %s", exc)
+        return 1
+
+    logging.info("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
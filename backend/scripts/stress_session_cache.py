@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""Hammer load_race_session and the session cache and fail loudly on a hang.
+
+Drives ``app.load_race_session`` (the live session cache plus the request
+coalescer) with a fake FastF1 loader, so it runs entirely offline:
+
+    python scripts/stress_session_cache.py --callers 64 --iterations 200
+
+Each check runs on its own event loop in a worker thread and counts as hung
+if it misses the deadline. Meanwhile background threads read and invalidate
+the cache as the build pool and the shared cache sync do, and the cache's
+lock is timed to confirm the lock order in session_cache.py: it is never
+held while a session loads.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Nothing may touch the network or the disk caches, and the upstream executor
+# must admit every distinct load the checks start at once
+for name in ("FASTF1_CACHE", "SHARED_CACHE_PATH", "PAYLOAD_STORE_DIR", "LAP_STORE_DIR"):
+    os.environ[name] = ""
+os.environ["PROFILING_ENABLED"] = ""
+os.environ["PREFETCH_ENABLED"] = ""
+os.environ["UPSTREAM_MAX_WORKERS"] = "16"
+os.environ["UPSTREAM_MAX_QUEUE"] = "1024"
+
+from fastapi import HTTPException  # noqa: E402
+
+import app  # noqa: E402
+from session_cache import SessionCache  # noqa: E402
+from session_profiles import FULL, PROFILES, LoadedSession  # noqa: E402
+
+# Loads in the timed checks take at least this long; the cache lock must
+# never be held for anywhere near as long
+SLOW_LOAD = 0.2
+
+
+class FlakyLoadError(RuntimeError):
+    pass
+
+
+class TimedLock:
+    """A Lock that remembers the longest time it was held."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._acquired_at = 0.0
+        self.longest_hold = 0.0
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self._acquired_at = time.monotonic()
+        return acquired
+
+    def release(self) -> None:
+        held = time.monotonic() - self._acquired_at
+        self.longest_hold = max(self.longest_hold, held)
+        self._lock.release()
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.release()
+
+
+class FakeUpstream:
+    """Stands in for ``app.load_compact_session`` and counts loads per key."""
+
+    def __init__(self, delay: float = 0.0, failure_rate: float = 0.0):
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.failing: set[tuple[int, int, str]] = set()
+        self.loads: Counter = Counter()
+        self.lock_probe_failures = 0
+        self._lock = threading.Lock()
+
+    def __call__(
+        self,
+        year: int,
+        round_num: int,
+        session_type: str = "R",
+        profile: frozenset[str] = FULL,
+    ) -> LoadedSession:
+        key = (year, round_num, session_type)
+        with self._lock:
+            self.loads[key] += 1
+
+        # Whoever started this load must not be holding the cache lock
+        cache_lock = app._session_cache._lock
+        if cache_lock.acquire(timeout=1):
+            cache_lock.release()
+        else:
+            with self._lock:
+                self.lock_probe_failures += 1
+
+        time.sleep(
+            self.delay if self.failure_rate == 0 else random.random() * self.delay
+        )
+        if key in self.failing or random.random() < self.failure_rate:
+            raise FlakyLoadError(f"upstream failure for {key}")
+        return LoadedSession(key, profile)
+
+
+def install(capacity: int, upstream: FakeUpstream) -> TimedLock:
+    """Give app a fresh, timed session cache that loads from upstream."""
+    lock = TimedLock()
+    app._session_cache = SessionCache(capacity)
+    app._session_cache._lock = lock  # type: ignore
+    app.load_compact_session = upstream
+    return lock
+
+
+def run_on_loop(
+    name: str, main: Callable[[], Coroutine[Any, Any, Any]], deadline: float
+) -> Any:
+    """Run main on a new event loop in its own thread; fail if it hangs."""
+    outcome: dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            outcome["result"] = asyncio.run(main())
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    thread.start()
+    thread.join(timeout=deadline)
+    assert not thread.is_alive(), f"{name} check hung for over {deadline}s"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("result")
+
+
+@contextlib.contextmanager
+def cache_hammer(threads: int, keys: int) -> Iterator[None]:
+    """Read and invalidate app._session_cache from other threads meanwhile."""
+    stop = threading.Event()
+    errors: list[str] = []
+
+    def worker() -> None:
+        while not stop.is_set():
+            key = (2024, random.randint(1, keys), "R")
+            session = app._session_cache.get(key)
+            if session is not None and session.session != key:
+                errors.append(f"cache returned {session.session} for {key}")
+            if random.random() < 0.05:
+                app._session_cache.invalidate(key)
+            time.sleep(0.0005)
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        for thread in workers:
+            thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in workers), "cache reader hung"
+    assert not errors, f"cache readers saw wrong sessions: {errors[:3]}"
+
+
+def check_lock_order(lock: TimedLock, upstream: FakeUpstream) -> None:
+    assert upstream.lock_probe_failures == 0, "cache lock was held during a load"
+    assert (
+        lock.longest_hold < SLOW_LOAD / 2
+    ), f"cache lock held for {lock.longest_hold:.3f}s, as long as a load"
+
+
+def check_same_key(callers: int, deadline: float) -> None:
+    """Every caller asks for the same cold race; exactly one load may run."""
+    upstream = FakeUpstream(delay=SLOW_LOAD)
+    lock = install(4, upstream)
+
+    async def main() -> list[Any]:
+        sessions = await asyncio.gather(
+            *(app.load_race_session(2024, 1) for _ in range(callers))
+        )
+        await asyncio.sleep(0)
+        assert app._coalescer.inflight() == 0, "coalesced load leaked"
+        return list(sessions)
+
+    sessions = run_on_loop("same-key", main, deadline)
+    assert upstream.loads[(2024, 1, "R")] == 1, f"expected 1 load: {upstream.loads}"
+    assert len({id(session) for session in sessions}) == 1, "callers got copies"
+    assert (2024, 1, "R") in app._session_cache, "loaded session was not cached"
+    check_lock_order(lock, upstream)
+    logging.info("same key: %d callers shared 1 load", len(sessions))
+
+
+def check_different_keys(keys: int, callers: int, deadline: float) -> None:
+    """Callers spread over several cold races; one load per race."""
+    upstream = FakeUpstream(delay=SLOW_LOAD)
+    lock = install(keys, upstream)
+    rounds = [round_num for round_num in range(1, keys + 1) for _ in range(callers)]
+    random.shuffle(rounds)
+
+    async def main() -> list[Any]:
+        return list(
+            await asyncio.gather(
+                *(app.load_race_session(2024, round_num) for round_num in rounds)
+            )
+        )
+
+    sessions = run_on_loop("different-keys", main, deadline)
+    for round_num, session in zip(rounds, sessions):
+        assert session.session == (
+            2024,
+            round_num,
+            "R",
+        ), f"wrong session for {round_num}"
+    assert set(upstream.loads.values()) == {1}, f"duplicate loads: {upstream.loads}"
+    assert len(upstream.loads) == keys, f"missing loads: {upstream.loads}"
+    check_lock_order(lock, upstream)
+    logging.info("different keys: %d callers, %d loads", len(rounds), keys)
+
+
+def check_failures(callers: int, deadline: float) -> None:
+    """A failing load fails every waiter once, is not cached, and is retried."""
+    key = (2024, 1, "R")
+    upstream = FakeUpstream(delay=SLOW_LOAD)
+    upstream.failing.add(key)
+    lock = install(4, upstream)
+
+    async def main() -> Any:
+        results = await asyncio.gather(
+            *(app.load_race_session(2024, 1) for _ in range(callers)),
+            return_exceptions=True,
+        )
+        for result in results:
+            assert isinstance(result, HTTPException), f"expected a 500: {result!r}"
+            assert result.status_code == 500, f"expected a 500: {result.detail}"
+        assert key not in app._session_cache, "failed load was cached"
+        upstream.failing.clear()
+        return await app.load_race_session(2024, 1)
+
+    session = run_on_loop("failures", main, deadline)
+    assert session.session == key, "retry returned the wrong session"
+    assert (
+        upstream.loads[key] == 2
+    ), f"expected 1 failed load and 1 retry: {upstream.loads}"
+    check_lock_order(lock, upstream)
+    logging.info("failures: %d callers failed on 1 load, retry succeeded", callers)
+
+
+def check_cancelled_waiters(callers: int, deadline: float) -> None:
+    """Waiters leaving early do not disturb the rest, or a later caller."""
+    upstream = FakeUpstream(delay=SLOW_LOAD)
+    lock = install(4, upstream)
+
+    async def main() -> None:
+        tasks = [
+            asyncio.create_task(app.load_race_session(2024, 1)) for _ in range(callers)
+        ]
+        await asyncio.sleep(SLOW_LOAD / 4)
+        for task in tasks[: callers // 2]:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        cancelled = [r for r in results if isinstance(r, asyncio.CancelledError)]
+        served = [r for r in results if not isinstance(r, BaseException)]
+        assert len(cancelled) == callers // 2, f"{len(cancelled)} waiters cancelled"
+        assert len(served) == callers - callers // 2, f"only {len(served)} served"
+        assert len({id(session) for session in served}) == 1, "waiters got copies"
+        assert upstream.loads[(2024, 1, "R")] == 1, "cancelled waiters reloaded"
+
+        # When every waiter leaves, the shared load is dropped and the next
+        # caller starts a fresh one instead of joining the abandoned task
+        tasks = [
+            asyncio.create_task(app.load_race_session(2024, 2)) for _ in range(callers)
+        ]
+        await asyncio.sleep(SLOW_LOAD / 4)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert app._coalescer.inflight() == 0, "abandoned load still in flight"
+        session = await app.load_race_session(2024, 2)
+        assert session.session == (2024, 2, "R"), "fresh load returned wrong session"
+        assert (
+            upstream.loads[(2024, 2, "R")] == 2
+        ), f"expected a fresh load: {upstream.loads}"
+
+    run_on_loop("cancelled-waiters", main, deadline)
+    check_lock_order(lock, upstream)
+    logging.info("cancelled waiters: survivors and a later caller were served")
+
+
+def check_churn(
+    callers: int,
+    iterations: int,
+    keys: int,
+    capacity: int,
+    readers: int,
+    deadline: float,
+) -> None:
+    """Random races and profiles, evictions, failures and timeouts at once."""
+    upstream = FakeUpstream(delay=0.01, failure_rate=0.1)
+    lock = install(capacity, upstream)
+    outcomes: Counter = Counter()
+
+    async def caller() -> None:
+        for _ in range(iterations):
+            round_num = random.randint(1, keys)
+            components = random.choice(PROFILES)
+            try:
+                # Some waiters give up early, as disconnecting clients do
+                session = await asyncio.wait_for(
+                    app.load_race_session(2024, round_num, components),
+                    timeout=random.choice((0.005, 1.0)),
+                )
+            except TimeoutError:
+                outcomes["gave up"] += 1
+                continue
+            except HTTPException as exc:
+                assert exc.status_code == 500, f"unexpected error: {exc.detail}"
+                outcomes["failed"] += 1
+                continue
+            assert session.session == (2024, round_num, "R"), "wrong session"
+            assert session.covers(components), f"{session.profile} lacks {components}"
+            outcomes["served"] += 1
+
+    async def main() -> None:
+        await asyncio.gather(*(caller() for _ in range(callers)))
+        await asyncio.sleep(0)
+        assert app._coalescer.inflight() == 0, "coalesced loads leaked"
+
+    with cache_hammer(readers, keys):
+        run_on_loop("churn", main, deadline)
+    assert len(app._session_cache) <= capacity, "cache grew past capacity"
+    assert upstream.lock_probe_failures == 0, "cache lock was held during a load"
+    logging.info(
+        "churn: %d calls (%s), %d loads, longest lock hold %.4fs",
+        callers * iterations,
+        dict(outcomes),
+        sum(upstream.loads.values()),
+        lock.longest_hold,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Hammer load_race_session and the session cache and fail loudly "
+            "on a hang."
+        )
+    )
+    parser.add_argument("--callers", type=int, default=64)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=12)
+    parser.add_argument("--capacity", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--deadline", type=float, default=60.0)
+    args = parser.parse_args()
+
+    try:
+        check_same_key(args.callers, args.deadline)
+        check_different_keys(args.keys, args.callers // 4 or 1, args.deadline)
+        check_failures(args.callers, args.deadline)
+        check_cancelled_waiters(args.callers, args.deadline)
+        check_churn(
+            args.callers,
+            args.iterations,
+            args.keys,
+            args.capacity,
+            args.readers,
+            args.deadline,
+        )
+    except AssertionError as exc:
+        logging.error("FAILED: %s", exc)
+        return 1
+
+    logging.info("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
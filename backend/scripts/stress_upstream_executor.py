@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Burst UpstreamExecutor with slow fake calls and check admission control.
+
+Runs entirely offline, so it is safe to run anywhere:
+
+    python scripts/stress_upstream_executor.py --workers 3 --queue 6 --burst 40
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from upstream_executor import ExecutorSaturated, UpstreamExecutor  # noqa: E402
+
+
+def check_burst(workers: int, queue: int, burst: int, call_seconds: float) -> None:
+    """A burst larger than the capacity: the overflow must fail fast."""
+    executor = UpstreamExecutor(max_workers=workers, max_queue=queue)
+    outcomes = Counter()
+    latencies: dict[str, float] = {}
+    lock = threading.Lock()
+    concurrent = Counter()
+    barrier = threading.Barrier(burst)
+
+    def slow_call():
+        with lock:
+            concurrent["now"] += 1
+            concurrent["peak"] = max(concurrent["peak"], concurrent["now"])
+        time.sleep(call_seconds)
+        with lock:
+            concurrent["now"] -= 1
+        return True
+
+    def client():
+        barrier.wait()
+        started = time.monotonic()
+        try:
+            executor.run(slow_call, timeout=call_seconds * (burst + 1))
+            outcome = "ok"
+        except ExecutorSaturated:
+            outcome = "rejected"
+        elapsed = time.monotonic() - started
+        with lock:
+            outcomes[outcome] += 1
+            latencies[outcome] = max(latencies.get(outcome, 0.0), elapsed)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(burst)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=call_seconds * (burst + 2))
+    assert not any(thread.is_alive() for thread in threads), "clients hung"
+
+    capacity = workers + queue
+    assert concurrent["peak"] <= workers, f"ran {concurrent['peak']} calls at once"
+    assert outcomes["ok"] == min(burst, capacity), f"admitted {outcomes}"
+    assert outcomes["rejected"] == max(0, burst - capacity), f"rejected {outcomes}"
+    if outcomes["rejected"]:
+        assert latencies["rejected"] < call_seconds / 2, "rejections were not fast"
+    stats = executor.stats()
+    assert stats["running"] == 0 and stats["queued"] == 0, f"slots leaked: {stats}"
+    logging.info(
+        "burst: %s, peak concurrency %d, slowest rejection %.3fs",
+        dict(outcomes),
+        concurrent["peak"],
+        latencies.get("rejected", 0.0),
+    )
+    executor.shutdown()
+
+
+def check_timeout(call_seconds: float) -> None:
+    """A timed-out call returns promptly and frees its slot once it ends."""
+    executor = UpstreamExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    started = time.monotonic()
+    try:
+        executor.run(release.wait, 0.1, call_seconds * 10)
+        raise AssertionError("expected a timeout")
+    except TimeoutError:
+        pass
+    waited = time.monotonic() - started
+    assert waited < call_seconds, f"timeout took {waited:.3f}s to surface"
+
+    # The timed-out call still occupies the worker; one more may queue
+    queued = executor.submit(lambda: "queued")
+    try:
+        executor.submit(lambda: None)
+        raise AssertionError("expected the executor to be saturated")
+    except ExecutorSaturated:
+        pass
+
+    release.set()
+    assert queued.result(timeout=5) == "queued"
+    executor.run(lambda: None, 5)
+    stats = executor.stats()
+    assert stats["running"] == 0 and stats["queued"] == 0, f"slots leaked: {stats}"
+    logging.info("timeout: surfaced after %.3fs, slots released", waited)
+    executor.shutdown()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Burst UpstreamExecutor with slow fake calls and check admission control."
+    )
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--queue", type=int, default=6)
+    parser.add_argument("--burst", type=int, default=40)
+    parser.add_argument("--call-seconds", type=float, default=0.3)
+    args = parser.parse_args()
+
+    try:
+        check_burst(args.workers, args.queue, args.burst, args.call_seconds)
+        check_timeout(args.call_seconds)
+    except AssertionError as exc:
+        logging.error("FAILED: %s", exc)
+        return 1
+
+    logging.info("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    sys.exit(main())
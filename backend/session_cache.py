@@ -0,0 +1,77 @@
+"""Bounded in-memory LRU cache for loaded FastF1 sessions.
+
+The cache only stores finished values. Concurrent misses for one key share a
+single load through ``RequestCoalescer`` (see request_coalescer.py), which
+runs on the event loop and takes no locks.
+
+Lock order
+----------
+There is exactly one lock, ``SessionCache._lock``. It guards the LRU dict and
+is only ever held for O(1) bookkeeping:
+
+* it is never held while a session is loading, and
+* it is never held while waiting for anything else.
+
+Because no thread ever waits on anything while holding ``_lock``, and no
+other lock is ever acquired inside it, the cache cannot deadlock. Keep it
+that way: do not call loaders, futures or logging handlers that may block
+from inside ``with self._lock``.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class SessionCache:
+    """Thread-safe LRU cache of loaded sessions and rendered payloads."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(0, int(max_size))
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value and mark it most recently used, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """Insert a value, evicting least recently used entries over capacity."""
+        with self._lock:
+            self._put_locked(key, value)
+        return value
+
+    def _put_locked(self, key: Hashable, value: Any) -> None:
+        if self.max_size == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxSize": self.max_size,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
@@ -0,0 +1,69 @@
+"""Loading profiles: which parts of a FastF1 session an endpoint needs.
+
+Loading results alone is a fraction of the cost of parsing every lap, so
+each endpoint declares the components it reads and the loader fetches the
+smallest profile that covers them. Profiles are nested (each one is a
+superset of the previous), which keeps upgrades simple: a cached session
+that lacks something is replaced by a load of the next profile that covers
+both what it already had and what is now being asked for.
+
+``LoadedSession`` wraps the FastF1 session and records what was loaded. It
+also holds the circuit info fetched at load time, so builders calling
+``get_circuit_info()`` never go back to the network.
+"""
+
+from typing import Any, Iterable, Optional
+
+RESULTS = "results"
+LAPS = "laps"
+WEATHER = "weather"
+CIRCUIT_INFO = "circuit_info"
+
+# Smallest first; every profile contains the one before it
+PROFILES = (
+    frozenset({RESULTS}),
+    frozenset({RESULTS, LAPS}),
+    frozenset({RESULTS, LAPS, WEATHER, CIRCUIT_INFO}),
+)
+FULL = PROFILES[-1]
+
+
+def profile_for(components: Iterable[str]) -> frozenset[str]:
+    """The smallest profile that includes every requested component."""
+    needed = frozenset(components) | {RESULTS}
+    for profile in PROFILES:
+        if needed <= profile:
+            return profile
+    raise ValueError(f"Unknown session components: {sorted(needed - FULL)}")
+
+
+def load_options(profile: frozenset[str]) -> dict[str, bool]:
+    """Keyword arguments for ``Session.load`` for a profile."""
+    return {
+        "laps": LAPS in profile,
+        "telemetry": False,
+        "weather": WEATHER in profile,
+        "messages": False,
+    }
+
+
+class LoadedSession:
+    """A FastF1 session plus the profile it was loaded with.
+
+    Attribute access falls through to the wrapped session, so payload
+    builders can use it like the session itself.
+    """
+
+    def __init__(self, session: Any, profile: frozenset[str], circuit_info: Any = None):
+        self.session = session
+        self.profile = profile
+        self._circuit_info = circuit_info
+
+    def covers(self, components: Iterable[str]) -> bool:
+        return frozenset(components) <= self.profile
+
+    def get_circuit_info(self) -> Optional[Any]:
+        return self._circuit_info
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
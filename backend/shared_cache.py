@@ -0,0 +1,239 @@
+"""Cache tier shared by every uvicorn worker on a machine.
+
+Each worker keeps its own in-process caches, so without this tier running N
+workers would mean N copies of every schedule fetch and N session loads per
+race. ``SharedCache`` is an SQLite database in WAL mode next to the app:
+readers never block each other or the single writer, so workers can consult
+it on the request path, and whatever one worker fetched or rendered is
+served by all of them.
+
+Entries are ``(namespace, key) -> bytes`` with an optional expiry. Callers
+store JSON or raw response bodies, never pickles, so whoever can write the
+database can at worst serve wrong data, not run code in a worker.
+
+Invalidation: ``invalidate`` deletes matching entries and bumps a
+generation counter. Workers compare it with the value they last saw and drop
+their in-process copies when it changes (see ``app.sync_shared_cache``).
+
+The database is kept under ``max_bytes``: every ``prune_every`` writes,
+expired entries go first, then the oldest ones.
+
+Errors (a locked or corrupt database, a full disk) are logged and treated as
+misses; the shared tier must never fail a request.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+CREATE TABLE IF NOT EXISTS generation (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0);
+"""
+
+
+class SharedCache:
+    def __init__(
+        self,
+        path: Optional[Path],
+        max_bytes: int = 256 * 1024 * 1024,
+        busy_timeout: float = 5.0,
+        prune_every: int = 64,
+    ):
+        self.path = Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self.prune_every = max(1, prune_every)
+        self._local = threading.local()
+        self._writes_lock = threading.Lock()
+        self._writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened after a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        assert self.path is not None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, isolation_level=None
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        """Return ``(value, stored_at)`` for a live entry, or None."""
+        if self.path is None:
+            return None
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT value, stored_at FROM entries WHERE namespace = ? "
+                    "AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, key, time.time()),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Shared cache read of %s/%s failed: %s", namespace, key, exc)
+            return None
+        if row is None:
+            return None
+        return bytes(row[0]), row[1]
+
+    def put(
+        self, namespace: str, key: str, value: bytes, ttl: Optional[float] = None
+    ) -> bool:
+        """Store an entry, replacing any previous one; returns True if written."""
+        if self.path is None:
+            return False
+        now = time.time()
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, value, size, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace,
+                    key,
+                    value,
+                    len(value),
+                    now,
+                    None if ttl is None else now + ttl,
+                ),
+            )
+        except sqlite3.Error as exc:
+            logger.warning(
+                "Shared cache write of %s/%s failed: %s", namespace, key, exc
+            )
+            return False
+
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+        return True
+
+    def invalidate(self, namespace: Optional[str] = None, prefix: str = "") -> int:
+        """Delete entries (all, a namespace, or keys starting with prefix).
+
+        Bumps the generation so every worker drops its in-process copies.
+        Returns the number of entries deleted.
+        """
+        if self.path is None:
+            return 0
+        conditions, params = [], []
+        if namespace is not None:
+            conditions.append("namespace = ?")
+            params.append(namespace)
+        if prefix:
+            conditions.append("substr(key, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deleted = conn.execute("DELETE FROM entries" + where, params).rowcount
+            conn.execute("UPDATE generation SET value = value + 1 WHERE id = 0")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return deleted
+
+    def generation(self) -> int:
+        """Counter bumped by every invalidation; -1 if unreadable."""
+        if self.path is None:
+            return 0
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT value FROM generation WHERE id = 0")
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Shared cache generation read failed: %s", exc)
+            return -1
+        return row[0]
+
+    def prune(self) -> int:
+        """Drop expired entries, then the oldest until under max_bytes."""
+        if self.path is None:
+            return 0
+        try:
+            conn = self._connection()
+            deleted = conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).rowcount
+            (total,) = conn.execute(
+                "SELECT coalesce(sum(size), 0) FROM entries"
+            ).fetchone()
+            if total <= self.max_bytes:
+                return deleted
+
+            excess = total - self.max_bytes
+            doomed = []
+            for namespace, key, size in conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY stored_at"
+            ):
+                doomed.append((namespace, key))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", doomed
+            )
+            return deleted + len(doomed)
+        except sqlite3.Error as exc:
+            logger.warning("Shared cache prune failed: %s", exc)
+            return 0
+
+    def stats(self) -> dict[str, Any]:
+        if self.path is None:
+            return {"enabled": False}
+        try:
+            entries, size = (
+                self._connection()
+                .execute("SELECT count(*), coalesce(sum(size), 0) FROM entries")
+                .fetchone()
+            )
+        except sqlite3.Error as exc:
+            return {"enabled": True, "error": str(exc)}
+        return {
+            "enabled": True,
+            "entries": entries,
+            "bytes": size,
+            "generation": self.generation(),
+        }
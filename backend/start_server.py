@@ -27,6 +27,14 @@ def setup_environment():
     print(f"Working directory: {Path.cwd()}")
 
 
+def worker_count() -> int:
+    """Number of uvicorn workers from WEB_CONCURRENCY ("auto" = one per core)."""
+    value = os.getenv("WEB_CONCURRENCY", "1").strip().lower()
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
 def start_server():
     """Start the FastAPI server with proper configuration."""
     setup_environment()
@@ -34,9 +42,12 @@ def start_server():
     # Server configuration
     host = "127.0.0.1"
     port = 8000
-    reload = True
+    # Workers share schedules and payloads through shared_cache.sqlite; the
+    # reloader only supports a single process
+    workers = worker_count()
+    reload = workers == 1
 
-    print(f"Starting FastAPI server on {host}:{port}")
+    print(f"Starting FastAPI server on {host}:{port} with {workers} worker(s)")
     print("Press Ctrl+C to stop the server")
 
     try:
@@ -49,6 +60,7 @@ def start_server():
             host=host,
             port=port,
             reload=reload,
+            workers=workers,
             log_level="info",
             access_log=True,
             # Add stability options
@@ -0,0 +1,126 @@
+"""Process-wide bounded executor for blocking upstream (FastF1) calls.
+
+At most ``max_workers`` calls run at once and at most ``max_queue`` more may
+wait for a thread. Anything beyond that is refused immediately with
+``ExecutorSaturated`` instead of queueing without bound, so a burst of cold
+requests cannot pin every server thread behind slow loads.
+
+``run`` waits for the result with a timeout (``run_async`` awaits it from
+the event loop instead) and raises ``TimeoutError`` as soon as it expires.
+The call itself keeps running on its pool thread and holds its admission
+slot until it finishes, because that thread really is still busy; a call
+that never started is cancelled and frees its slot straight away.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Upstream executor is saturated")
+        self.retry_after = retry_after
+
+
+class UpstreamExecutor:
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        retry_after: float = 5.0,
+        thread_name_prefix: str = "upstream",
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Schedule a call, or raise ExecutorSaturated if there is no room."""
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._rejected += 1
+                raise ExecutorSaturated(self.retry_after)
+            self._admitted += 1
+
+        try:
+            future = self._pool.submit(self._call, func, args, kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # Also fires for cancelled futures that never ran
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def run(
+        self,
+        func: Callable[..., Any],
+        timeout: Optional[float],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run a call on the pool and wait up to ``timeout`` seconds for it."""
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation timed out after {timeout} seconds")
+
+    async def run_async(
+        self,
+        func: Callable[..., Any],
+        timeout: Optional[float],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Like ``run``, but awaits the result without blocking the event loop.
+
+        Cancelling the awaiting task cancels the call if it has not started.
+        """
+        future = self.submit(func, *args, **kwargs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Operation timed out after {timeout} seconds")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "capacity": self.capacity,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _call(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
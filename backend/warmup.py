@@ -0,0 +1,151 @@
+"""Deferred imports of the heavy data libraries, and the warmup that loads them.
+
+FastF1 (with matplotlib, scipy and requests-cache) and pandas take seconds to
+import on a machine waking from stop, and Fly only waits so long for
+/health. app.py therefore refers to them (and to its own modules built on
+them) through ``LazyModule`` proxies: the import happens on first attribute
+access, not when app.py is imported.
+
+``Warmup`` loads those modules on a background thread as soon as the server
+starts, and records how long each took for /ready. ``WarmupGate`` holds data
+requests until the warmup has finished, waiting off the event loop, so an
+early request never imports pandas on the loop thread and stalls /health.
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule:
+    """A module imported on first attribute access.
+
+    ``on_import`` runs once with the module, before anyone else can use it.
+    Attributes are cached on the proxy after the first lookup. The proxy's
+    own attributes are all underscored so they never shadow the module's.
+    """
+
+    def __init__(self, name: str, on_import: Optional[Callable[[Any], None]] = None):
+        self._name = name
+        self._on_import = on_import
+        self._module: Any = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        module = self._module
+        if module is not None:
+            return module
+        with self._lock:
+            if self._module is None:
+                module = importlib.import_module(self._name)
+                if self._on_import is not None:
+                    self._on_import(module)
+                self._module = module
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = getattr(self._load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+class Warmup:
+    """Loads lazy modules on a background thread, in order."""
+
+    def __init__(self, modules: Iterable[tuple[str, LazyModule]]):
+        self.modules = list(modules)
+        self.timings: dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and self.error is None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._run, name="warmup", daemon=True
+            )
+            self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.start()
+        return self._done.wait(timeout)
+
+    async def wait_async(self) -> None:
+        """Wait for the warmup without blocking the event loop."""
+        if not self._done.is_set():
+            await asyncio.to_thread(self.wait)
+
+    def _run(self) -> None:
+        try:
+            for name, module in self.modules:
+                started = time.perf_counter()
+                module._load()
+                self.timings[name] = round(time.perf_counter() - started, 3)
+        except Exception as exc:
+            # Requests will retry the import themselves and fail loudly
+            logger.exception("Warmup failed")
+            self.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            self.finished_at = time.monotonic()
+            self._done.set()
+        logger.info("Warmup finished in %.2fs: %s", self.elapsed(), self.timings)
+
+    def elapsed(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return round(end - self.started_at, 3)
+
+    def state(self) -> dict[str, Any]:
+        if self.ready:
+            status = "ready"
+        elif self._done.is_set():
+            status = "failed"
+        elif self.started_at is not None:
+            status = "warming"
+        else:
+            status = "idle"
+        return {
+            "status": status,
+            "elapsedSeconds": self.elapsed(),
+            "importSeconds": dict(self.timings),
+            "error": self.error,
+        }
+
+
+class WarmupGate:
+    """Pure ASGI middleware holding requests until the warmup has finished.
+
+    Paths in ``exempt`` (health and readiness checks, metrics) never wait.
+    """
+
+    def __init__(self, app, warmup: Warmup, exempt: Iterable[str] = ()):
+        self.app = app
+        self.warmup = warmup
+        self.exempt = frozenset(exempt)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path") not in self.exempt:
+            await self.warmup.wait_async()
+        await self.app(scope, receive, send)
@@ -6,6 +6,7 @@ import Types.DriverOrder as DriverOrder exposing (DriverOrder)
 import Types.NextRace exposing (NextRace, nextRaceDecoder)
 import Types.PositionChanges as PositionChanges exposing (PositionChanges)
 import Types.Race exposing (Race, racesListDecoder)
+import Types.RaceBundle as RaceBundle exposing (RaceBundle)
 import Types.RaceDetails as RaceDetails exposing (RaceDetails)
 import Types.RaceHighlights as RaceHighlights exposing (RaceHighlights)
 
@@ -63,3 +64,11 @@ getRaceHighlights year round toMsg =
         { url = baseUrl ++ "/race/" ++ String.fromInt year ++ "/" ++ String.fromInt round ++ "/highlights"
         , expect = Http.expectJson toMsg RaceHighlights.raceHighlightsDecoder
         }
+
+
+getRaceBundle : Int -> Int -> (Result Http.Error RaceBundle -> msg) -> Cmd msg
+getRaceBundle year round toMsg =
+    Http.get
+        { url = baseUrl ++ "/race/" ++ String.fromInt year ++ "/" ++ String.fromInt round ++ "/bundle"
+        , expect = Http.expectJson toMsg RaceBundle.raceBundleDecoder
+        }
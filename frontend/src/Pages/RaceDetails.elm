@@ -15,6 +15,7 @@ import Route
 import Types.Date exposing (toString)
 import Types.DriverOrder exposing (Driver, DriverOrder)
 import Types.PositionChanges exposing (PositionChanges)
+import Types.RaceBundle exposing (RaceBundle)
 import Types.RaceDetails exposing (RaceDetails, Weather)
 import Types.RaceHighlights exposing (RaceHighlights)
 import Utils
@@ -56,12 +57,7 @@ init year raceId =
       , raceHighlights = Loading
       , chartModel = Nothing
       }
-    , Cmd.batch
-        [ Endpoints.getRaceDetails year round GotRaceDetails
-        , Endpoints.getDriverOrder year round GotDriverOrder
-        , Endpoints.getPositionChanges year round GotPositionChanges
-        , Endpoints.getRaceHighlights year round GotRaceHighlights
-        ]
+    , Endpoints.getRaceBundle year round GotRaceBundle
     )
 
 
@@ -70,10 +66,7 @@ init year raceId =
 
 
 type Msg
-    = GotRaceDetails (Result Http.Error RaceDetails)
-    | GotDriverOrder (Result Http.Error DriverOrder)
-    | GotPositionChanges (Result Http.Error PositionChanges)
-    | GotRaceHighlights (Result Http.Error RaceHighlights)
+    = GotRaceBundle (Result Http.Error RaceBundle)
     | ChartMsg PositionChart.Msg
     | Retry
 
@@ -85,46 +78,34 @@ type Msg
 update : Msg -> Model -> ( Model, Cmd Msg )
 update msg model =
     case msg of
-        GotRaceDetails (Ok details) ->
-            ( { model | raceDetails = Success details }
-            , Cmd.none
-            )
-
-        GotRaceDetails (Err error) ->
-            ( { model | raceDetails = Failure (Utils.httpErrorToString error) }
-            , Cmd.none
-            )
-
-        GotDriverOrder (Ok drivers) ->
-            ( { model | driverOrder = Success drivers }
-            , Cmd.none
-            )
-
-        GotDriverOrder (Err error) ->
-            ( { model | driverOrder = Failure (Utils.httpErrorToString error) }
-            , Cmd.none
-            )
-
-        GotPositionChanges (Ok changes) ->
+        GotRaceBundle (Ok bundle) ->
             ( { model
-                | positionChanges = Success changes
-                , chartModel = Just (PositionChart.init changes)
+                | raceDetails = bundle.raceDetails
+                , driverOrder = bundle.driverOrder
+                , positionChanges = bundle.positionChanges
+                , raceHighlights = bundle.raceHighlights
+                , chartModel =
+                    case bundle.positionChanges of
+                        Success changes ->
+                            Just (PositionChart.init changes)
+
+                        _ ->
+                            Nothing
               }
             , Cmd.none
             )
 
-        GotPositionChanges (Err error) ->
-            ( { model | positionChanges = Failure (Utils.httpErrorToString error) }
-            , Cmd.none
-            )
-
-        GotRaceHighlights (Ok highlights) ->
-            ( { model | raceHighlights = Success highlights }
-            , Cmd.none
-            )
-
-        GotRaceHighlights (Err error) ->
-            ( { model | raceHighlights = Failure (Utils.httpErrorToString error) }
+        GotRaceBundle (Err error) ->
+            let
+                message =
+                    Utils.httpErrorToString error
+            in
+            ( { model
+                | raceDetails = Failure message
+                , driverOrder = Failure message
+                , positionChanges = Failure message
+                , raceHighlights = Failure message
+              }
             , Cmd.none
             )
 
@@ -146,12 +127,7 @@ update msg model =
                 , raceHighlights = Loading
                 , chartModel = Nothing
               }
-            , Cmd.batch
-                [ Endpoints.getRaceDetails model.year model.round GotRaceDetails
-                , Endpoints.getDriverOrder model.year model.round GotDriverOrder
-                , Endpoints.getPositionChanges model.year model.round GotPositionChanges
-                , Endpoints.getRaceHighlights model.year model.round GotRaceHighlights
-                ]
+            , Endpoints.getRaceBundle model.year model.round GotRaceBundle
             )
 
 
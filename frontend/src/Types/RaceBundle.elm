@@ -0,0 +1,62 @@
+module Types.RaceBundle exposing (RaceBundle, raceBundleDecoder)
+
+import Json.Decode as Decode exposing (Decoder)
+import RemoteData exposing (RemoteData(..))
+import Types.DriverOrder as DriverOrder exposing (DriverOrder)
+import Types.PositionChanges as PositionChanges exposing (PositionChanges)
+import Types.RaceDetails as RaceDetails exposing (RaceDetails)
+import Types.RaceHighlights as RaceHighlights exposing (RaceHighlights)
+
+
+
+-- Types
+
+
+type alias RaceBundle =
+    { raceDetails : RemoteData String RaceDetails
+    , driverOrder : RemoteData String DriverOrder
+    , positionChanges : RemoteData String PositionChanges
+    , raceHighlights : RemoteData String RaceHighlights
+    }
+
+
+
+-- Decoders
+
+
+raceBundleDecoder : Decoder RaceBundle
+raceBundleDecoder =
+    Decode.map4 RaceBundle
+        (sectionDecoder "overview" RaceDetails.raceDetailsDecoder)
+        (sectionDecoder "drivers" DriverOrder.driverOrderDecoder)
+        (sectionDecoder "positions" PositionChanges.positionChangesDecoder)
+        (sectionDecoder "highlights" RaceHighlights.raceHighlightsDecoder)
+
+
+{-| A section is either its payload, or absent/null with the reason under
+`errors`. A section that is present but does not decode fails the whole
+bundle, so a schema mismatch is reported as an error, not as missing data.
+-}
+sectionDecoder : String -> Decoder a -> Decoder (RemoteData String a)
+sectionDecoder name decoder =
+    Decode.maybe (Decode.field name Decode.value)
+        |> Decode.andThen
+            (\field ->
+                case Maybe.map (Decode.decodeValue (Decode.nullable decoder)) field of
+                    Just (Ok (Just data)) ->
+                        Decode.succeed (Success data)
+
+                    Just (Err error) ->
+                        Decode.fail ("Invalid " ++ name ++ " section: " ++ Decode.errorToString error)
+
+                    _ ->
+                        Decode.map Failure (sectionErrorDecoder name)
+            )
+
+
+sectionErrorDecoder : String -> Decoder String
+sectionErrorDecoder name =
+    Decode.oneOf
+        [ Decode.at [ "errors", name, "detail" ] Decode.string
+        , Decode.succeed ("No " ++ name ++ " data available for this race")
+        ]